@@ -0,0 +1,204 @@
+import io
+import math
+import wave
+import random
+import shutil
+import struct
+import zipfile
+import argparse
+import subprocess
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from loguru import logger
+
+# Word lists for plausible (and searchable) titles, artists and albums
+WORDS = [
+    "Fire", "Storm", "Night", "Electric", "Shadow", "Highway", "Thunder", "Dream", "Steel", "Neon",
+    "Ghost", "River", "Crimson", "Velvet", "Echo", "Solar", "Broken", "Wild", "Silent", "Golden",
+    "Rebel", "Midnight", "Glass", "Iron", "Ocean", "Falling", "Savage", "Lunar", "Hollow", "Burning",
+]
+GENRES = ["Rock", "Metal", "Punk", "Pop", "Indie", "Progressive", "Alternative", "Electronic", "Blues", "Jazz"]
+CHARTERS = ["Bench Charter", "Harmonix", "Neversoft", "Community"]
+INSTRUMENT_SECTIONS = ["Single", "DoubleBass", "Drums"]
+DIFFICULTY_NOTE_STEP = {"Easy": 4, "Medium": 2, "Hard": 1, "Expert": 1}
+
+CHART_RESOLUTION = 192
+AUDIO_SAMPLE_RATE = 8000
+ALBUM_PNG_SIZE = 64
+
+
+def title_case_words(rng: random.Random, count: int) -> str:
+    """Join `count` random words."""
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def song_metadata(rng: random.Random, index: int, artist_count: int, run_tag: str) -> Dict[str, Any]:
+    """Pick metadata for one synthetic song; artists and albums repeat so tree/facet queries have groups."""
+    artist_index = index % artist_count
+    artist_rng = random.Random(f"{run_tag}-artist-{artist_index}")
+    return {
+        "name": f"{title_case_words(rng, rng.randint(1, 3))} {index}",
+        "artist": f"Bench {run_tag} {title_case_words(artist_rng, 2)} {artist_index}",
+        "album": f"{title_case_words(artist_rng, 2)} {rng.randint(1, 3)}",
+        "genre": rng.choice(GENRES),
+        "year": str(rng.randint(1970, 2025)),
+        "charter": rng.choice(CHARTERS),
+        "diff_guitar": str(rng.randint(0, 6)),
+        "diff_bass": str(rng.randint(0, 6)),
+        "diff_drums": str(rng.randint(0, 6)),
+        "preview_start_time": str(rng.randint(0, 60000)),
+    }
+
+
+def song_ini(metadata: Dict[str, Any], song_length_ms: int) -> str:
+    """Render a song.ini."""
+    lines = ["[song]"] + [f"{key} = {value}" for key, value in metadata.items()]
+    lines.append(f"song_length = {song_length_ms}")
+    return "\n".join(lines) + "\n"
+
+
+def notes_chart(rng: random.Random, seconds: float, notes_per_second: float) -> str:
+    """Render a .chart with a tempo change and guitar, bass and drum tracks at every difficulty."""
+    bpm = rng.randint(90, 200)
+    ticks_per_second = CHART_RESOLUTION * bpm / 60
+    total_ticks = int(seconds * ticks_per_second)
+    lines = [
+        "[Song]", "{", f"  Resolution = {CHART_RESOLUTION}", "}",
+        "[SyncTrack]", "{", f"  0 = B {bpm * 1000}", f"  {total_ticks // 2} = B {(bpm + 20) * 1000}", "}",
+    ]
+
+    base_step = max(1, int(ticks_per_second / notes_per_second))
+    for instrument in INSTRUMENT_SECTIONS:
+        for difficulty, step in DIFFICULTY_NOTE_STEP.items():
+            lines += [f"[{difficulty}{instrument}]", "{"]
+            for tick in range(0, total_ticks, base_step * step):
+                # A little swing so peak NPS differs from the average
+                tick += rng.randint(0, base_step // 2)
+                lines.append(f"  {tick} = N {rng.randrange(5)} 0")
+            lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def song_audio(rng: random.Random, seconds: float) -> bytes:
+    """A decodable mono WAV (a tone plus noise) so waveform generation does real work."""
+    frequency = rng.uniform(110, 880)
+    frames = int(seconds * AUDIO_SAMPLE_RATE)
+    samples = (
+        int(12000 * math.sin(2 * math.pi * frequency * i / AUDIO_SAMPLE_RATE) + rng.randint(-2000, 2000))
+        for i in range(frames)
+    )
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(AUDIO_SAMPLE_RATE)
+        wav.writeframes(struct.pack(f"<{frames}h", *samples))
+    return buffer.getvalue()
+
+
+def album_png(rng: random.Random) -> bytes:
+    """A tiny solid-colour PNG."""
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    color = tuple(rng.randrange(256) for _ in range(3))
+    Image.new("RGB", (ALBUM_PNG_SIZE, ALBUM_PNG_SIZE), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def write_song_folder(
+    root: Path, rng: random.Random, index: int, artist_count: int, run_tag: str,
+    audio_seconds: float, notes_per_second: float
+) -> Path:
+    """Write one song folder (song.ini, notes.chart, song.wav, album.png)."""
+    metadata = song_metadata(rng, index, artist_count, run_tag)
+    folder = root / f"{index:06d} - {metadata['artist']} - {metadata['name']}"
+    folder.mkdir(parents=True)
+
+    song_seconds = rng.uniform(90, 360)
+    (folder / "song.ini").write_text(song_ini(metadata, int(song_seconds * 1000)), encoding="utf-8")
+    (folder / "notes.chart").write_text(notes_chart(rng, song_seconds, notes_per_second), encoding="utf-8")
+    (folder / "song.wav").write_bytes(song_audio(rng, audio_seconds))
+    (folder / "album.png").write_bytes(album_png(rng))
+    return folder
+
+
+def archive_folder(source: Path, archive_path: Path, archive_format: str) -> Optional[Path]:
+    """Pack a directory as .zip (always available) or .rar (needs the `rar` binary)."""
+    if archive_format == "zip":
+        with zipfile.ZipFile(archive_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for path in sorted(source.rglob("*")):
+                zf.write(path, path.relative_to(source))
+        return archive_path
+
+    if archive_format == "rar":
+        if shutil.which("rar") is None:
+            logger.warning("⚠️ `rar` is not installed; skipping .rar packs.")
+            return None
+        subprocess.run(
+            ["rar", "a", "-r", "-ep1", "-idq", str(archive_path.resolve()), "."],
+            cwd=source, check=True
+        )
+        return archive_path
+
+    raise ValueError(f"Unsupported archive format: {archive_format}")
+
+
+def generate_packs(
+    output_dir: Path, songs: int, songs_per_pack: int = 25, formats: List[str] = None,
+    artists: int = None, audio_seconds: float = 2.0, notes_per_second: float = 6.0,
+    seed: int = 0, run_tag: str = "run", start_index: int = 0
+) -> Dict[str, Any]:
+    """
+    Generate `songs` song folders split into packs of `songs_per_pack`, archived in each format.
+    Returns the pack paths per format plus the unpacked folders (for driving ingest without extraction).
+    Song titles are numbered from `start_index`, so separately generated sets never collide as duplicates.
+    """
+    formats = ["zip"] if formats is None else formats
+    artists = artists or max(1, songs // 10)
+    rng = random.Random(seed)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    folders_dir = output_dir / "folders"
+    packs: Dict[str, List[str]] = {archive_format: [] for archive_format in formats}
+    pack_dirs = []
+    total_bytes = 0
+
+    end_index = start_index + songs
+    for pack_index, start in enumerate(range(start_index, end_index, songs_per_pack)):
+        pack_dir = folders_dir / f"pack_{pack_index:04d}"
+        for index in range(start, min(start + songs_per_pack, end_index)):
+            folder = write_song_folder(pack_dir, rng, index, artists, run_tag, audio_seconds, notes_per_second)
+            total_bytes += sum(path.stat().st_size for path in folder.iterdir())
+        pack_dirs.append(str(pack_dir))
+
+        for archive_format in formats:
+            archive_path = archive_folder(pack_dir, output_dir / f"pack_{pack_index:04d}.{archive_format}", archive_format)
+            if archive_path:
+                packs[archive_format].append(str(archive_path))
+
+    logger.info(f"🎸 Generated {songs} songs in {len(pack_dirs)} packs ({total_bytes / 1e6:.1f} MB) under {output_dir}")
+    return {"packs": packs, "folders": pack_dirs, "songs": songs, "bytes": total_bytes}
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Generate synthetic Clone Hero song packs.")
+    parser.add_argument("output_dir", type=Path)
+    parser.add_argument("--songs", type=int, default=100)
+    parser.add_argument("--songs-per-pack", type=int, default=25)
+    parser.add_argument("--formats", default="zip", help="Comma-separated: zip,rar")
+    parser.add_argument("--artists", type=int, default=None)
+    parser.add_argument("--audio-seconds", type=float, default=2.0)
+    parser.add_argument("--notes-per-second", type=float, default=6.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generate_packs(
+        args.output_dir, args.songs, args.songs_per_pack, args.formats.split(","), args.artists,
+        args.audio_seconds, args.notes_per_second, args.seed
+    )
+
+
+if __name__ == "__main__":
+    main()
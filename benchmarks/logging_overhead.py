@@ -0,0 +1,139 @@
+"""
+Request-latency overhead of logging, before and after the queued/sampled pipeline.
+
+    PYTHONPATH=. python -m benchmarks.logging_overhead --requests 5000
+
+Serves a minimal FastAPI app in-process under three logging setups:
+- none: no log sinks (the floor)
+- baseline: the previous setup (synchronous DEBUG file sink plus console, every request logged,
+  two unguarded debug lines per database access)
+- pipeline: src.logging_config (queued JSON sink, sampled success logs, guarded debug lines)
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+from pathlib import Path
+from typing import Dict, Any
+from loguru import logger
+
+# Results go to the real log directory; the benchmarked sinks write to a scratch one.
+# src.logging_config reads its settings at import.
+RESULTS_DIR = Path(os.getenv("LOG_DIR", "logs")) / "benchmarks"
+os.environ["LOG_DIR"] = tempfile.mkdtemp(prefix="clonehero_logbench_")
+os.environ.setdefault("LOG_LEVEL", "INFO")
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from benchmarks.run import Phase, git_commit
+from src.logging_config import LOG_DIR, DEBUG_LOGGING, setup_logging, log_request
+
+
+def fake_database_access(guarded: bool):
+    """The two debug lines get_connection() logs per query."""
+    if not guarded or DEBUG_LOGGING:
+        logger.debug("🔗 Database connection acquired.")
+        logger.debug("🔓 Database connection released.")
+
+
+def create_app(variant: str) -> FastAPI:
+    """A one-route app with the variant's request logging middleware."""
+    app = FastAPI()
+
+    @app.get("/songs/{song_id}")
+    async def fetch_song(song_id: int):
+        fake_database_access(guarded=variant == "pipeline")
+        return {"id": song_id, "title": f"Song {song_id}", "artist": "Bench", "metadata": {}}
+
+    if variant == "baseline":
+        @app.middleware("http")
+        async def log_requests(request: Request, call_next):
+            start_time = time.time()
+            response = await call_next(request)
+            duration = round(time.time() - start_time, 3)
+            logger.info(f"📤 {request.method} {request.url} - {response.status_code} [{duration}s]")
+            return response
+
+    elif variant == "pipeline":
+        @app.middleware("http")
+        async def log_requests(request: Request, call_next):
+            start_time = time.perf_counter()
+            response = await call_next(request)
+            log_request(request.method, "/songs/{song_id}", request.url.path, response.status_code, time.perf_counter() - start_time)
+            return response
+
+    return app
+
+
+def configure(variant: str):
+    """Install the variant's sinks."""
+    logger.remove()
+    if variant == "baseline":
+        logger.add(LOG_DIR / "baseline.log", rotation="10MB", level="DEBUG")
+        logger.add(sys.stdout, level="INFO")
+    elif variant == "pipeline":
+        setup_logging("pipeline.log")
+
+
+def run_variant(variant: str, requests: int, warmup: int) -> Dict[str, Any]:
+    """Time `requests` sequential requests against the variant."""
+    configure(variant)
+    client = TestClient(create_app(variant))
+    for song_id in range(warmup):
+        client.get(f"/songs/{song_id}")
+
+    with Phase(variant) as phase:
+        for song_id in range(requests):
+            start = time.perf_counter()
+            client.get(f"/songs/{song_id}")
+            phase.record(time.perf_counter() - start)
+    logger.complete()  # Drain the queue so the next variant starts clean
+    return phase.result()
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Measure request-latency overhead of logging.")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    # Console sinks write to /dev/null so the terminal does not dominate the measurement
+    real_stdout = sys.stdout
+    results = {}
+    with open(os.devnull, "w") as devnull:
+        sys.stdout = devnull
+        try:
+            for variant in ("none", "baseline", "pipeline"):
+                results[variant] = run_variant(variant, args.requests, args.warmup)
+        finally:
+            sys.stdout = real_stdout
+    logger.remove()
+    logger.add(sys.stderr, level="INFO")
+
+    floor = results["none"]["latency_ms"]
+    print(f"\n{'variant':<10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'overhead p50':>13}")
+    for variant, result in results.items():
+        latency = result["latency_ms"]
+        print(
+            f"{variant:<10} {latency['p50']:>8.3f} {latency['p95']:>8.3f} {latency['p99']:>8.3f} "
+            f"{latency['p50'] - floor['p50']:>+12.3f}"
+        )
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": {"requests": args.requests, "warmup": args.warmup, "log_level": os.environ["LOG_LEVEL"]},
+        "results": results,
+    }
+    output = args.output or RESULTS_DIR / f"logging_{time.strftime('%Y%m%d-%H%M%S')}_{report['commit'] or 'unknown'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    logger.success(f"✅ Logging benchmark results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+"""
+Ingest and query benchmarks.
+
+    PYTHONPATH=. python -m benchmarks.run --songs 500 --formats zip,rar
+    PYTHONPATH=. python -m benchmarks.run --compare logs/benchmarks/<earlier>.json
+
+Runs against the configured storage: STORAGE_BACKEND=sqlite (with SQLITE_PATH) needs nothing else;
+for Postgres point DB_URL / DB_* at a disposable database (e.g. `docker compose up -d clonehero_db`).
+Songs are stored under a scratch CONTENT_BASE_DIR and removed afterwards unless --keep is given.
+Results (throughput, latency percentiles, peak RSS per phase) are written as JSON for comparison across commits.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import shutil
+import asyncio
+import argparse
+import resource
+import tempfile
+import platform
+import threading
+import subprocess
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+import numpy as np
+from loguru import logger
+from benchmarks.generate_pack import generate_packs, WORDS
+
+BENCHMARK_DIR = Path(os.getenv("LOG_DIR", "logs")) / "benchmarks"
+RSS_SAMPLE_INTERVAL = 0.01
+PAGE_SIZE = 50
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # ru_maxrss is the high-water mark (KiB on Linux, bytes on macOS), the closest portable figure
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+class Phase:
+    """Collects per-operation latencies and the peak RSS seen while a phase runs."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: List[float] = []
+        self.items = 0
+        self.bytes = 0
+        self.peak_rss = current_rss()
+        self.stop_event = threading.Event()
+        self.sampler = threading.Thread(target=self.sample_rss, name=f"rss-{name}", daemon=True)
+        self.started_at = 0.0
+        self.elapsed = 0.0
+
+    def sample_rss(self):
+        """Track the RSS high-water mark for this phase."""
+        while not self.stop_event.wait(RSS_SAMPLE_INTERVAL):
+            self.peak_rss = max(self.peak_rss, current_rss())
+
+    def __enter__(self):
+        logger.info(f"⏱️ {self.name}")
+        self.sampler.start()
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.started_at
+        self.stop_event.set()
+        self.sampler.join()
+        self.peak_rss = max(self.peak_rss, current_rss())
+
+    def record(self, seconds: float, items: int = 1, size: int = 0):
+        """Record one timed operation that handled `items` songs/rows and `size` bytes."""
+        self.latencies.append(seconds)
+        self.items += items
+        self.bytes += size
+
+    def result(self) -> Dict[str, Any]:
+        """Summary for the results file."""
+        latencies_ms = np.array(self.latencies) * 1000
+        p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99]) if latencies_ms.size else (0.0, 0.0, 0.0)
+        return {
+            "operations": len(self.latencies),
+            "items": self.items,
+            "bytes": self.bytes,
+            "seconds": round(self.elapsed, 4),
+            "ops_per_second": round(len(self.latencies) / self.elapsed, 2) if self.elapsed else None,
+            "items_per_second": round(self.items / self.elapsed, 2) if self.elapsed else None,
+            "mb_per_second": round(self.bytes / 1e6 / self.elapsed, 2) if self.elapsed and self.bytes else None,
+            "latency_ms": {
+                "mean": round(float(latencies_ms.mean()), 3) if latencies_ms.size else 0.0,
+                "p50": round(float(p50), 3),
+                "p95": round(float(p95), 3),
+                "p99": round(float(p99), 3),
+                "max": round(float(latencies_ms.max()), 3) if latencies_ms.size else 0.0,
+            },
+            "peak_rss_mb": round(self.peak_rss / 1e6, 1),
+        }
+
+
+def git_commit() -> Optional[str]:
+    """Current commit, so results can be compared across commits."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def copy_to_scratch(source: str, scratch_dir: Path) -> Path:
+    """Copy a pack or folder so ingest can consume (move/delete) it without touching the originals."""
+    destination = scratch_dir / f"{uuid.uuid4().hex[:8]}_{Path(source).name}"
+    if Path(source).is_dir():
+        shutil.copytree(source, destination)
+    else:
+        shutil.copy2(source, destination)
+    return destination
+
+
+async def bench_extract_content(phase: Phase, packs: List[str], scratch_dir: Path, song_ids: List[int]):
+    """Full archive ingest: extract, parse, move and store every song in each pack."""
+    from src.services.content_utils import extract_content
+
+    for pack in packs:
+        path = copy_to_scratch(pack, scratch_dir)
+        size = path.stat().st_size
+        start = time.perf_counter()
+        result = await extract_content(str(path), "songs")
+        phase.record(time.perf_counter() - start, len(result) if isinstance(result, list) else 0, size)
+        if isinstance(result, dict) and "error" in result:
+            logger.error(f"❌ extract_content failed for {pack}: {result['error']}")
+        elif isinstance(result, list):
+            song_ids.extend(song["id"] for song in result)
+
+
+async def bench_process_and_store(phase: Phase, folders: List[str], scratch_dir: Path, song_ids: List[int]):
+    """Ingest from already-extracted folders, isolating parse/move/db_write from extraction."""
+    from src.services.content_manager import process_and_store_content, folder_size
+
+    for folder in folders:
+        path = copy_to_scratch(folder, scratch_dir)
+        size = sum(folder_size(song) for song in path.iterdir() if song.is_dir())
+        start = time.perf_counter()
+        result = await process_and_store_content(str(path), "songs")
+        phase.record(time.perf_counter() - start, len(result), size)
+        song_ids.extend(song["id"] for song in result)
+        shutil.rmtree(path, ignore_errors=True)
+
+
+async def bench_waveforms(phase: Phase):
+    """Wait for the background waveform stage ingest scheduled, so it does not overlap the query phases."""
+    from src.services.waveform import background_tasks
+
+    start = time.perf_counter()
+    pending = list(background_tasks)
+    generated = await asyncio.gather(*pending, return_exceptions=True)
+    phase.record(time.perf_counter() - start, sum(count for count in generated if isinstance(count, int)))
+
+
+def bench_get_all_songs(results: Dict[str, Any], iterations: int, rng: random.Random):
+    """Query-layer benchmarks for get_all_songs (no HTTP)."""
+    from src.services.database_explorer import get_all_songs
+
+    scenarios = {
+        "get_all_songs.first_page": lambda: get_all_songs(limit=PAGE_SIZE),
+        "get_all_songs.search": lambda: get_all_songs(search_query=rng.choice(WORDS), limit=PAGE_SIZE),
+        "get_all_songs.peak_nps": lambda: get_all_songs(min_peak_nps=rng.uniform(2, 8), limit=PAGE_SIZE),
+        "get_all_songs.instrument": lambda: get_all_songs(
+            instrument="drums", difficulty="expert", min_peak_nps=rng.uniform(2, 8), limit=PAGE_SIZE
+        ),
+        "get_all_songs.deep_offset": lambda: get_all_songs(limit=PAGE_SIZE, offset=PAGE_SIZE * 20),
+    }
+    for name, query in scenarios.items():
+        with Phase(name) as phase:
+            for _ in range(iterations):
+                start = time.perf_counter()
+                rows = query()
+                phase.record(time.perf_counter() - start, len(rows))
+        results[name] = phase.result()
+
+    # Walk the whole library with keyset pagination
+    with Phase("get_all_songs.keyset_walk") as phase:
+        after_id = None
+        while True:
+            start = time.perf_counter()
+            rows = get_all_songs(limit=PAGE_SIZE, after_id=after_id, fields=["id", "title"])
+            phase.record(time.perf_counter() - start, len(rows))
+            if len(rows) < PAGE_SIZE:
+                break
+            after_id = rows[-1]["id"]
+    results[phase.name] = phase.result()
+
+
+def bench_endpoints(results: Dict[str, Any], iterations: int, rng: random.Random):
+    """HTTP benchmarks for the list endpoints, in-process (routing, validation, ETags and serialization included)."""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from src.routes.database_explorer import router as database_explorer_router
+    from src.routes.content_manager import router as content_manager_router
+
+    app = FastAPI()
+    app.include_router(database_explorer_router)
+    app.include_router(content_manager_router)
+    client = TestClient(app)
+
+    tree = client.get("/songs/tree", params={"limit": 100}).json()
+    artists = [artist["artist"] for artist in tree.get("artists", [])]
+    etag = client.get("/songs/", params={"limit": PAGE_SIZE}).headers.get("etag")
+
+    scenarios = {
+        "GET /songs/": lambda: client.get("/songs/", params={"limit": PAGE_SIZE}),
+        "GET /songs/ (304)": lambda: client.get("/songs/", params={"limit": PAGE_SIZE}, headers={"If-None-Match": etag or ""}),
+        "GET /songs/?search": lambda: client.get("/songs/", params={"limit": PAGE_SIZE, "search": rng.choice(WORDS)}),
+        "GET /songs/?fields": lambda: client.get("/songs/", params={"limit": PAGE_SIZE, "fields": "id,title,artist"}),
+        "GET /songs/tree": lambda: client.get("/songs/tree", params={"limit": 20}),
+        "GET /songs/tree/album": lambda: client.get("/songs/tree/album", params={"artist": rng.choice(artists or [""])}),
+        "GET /content/": lambda: client.get("/content/", params={"limit": PAGE_SIZE}),
+    }
+    for name, request in scenarios.items():
+        with Phase(name) as phase:
+            for _ in range(iterations):
+                start = time.perf_counter()
+                response = request()
+                phase.record(time.perf_counter() - start, 1, len(response.content))
+                if response.status_code not in (200, 304):
+                    logger.warning(f"⚠️ {name} returned {response.status_code}")
+        results[name] = phase.result()
+
+
+def cleanup_songs(song_ids: List[int]):
+    """Delete the songs this run inserted."""
+    from src.services.storage import storage
+
+    deleted = storage.delete_songs(song_ids) if song_ids else []
+    logger.info(f"🧹 Removed {len(deleted)} benchmark songs")
+
+
+def compare(current: Dict[str, Any], baseline_path: Path):
+    """Print p50/p95 and throughput changes against an earlier results file."""
+    baseline = json.loads(baseline_path.read_text())
+    print(f"\n{'phase':<34} {'p50 ms':>18} {'p95 ms':>18} {'items/s':>20}")
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if not before:
+            continue
+
+        def delta(old, new):
+            if not old or new is None:
+                return f"{new}"
+            return f"{new} ({(new - old) / old * 100:+.0f}%)"
+
+        print(
+            f"{name:<34} {delta(before['latency_ms']['p50'], result['latency_ms']['p50']):>18} "
+            f"{delta(before['latency_ms']['p95'], result['latency_ms']['p95']):>18} "
+            f"{delta(before['items_per_second'], result['items_per_second']):>20}"
+        )
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark ingest and queries against a local database.")
+    parser.add_argument("--songs", type=int, default=200, help="Songs generated per archive format and for the folder ingest")
+    parser.add_argument("--songs-per-pack", type=int, default=25)
+    parser.add_argument("--formats", default="zip", help="Archive formats to ingest: zip,rar")
+    parser.add_argument("--audio-seconds", type=float, default=2.0)
+    parser.add_argument("--iterations", type=int, default=200, help="Repetitions per query scenario")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-ingest", action="store_true", help="Only run the query benchmarks against existing data")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated songs in the database and on disk")
+    parser.add_argument("--output", type=Path, default=None, help="Results file (default: LOG_DIR/benchmarks/<time>_<commit>.json)")
+    parser.add_argument("--compare", type=Path, default=None, help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    run_tag = uuid.uuid4().hex[:6]
+    work_dir = Path(tempfile.mkdtemp(prefix="clonehero_bench_"))
+    # Ingest stores songs under CONTENT_BASE_DIR, read when src.services.content_utils is imported
+    os.environ["CONTENT_BASE_DIR"] = str(work_dir / "library")
+    scratch_dir = work_dir / "scratch"
+    scratch_dir.mkdir(parents=True)
+    rng = random.Random(args.seed)
+
+    from src.services.storage import storage
+
+    results: Dict[str, Any] = {}
+    dataset: Dict[str, Any] = {"storage": storage.name}
+    song_ids: List[int] = []
+    try:
+        storage.init_schema()
+        if not args.skip_ingest:
+            # One song set per archive format plus one for the folder ingest, so no phase re-ingests duplicates
+            datasets = {archive_format: [archive_format] for archive_format in args.formats.split(",")}
+            datasets["folders"] = []
+            generated = {}
+            with Phase("generate") as phase:
+                for index, (name, formats) in enumerate(datasets.items()):
+                    start = time.perf_counter()
+                    generated[name] = generate_packs(
+                        work_dir / name, args.songs, args.songs_per_pack, formats, audio_seconds=args.audio_seconds,
+                        seed=args.seed + index, run_tag=run_tag, start_index=index * args.songs
+                    )
+                    phase.record(time.perf_counter() - start, generated[name]["songs"], generated[name]["bytes"])
+            results[phase.name] = phase.result()
+
+            async def ingest():
+                for archive_format in args.formats.split(","):
+                    packs = generated[archive_format]["packs"][archive_format]
+                    if not packs:
+                        continue
+                    with Phase(f"extract_content.{archive_format}") as phase:
+                        await bench_extract_content(phase, packs, scratch_dir, song_ids)
+                    results[phase.name] = phase.result()
+
+                with Phase("process_and_store_content") as phase:
+                    await bench_process_and_store(phase, generated["folders"]["folders"], scratch_dir, song_ids)
+                results[phase.name] = phase.result()
+
+                with Phase("waveforms") as phase:
+                    await bench_waveforms(phase)
+                results[phase.name] = phase.result()
+
+            asyncio.run(ingest())
+
+        dataset["songs_in_database"] = storage.count_songs()
+        bench_get_all_songs(results, args.iterations, rng)
+        bench_endpoints(results, args.iterations, rng)
+    finally:
+        from src.services.process_pool import shutdown_process_pool
+
+        shutdown_process_pool()
+        if not args.keep:
+            cleanup_songs(song_ids)
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    children_maxrss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "dataset": dataset,
+        "peak_rss_children_mb": round(children_maxrss * (1 if sys.platform == "darwin" else 1024) / 1e6, 1),
+        "results": results,
+    }
+
+    output = args.output or BENCHMARK_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}_{report['commit'] or 'unknown'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, default=str))
+    logger.success(f"✅ Benchmark results written to {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+API worker startup time and resident memory.
+
+    PYTHONPATH=. python -m benchmarks.startup --runs 5
+
+Each variant starts a fresh interpreter that imports an app and runs its lifespan startup (what a gunicorn
+worker does before it accepts requests), then reports the elapsed time and the process's RSS:
+- api: src.api.main as configured (librosa is imported only when audio is decoded)
+- api_eager_librosa: the same with `import librosa` up front, as src.api.main did before. librosa >= 0.10
+  loads its submodules lazily, so this alone costs little
+- api_librosa_loaded: the same with the librosa submodules the app calls (core, beat, feature) loaded, which
+  pulls in scipy and numba: the cost a worker pays once it decodes audio itself (or on librosa < 0.10)
+- api_without_generator: src.api.main with SONG_GENERATOR_ENABLED=false (generator split out)
+- generator: the separate song generator service (src.api.generator)
+
+Runs against STORAGE_BACKEND=sqlite in a scratch directory unless --storage postgres is given.
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+import subprocess
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+import numpy as np
+from loguru import logger
+from benchmarks.run import git_commit, BENCHMARK_DIR
+
+# Runs in the child interpreter; prints one JSON line
+STARTUP_SNIPPET = """
+import json, time, importlib
+start = time.perf_counter()
+for module in {preload!r}:
+    importlib.import_module(module)
+app = importlib.import_module({module!r}).app
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app):
+    ready = time.perf_counter()
+    rss = int(open("/proc/self/statm").read().split()[1]) * __import__("os").sysconf("SC_PAGE_SIZE")
+print(json.dumps({{"import_s": imported - start, "ready_s": ready - start, "rss_bytes": rss}}))
+"""
+
+VARIANTS = {
+    "api": {"module": "src.api.main", "preload": [], "env": {}},
+    "api_eager_librosa": {"module": "src.api.main", "preload": ["librosa"], "env": {}},
+    "api_librosa_loaded": {
+        "module": "src.api.main", "preload": ["librosa", "librosa.core", "librosa.beat", "librosa.feature"], "env": {}
+    },
+    "api_without_generator": {"module": "src.api.main", "preload": [], "env": {"SONG_GENERATOR_ENABLED": "false"}},
+    "generator": {"module": "src.api.generator", "preload": [], "env": {}},
+}
+
+
+def measure_once(variant: Dict[str, Any], env: Dict[str, str]) -> Optional[Dict[str, float]]:
+    """Start one interpreter for the variant; None if it failed (e.g. librosa is not installed)."""
+    code = STARTUP_SNIPPET.format(module=variant["module"], preload=variant["preload"])
+    result = subprocess.run(
+        [sys.executable, "-c", code], env={**env, **variant["env"]}, capture_output=True, text=True, timeout=300
+    )
+    if result.returncode != 0:
+        logger.warning(f"⚠️ Startup failed: {result.stderr.strip().splitlines()[-1:]}")
+        return None
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summarize(samples: List[Dict[str, float]]) -> Dict[str, Any]:
+    """Median startup times and RSS across runs."""
+    return {
+        "runs": len(samples),
+        "import_s": round(float(np.median([s["import_s"] for s in samples])), 3),
+        "ready_s": round(float(np.median([s["ready_s"] for s in samples])), 3),
+        "rss_mb": round(float(np.median([s["rss_bytes"] for s in samples])) / 1e6, 1),
+    }
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Measure API worker startup time and RSS.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters started per variant")
+    parser.add_argument("--variants", default=",".join(VARIANTS), help="Comma-separated subset of: " + ", ".join(VARIANTS))
+    parser.add_argument("--storage", default="sqlite", choices=("sqlite", "postgres"))
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    scratch_dir = Path(tempfile.mkdtemp(prefix="clonehero_startup_"))
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.getcwd(),
+        "LOG_DIR": str(scratch_dir / "logs"),
+        "LOG_CONSOLE_LEVEL": "ERROR",
+        "STORAGE_BACKEND": args.storage,
+    }
+    if args.storage == "sqlite":
+        env["SQLITE_PATH"] = str(scratch_dir / "startup.db")
+
+    results = {}
+    for name in args.variants.split(","):
+        samples = [sample for sample in (measure_once(VARIANTS[name], env) for _ in range(args.runs)) if sample]
+        results[name] = summarize(samples) if samples else {"error": "startup failed; see warnings"}
+        logger.info(f"⏱️ {name}: {results[name]}")
+
+    print(f"\n{'variant':<24} {'import s':>9} {'ready s':>9} {'RSS MB':>8}")
+    for name, result in results.items():
+        if "error" in result:
+            print(f"{name:<24} {'failed':>9}")
+        else:
+            print(f"{name:<24} {result['import_s']:>9.3f} {result['ready_s']:>9.3f} {result['rss_mb']:>8.1f}")
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": {"runs": args.runs, "storage": args.storage},
+        "results": results,
+    }
+    output = args.output or BENCHMARK_DIR / f"startup_{time.strftime('%Y%m%d-%H%M%S')}_{report['commit'] or 'unknown'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    logger.success(f"✅ Startup benchmark results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
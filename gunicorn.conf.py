@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+import shutil
+from pathlib import Path
+
+# Gunicorn loads ./gunicorn.conf.py automatically; command-line flags still override these defaults
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Apply the schema once in the master before forking, instead of in every worker's lifespan.
+# Disable for services without a database (the song generator).
+MIGRATE_ON_STARTING = os.getenv("MIGRATE_ON_STARTING", "true").lower() in ("1", "true", "yes")
+DB_RETRY_ATTEMPTS = int(os.getenv("DB_RETRY_ATTEMPTS", 10))
+DB_RETRY_DELAY = int(os.getenv("DB_RETRY_DELAY", 5))
+
+
+def apply_schema(server):
+    """
+    Initialize the schema with retries, then close the master's connections so forked workers open their own.
+    On failure the workers are left to initialize the schema themselves, as before.
+    """
+    sys.path.insert(0, os.getcwd())
+    from src.services.storage import storage
+    from src.services.migrations import MigrationError
+
+    for attempt in range(DB_RETRY_ATTEMPTS):
+        try:
+            storage.init_schema()
+            os.environ["SCHEMA_INITIALIZED"] = "true"  # Inherited by the workers
+            server.log.info("Database schema initialized before forking workers")
+            break
+        except MigrationError as e:
+            server.log.error(f"Schema migration failed: {e}")  # Not transient; the workers will report it too
+            break
+        except Exception as e:
+            delay_time = min(DB_RETRY_DELAY * (2 ** attempt), 60)
+            server.log.warning(f"Database not ready ({e}); retrying in {delay_time}s")
+            time.sleep(delay_time)
+    else:
+        server.log.error("Schema initialization failed in the master; workers will retry it")
+    storage.close()
+
+    # The pool gauges sampled while initializing belong to the master, which never serves /metrics
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def on_starting(server):
+    """Start every deployment with an empty Prometheus multiprocess directory and an up-to-date schema."""
+    multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        Path(multiproc_dir).mkdir(parents=True, exist_ok=True)
+
+    if MIGRATE_ON_STARTING:
+        apply_schema(server)
+
+
+def post_fork(server, worker):
+    """Give each worker its own connection pool (the master's was closed before forking)."""
+    database = sys.modules.get("src.database")
+    if database is not None and database.STORAGE_BACKEND == "postgres" and database.db_pool is None:
+        database.create_db_pool()
+
+
+def child_exit(server, worker):
+    """Drop a dead worker's live gauges (in-flight requests, pool connections) from /metrics."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
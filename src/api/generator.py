@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+from fastapi import FastAPI, Response
+from contextlib import asynccontextmanager
+from loguru import logger
+from dotenv import load_dotenv  # Load environment variables from .env
+
+# Load environment variables
+load_dotenv()
+
+# Ensure the module can be found by adding its root directory to `sys.path`
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+# Configure Loguru logging (queued JSON file sink and console) before other modules log at import
+from src.logging_config import setup_logging
+setup_logging("generator.log")
+
+from src.services.metrics import render_metrics
+from src.services.process_pool import shutdown_process_pool
+from src.routes.song_generator import router as song_processing_router
+
+# Track service start time
+SERVICE_START_TIME = time.time()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Stops the audio analysis process pool on shutdown."""
+    yield  # Application runs here
+    logger.info("🛑 Song generator service is shutting down...")
+    shutdown_process_pool()
+    await logger.complete()  # Drain queued log records before the worker exits
+
+def create_app() -> FastAPI:
+    """
+    Creates the song generator service: the /process_song* routes without storage or the library,
+    so audio analysis (librosa, its process pool) is scaled and restarted apart from the main API.
+    """
+    app = FastAPI(lifespan=lifespan)
+
+    @app.get("/health", summary="Health Check", tags=["Health"])
+    async def health_check():
+        """Report the generator service as up (it has no database dependency)."""
+        return {"status": "healthy", "service": "generator", "uptime_seconds": round(time.time() - SERVICE_START_TIME, 2)}
+
+    @app.get("/metrics", summary="Prometheus Metrics", tags=["Health"])
+    async def metrics():
+        """Expose the generator service's metrics in the Prometheus text format."""
+        body, content_type = render_metrics()
+        return Response(content=body, media_type=content_type)
+
+    app.include_router(song_processing_router, prefix="")
+    return app
+
+# Create and run the FastAPI application
+app = create_app()
@@ -3,8 +3,8 @@ import sys
 import asyncio
 import random
 import time
-from pathlib import Path
 from fastapi import FastAPI, Request
+from starlette.routing import Match
 from contextlib import asynccontextmanager
 from loguru import logger
 from psycopg2 import OperationalError, errors
@@ -16,21 +16,26 @@ load_dotenv()
 # Ensure the module can be found by adding its root directory to `sys.path`
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
-# Import DB init function
-from src.database import init_db
+# Configure Loguru logging (queued JSON file sink and console) before other modules log at import
+from src.logging_config import setup_logging, log_request
+setup_logging("app.log")
+
+# Import storage (schema init, backend capabilities)
+from src.services.storage import storage
+from src.services.change_feed import subscribe, start_change_feed, stop_change_feed
+from src.services.suggest_index import suggest_index
+from src.services.health_probe import health_probe
+from src.services.library_snapshot import library_snapshot, LIBRARY_SNAPSHOT_ENABLED
+from src.services.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_FLIGHT
+from src.services.profiler import SamplingProfiler, profile_requested, PROFILE_HEADER
 
 # Import routers
 from src.routes.content_manager import router as content_manager_router
-from src.routes.song_generator import router as song_processing_router
 from src.routes.health import router as health_router
 from src.routes.database_explorer import router as database_explorer_router
+from src.routes.library import router as library_router
 
 # Read environment variables
-LOG_DIR = Path(os.getenv("LOG_DIR", "logs"))
-LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG")
-LOG_FILE_SIZE = os.getenv("LOG_FILE_SIZE", "10MB")
-LOG_RETENTION = os.getenv("LOG_RETENTION", "7 days")
-
 DB_URL = os.getenv("DB_URL")
 DB_RETRY_ATTEMPTS = int(os.getenv("DB_RETRY_ATTEMPTS", 10))
 DB_RETRY_DELAY = int(os.getenv("DB_RETRY_DELAY", 5))
@@ -39,21 +44,22 @@ APP_ENV = os.getenv("APP_ENV", "development")
 APP_PORT = int(os.getenv("APP_PORT", 8000))
 APP_HOST = os.getenv("APP_HOST", "0.0.0.0")
 
-# Ensure logs directory exists before setting up logging
-LOG_DIR.mkdir(parents=True, exist_ok=True)
-
-# Configure Loguru logging (logging to file and console)
-LOG_FILE = LOG_DIR / "app.log"
-logger.add(LOG_FILE, rotation=LOG_FILE_SIZE, retention=LOG_RETENTION, level=LOG_LEVEL)
-logger.add(sys.stdout, level="INFO")
+# Set by the gunicorn master (gunicorn.conf.py) once it has applied the schema, so workers only check connectivity
+SCHEMA_INITIALIZED = os.getenv("SCHEMA_INITIALIZED", "false").lower() in ("1", "true", "yes")
+# Serve /process_song* from this app; set to false when the separate generator service (src.api.generator) runs
+SONG_GENERATOR_ENABLED = os.getenv("SONG_GENERATOR_ENABLED", "true").lower() in ("1", "true", "yes")
 
 async def wait_for_db(max_retries=DB_RETRY_ATTEMPTS, base_delay=DB_RETRY_DELAY):
     """Wait for the database to be ready before initializing."""
     for attempt in range(max_retries):
         try:
             logger.info(f"🔄 Attempting DB connection ({attempt + 1}/{max_retries})...")
-            init_db()
-            logger.success("✅ Database initialized successfully.")
+            if SCHEMA_INITIALIZED:
+                storage.ping()
+                logger.success("✅ Database reachable (schema applied before workers started).")
+            else:
+                storage.init_schema()
+                logger.success("✅ Database initialized successfully.")
             return
         except (OperationalError, errors.DatabaseError) as e:
             delay_time = min(base_delay * (2 ** attempt) + random.uniform(0, 1), 60)
@@ -70,31 +76,101 @@ async def wait_for_db(max_retries=DB_RETRY_ATTEMPTS, base_delay=DB_RETRY_DELAY):
 async def lifespan(app: FastAPI):
     """Ensures database is initialized before the app starts and handles cleanup on shutdown."""
     await wait_for_db()
+    health_probe.start()  # Health endpoints serve its cached snapshot
+
+    # Build the typeahead index in the background and keep it current from the change feed
+    # (Postgres notifies on every change; with SQLite each worker polls the song_changes log)
+    subscribe(suggest_index.apply_changes)
+    start_change_feed()
+    asyncio.get_running_loop().run_in_executor(None, suggest_index.build)
+
+    # Optional columnar snapshot for /library/query, maintained the same way
+    if LIBRARY_SNAPSHOT_ENABLED and storage.name != "postgres":
+        library_snapshot.error = "The library snapshot requires Postgres storage"
+        logger.warning("⚠️ The library snapshot requires Postgres storage; /library/query is disabled.")
+    elif LIBRARY_SNAPSHOT_ENABLED:
+        subscribe(library_snapshot.apply_changes)
+        asyncio.get_running_loop().run_in_executor(None, library_snapshot.build)
+
     yield  # Application runs here
     logger.info("🛑 FastAPI application is shutting down...")
+    stop_change_feed()
+    health_probe.stop()
+    await logger.complete()  # Drain queued log records before the worker exits
 
 def create_app() -> FastAPI:
     """Creates the FastAPI application with middleware and routes."""
     app = FastAPI(lifespan=lifespan)
 
+    def route_template(request: Request) -> str:
+        """Return the matched route's path template (e.g. /songs/{song_id}) to keep metric labels bounded."""
+        route = request.scope.get("route")  # Set by the router once the request has been routed
+        if route is not None and hasattr(route, "path"):
+            return route.path
+        for route in app.routes:
+            match, _ = route.matches(request.scope)
+            # Newer FastAPI versions list included routers as a whole, without a path of their own
+            if match == Match.FULL and hasattr(route, "path"):
+                return route.path
+        return "unmatched"
+
     # Middleware for logging requests
     @app.middleware("http")
     async def log_requests(request: Request, call_next):
-        """Middleware to log incoming API requests and their responses."""
-        start_time = time.time()
-        response = None  # Ensure response is always defined
-        
+        """Log finished requests (errors and slow requests always, successes sampled per route)."""
+        start_time = time.perf_counter()
+        status_code = 500  # Reported if the handler raises
+
         try:
             response = await call_next(request)
+            status_code = response.status_code
+            return response
         except Exception as e:
-            logger.error(f"❌ Unhandled error in request {request.method} {request.url}: {e}")
-            response = None  # Ensure response is defined in case of an error
-            raise e  # Re-raise the exception after logging
+            logger.error(f"❌ Unhandled error in request {request.method} {request.url.path}: {e}")
+            raise
+        finally:
+            route = request.state.route = route_template(request)
+            log_request(request.method, route, request.url.path, status_code, time.perf_counter() - start_time)
+
+    # Middleware for request metrics
+    @app.middleware("http")
+    async def record_metrics(request: Request, call_next):
+        """Record per-route latency histograms and the number of in-flight requests."""
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method=request.method)
+        in_flight.inc()
+        start_time = time.perf_counter()
+        status_code = 500
+
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            in_flight.dec()
+            route = getattr(request.state, "route", None) or route_template(request)  # Resolved by log_requests
+            HTTP_REQUEST_DURATION.labels(method=request.method, route=route, status=str(status_code)).observe(
+                time.perf_counter() - start_time
+            )
+
+    # Middleware for opt-in profiling
+    @app.middleware("http")
+    async def profile_requests(request: Request, call_next):
+        """
+        Profile requests carrying a valid `X-Profile` token (or picked by PROFILE_SAMPLE_RATE) and
+        write folded stacks to LOG_DIR/profiles. Streaming bodies are profiled up to the response start.
+        """
+        if not profile_requested(request.headers.get(PROFILE_HEADER)):
+            return await call_next(request)
+
+        profiler = SamplingProfiler(f"{request.method}_{route_template(request)}")
+        profiler.start()
+        try:
+            response = await call_next(request)
         finally:
-            duration = round(time.time() - start_time, 3)
-            status_code = response.status_code if response else 500  # Default to 500 if response is None
-            logger.info(f"📤 {request.method} {request.url} - {status_code} [{duration}s]")
+            output_path = await asyncio.to_thread(profiler.stop)
 
+        if output_path:
+            response.headers["X-Profile-Output"] = output_path.name
         return response
 
     # Register API routes
@@ -102,8 +178,11 @@ def create_app() -> FastAPI:
         content_manager_router,
         health_router,
         database_explorer_router,
-        song_processing_router,
+        library_router,
     ]
+    if SONG_GENERATOR_ENABLED:
+        from src.routes.song_generator import router as song_processing_router
+        routers.append(song_processing_router)
     for router in routers:
         app.include_router(router, prefix="")
 
@@ -1,10 +1,11 @@
 import os
-import sys
 import asyncio
 import signal
 import requests
 from loguru import logger
 from dotenv import load_dotenv
+from prometheus_client import start_http_server
+from src.logging_config import setup_logging
 
 # Load environment variables
 load_dotenv()
@@ -13,30 +14,31 @@ load_dotenv()
 API_URL = os.getenv("API_URL", "http://clonehero_api:8000")
 DEBUG_MODE = os.getenv("DEBUG_MODE", "false").lower() == "true"
 
-# Logging setup
-LOG_DIR = os.getenv("LOG_DIR", "/app/logs")
-LOG_FILE = os.path.join(LOG_DIR, "worker.log")
-LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG")
-LOG_FILE_SIZE = os.getenv("LOG_FILE_SIZE", "10MB")
-LOG_RETENTION = os.getenv("LOG_RETENTION", "5")
-LOG_COMPRESSION = os.getenv("LOG_COMPRESSION", "zip")
-
-# Ensure log directory exists
-os.makedirs(LOG_DIR, exist_ok=True)
-
-# Configure Loguru logging
-logger.add(LOG_FILE, rotation=LOG_FILE_SIZE, retention=LOG_RETENTION, compression=LOG_COMPRESSION, level=LOG_LEVEL)
+# Configure Loguru logging (queued sinks; see src/logging_config.py)
+setup_logging("worker.log", retention="5")
 
 if DEBUG_MODE:
-    logger.add(sys.stdout, level="DEBUG")
     logger.debug("🚀 Running in DEBUG mode")
 
+from src.services.scheduler import Job, Scheduler
+from src.services import maintenance
+
+# Scheduler metrics (and the container health check) are served on this port
+BACKEND_PORT = int(os.getenv("BACKEND_PORT", 8001))
+# Maintenance that touches the database waits while the API reports this much queued ingest work
+# or connection pool use
+MAINTENANCE_BUSY_QUEUE_DEPTH = int(os.getenv("MAINTENANCE_BUSY_QUEUE_DEPTH", 1))
+MAINTENANCE_BUSY_POOL_SATURATION = float(os.getenv("MAINTENANCE_BUSY_POOL_SATURATION", 0.5))
+
 # Global control for worker loop
 RUNNING = True
 
-async def check_api():
+# Last successful /health response from the API
+LAST_API_HEALTH = {}
+
+async def check_api(retries: int = 5):
     """Checks API health status with retries and exponential backoff."""
-    retries = 5
+    global LAST_API_HEALTH
     base_delay = 5  # Initial delay in seconds
 
     for attempt in range(retries):
@@ -45,12 +47,16 @@ async def check_api():
             response.raise_for_status()
             data = response.json() if "application/json" in response.headers.get("content-type", "") else response.text
             logger.info(f"✅ API Health Check: {response.status_code} - {data}")
+            LAST_API_HEALTH = data if isinstance(data, dict) else {}
             return True
         except requests.Timeout:
             logger.warning(f"⚠️ API Health Check Timeout (Attempt {attempt + 1}/{retries})")
         except requests.RequestException as e:
             logger.error(f"❌ API Connection Failed (Attempt {attempt + 1}/{retries}): {e}")
 
+        if attempt + 1 == retries:
+            break
+
         # Exponential backoff
         delay = min(base_delay * (2 ** attempt), 60)  # Cap delay at 60s
         await asyncio.sleep(delay)
@@ -58,20 +64,45 @@ async def check_api():
     logger.error("🚨 API Health Check failed after multiple attempts.")
     return False
 
+async def api_health_job():
+    """Scheduled API health check; a slot is skipped while the previous check is still running, so one attempt each."""
+    await check_api(retries=1)
+
+async def ingest_busy() -> bool:
+    """Whether maintenance should wait for ingest to quiet down (from the API's last health report)."""
+    return maintenance.ingest_busy(LAST_API_HEALTH, MAINTENANCE_BUSY_QUEUE_DEPTH, MAINTENANCE_BUSY_POOL_SATURATION)
+
+def create_jobs():
+    """The worker's scheduled jobs; each schedule can be overridden with SCHEDULE_<NAME> (`off` disables it)."""
+    return [
+        Job("check_api", api_health_job, "every 30s", limited=False, run_at_start=True),
+        Job("cleanup_temp_extracts", maintenance.cleanup_temp_extracts, "*/15 * * * *", jitter=60),
+        Job("cleanup_stale_uploads", maintenance.cleanup_uploads, "20 * * * *", jitter=300),
+        Job("warm_caches", maintenance.warm_caches, "*/10 * * * *", jitter=60, timeout=120, defer_when_busy=True),
+        Job("refresh_stats", maintenance.refresh_stats, "40 * * * *", jitter=300, defer_when_busy=True),
+        Job("vacuum_analyze", maintenance.vacuum_analyze, "15 4 * * *", jitter=900, defer_when_busy=True),
+        Job("maintain_indexes", maintenance.maintain_indexes, "45 4 * * 0", jitter=900, defer_when_busy=True),
+        Job("prune_change_log", maintenance.prune_change_log, "50 * * * *", jitter=300),
+        Job("collect_blobs", maintenance.collect_blobs, "30 3 * * *", jitter=900, defer_when_busy=True),
+    ]
+
 async def worker_loop():
-    """Main worker loop with controlled shutdown."""
-    global RUNNING
+    """Main worker loop: run the scheduled jobs until shutdown."""
     logger.info("🚀 Worker started...")
 
-    while RUNNING:
-        healthy = await check_api()
-        retry_delay = 30 if healthy else 10  # Adjust retry delay based on API status
-        await asyncio.sleep(retry_delay)
+    try:
+        start_http_server(BACKEND_PORT)
+        logger.info(f"📈 Worker metrics served on port {BACKEND_PORT}")
+    except OSError as e:
+        logger.warning(f"⚠️ Could not serve worker metrics on port {BACKEND_PORT}: {e}")
+
+    scheduler = Scheduler(create_jobs(), is_busy=ingest_busy)
+    await scheduler.run(lambda: RUNNING)
 
     logger.info("🛑 Worker stopped.")
 
 def graceful_shutdown(signum, frame):
-    """Handles graceful shutdown on SIGTERM/SIGINT."""
+    """Handles graceful shutdown on SIGTERM/SIGINT (running jobs get a grace period to finish)."""
     global RUNNING
     logger.warning("⚠️ Received shutdown signal. Stopping worker...")
     RUNNING = False
@@ -1,14 +1,21 @@
 import os
 import psycopg2
-from psycopg2 import pool, OperationalError, errors
+from psycopg2 import pool, OperationalError
 from loguru import logger
 from contextlib import contextmanager
 from dotenv import load_dotenv
 import time
+import threading
+from src.services.metrics import observe_db_pool, DB_POOL_EXHAUSTED
+from src.logging_config import DEBUG_LOGGING
 
 # Load environment variables
 load_dotenv()
 
+# Storage backend: "postgres" (default) or "sqlite" for small single-node installs
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "postgres").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "/app/data/clonehero.db")  # Keep outside the synced content folder
+
 # Database Configuration
 DB_URL = os.getenv("DB_URL")  # Use full connection string if available
 DB_HOST = os.getenv("DB_HOST", "clonehero_db")
@@ -17,8 +24,15 @@ DB_USER = os.getenv("DB_USER", "clonehero")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "clonehero")
 DB_PORT = os.getenv("DB_PORT", "5432")
 
-# Database connection pool
+# Connections per process: request threads, the health prober, index rebuilds and scheduler jobs all share them
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", 10))
+# How long to wait for a free connection before giving up (psycopg2's pool itself fails at once when full)
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))
+
+# Database connection pool (thread-safe: connections are taken from worker threads as well as the event loop)
 db_pool = None
+# One slot per pooled connection; callers queue here instead of hitting PoolError
+pool_slots = threading.BoundedSemaphore(DB_POOL_MAX)
 
 def create_db_pool(retries=5, delay=5):
     """Creates a database connection pool with retry logic."""
@@ -27,12 +41,12 @@ def create_db_pool(retries=5, delay=5):
         try:
             if DB_URL:
                 logger.info("🔗 Using DB_URL for connection.")
-                db_pool = pool.SimpleConnectionPool(minconn=1, maxconn=10, dsn=DB_URL)
+                db_pool = pool.ThreadedConnectionPool(minconn=1, maxconn=DB_POOL_MAX, dsn=DB_URL)
             else:
                 logger.info("🔗 Using individual DB settings for connection.")
-                db_pool = pool.SimpleConnectionPool(
+                db_pool = pool.ThreadedConnectionPool(
                     minconn=1,
-                    maxconn=10,
+                    maxconn=DB_POOL_MAX,
                     host=DB_HOST,
                     database=DB_NAME,
                     user=DB_USER,
@@ -48,19 +62,43 @@ def create_db_pool(retries=5, delay=5):
     logger.critical("❌ Failed to initialize database pool after retries!")
     db_pool = None  # Prevent errors when calling get_connection()
 
-create_db_pool()
+def close_db_pool():
+    """Close every pooled connection (the gunicorn master does this before forking workers)."""
+    global db_pool
+    if db_pool is not None:
+        db_pool.closeall()
+        db_pool = None
+        logger.info("🔒 Database connection pool closed.")
+
+if STORAGE_BACKEND == "postgres":
+    create_db_pool()
+
+def create_connection():
+    """Open a dedicated connection outside the pool (for long-lived LISTEN sessions)."""
+    if DB_URL:
+        return psycopg2.connect(dsn=DB_URL)
+    return psycopg2.connect(host=DB_HOST, database=DB_NAME, user=DB_USER, password=DB_PASSWORD, port=DB_PORT)
 
 @contextmanager
 def get_connection():
-    """Context manager for safely acquiring and releasing a database connection."""
+    """
+    Context manager for safely acquiring and releasing a database connection. Waits up to
+    DB_POOL_TIMEOUT seconds for a free connection, then raises PoolError.
+    """
     if db_pool is None:
         logger.error("❌ Database pool is not initialized.")
         raise RuntimeError("Database pool is unavailable.")
-    
+
+    if not pool_slots.acquire(timeout=DB_POOL_TIMEOUT):
+        DB_POOL_EXHAUSTED.inc()
+        raise pool.PoolError(f"no free connection after {DB_POOL_TIMEOUT}s (DB_POOL_MAX={DB_POOL_MAX})")
+
     conn = None
     try:
         conn = db_pool.getconn()
-        logger.debug("🔗 Database connection acquired.")
+        observe_db_pool(db_pool)
+        if DEBUG_LOGGING:
+            logger.debug("🔗 Database connection acquired.")
         yield conn
     except OperationalError as e:
         logger.error(f"⚠️ Database connection error: {e}")
@@ -68,29 +106,16 @@ def get_connection():
     finally:
         if conn:
             db_pool.putconn(conn)
-            logger.debug("🔓 Database connection released.")
-
-def execute_sql_file(sql_file: str):
-    """Executes an SQL file with better error handling."""
-    try:
-        with open(sql_file, "r", encoding="utf-8") as f:
-            sql_commands = f.read().strip()
-            if not sql_commands:
-                logger.warning(f"⚠️ Skipping empty SQL file: {sql_file}")
-                return
-        
-        with get_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(sql_commands)
-            conn.commit()
-            logger.info(f"✅ Successfully executed SQL file: {sql_file}")
-    except (OperationalError, errors.DatabaseError) as e:
-        logger.error(f"❌ Error executing SQL file {sql_file}: {e}")
+            observe_db_pool(db_pool)
+            if DEBUG_LOGGING:
+                logger.debug("🔓 Database connection released.")
+        pool_slots.release()
 
 def init_db():
-    """Initializes the database schema and triggers."""
+    """Apply pending schema migrations (src/sql/migrations/postgres) under an advisory lock."""
+    from src.services.migrations import PostgresMigrationRunner, run_migrations  # Import inside function to prevent circular imports
     logger.info("🚀 Initializing database...")
-    execute_sql_file("/app/src/sql/schema.sql")
+    run_migrations(PostgresMigrationRunner(create_connection()))
     logger.success("🎉 Database initialization completed successfully.")
 
 if __name__ == "__main__":
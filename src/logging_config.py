@@ -0,0 +1,120 @@
+import os
+import sys
+import json
+import random
+import traceback
+from pathlib import Path
+from typing import Dict, Any, Union
+from loguru import logger
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+LOG_DIR = Path(os.getenv("LOG_DIR", "logs"))
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_CONSOLE_LEVEL = os.getenv("LOG_CONSOLE_LEVEL", "INFO").upper()
+LOG_FILE_SIZE = os.getenv("LOG_FILE_SIZE", "10MB")
+LOG_COMPRESSION = os.getenv("LOG_COMPRESSION", "zip")
+# "json" writes one object per line to the log file (for Loki/Elasticsearch/jq); "text" keeps loguru's format
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+
+# Successful requests are logged at this rate; errors and slow requests are always logged.
+# Per-route overrides: "GET /songs/suggest=0.01,/health=0" (method optional, route = path template)
+LOG_REQUEST_SAMPLE_RATE = float(os.getenv("LOG_REQUEST_SAMPLE_RATE", 0.1))
+LOG_REQUEST_SAMPLE_ROUTES = os.getenv("LOG_REQUEST_SAMPLE_ROUTES", "/health=0,/health/live=0,/health/ready=0,/metrics=0")
+LOG_SLOW_REQUEST_MS = float(os.getenv("LOG_SLOW_REQUEST_MS", 1000))
+
+# Checked by hot paths before building debug messages, so disabled debug logging costs one attribute read
+DEBUG_LOGGING = LOG_LEVEL in ("DEBUG", "TRACE")
+
+TEXT_FORMAT = "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+
+
+def parse_sample_routes(spec: str) -> Dict[str, float]:
+    """Parse `route=rate` pairs; keys are "METHOD /template" or "/template"."""
+    rates = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        route, rate = item.rsplit("=", 1)
+        rates[route.strip()] = float(rate)
+    return rates
+
+
+SAMPLE_ROUTES = parse_sample_routes(LOG_REQUEST_SAMPLE_ROUTES)
+
+
+def serialize_record(record: Dict[str, Any]) -> str:
+    """Render a log record as a compact JSON line."""
+    payload = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "message": record["message"],
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "process": record["process"].id,
+        **{key: value for key, value in record["extra"].items() if key != "serialized"},
+    }
+    if record["exception"]:
+        exc_type, exc_value, exc_traceback = record["exception"]
+        payload["exception"] = "".join(traceback.format_exception(exc_type, exc_value, exc_traceback))
+    return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+def json_format(record: Dict[str, Any]) -> str:
+    """Loguru format function for the JSON file sink."""
+    record["extra"]["serialized"] = serialize_record(record)
+    return "{extra[serialized]}\n"
+
+
+def parse_retention(retention: str) -> Union[int, str]:
+    """Loguru retention: a bare number keeps that many rotated files, anything else is a duration ("7 days")."""
+    retention = retention.strip()
+    return int(retention) if retention.isdigit() else retention
+
+
+def setup_logging(file_name: str, retention: str = "7 days", console: bool = True):
+    """
+    Replace loguru's default (synchronous stderr) handler with queued sinks: records are formatted
+    on the calling thread and written by a background thread, so file I/O never blocks a request.
+    """
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    logger.remove()
+    logger.add(
+        LOG_DIR / file_name,
+        level=LOG_LEVEL,
+        format=json_format if LOG_FORMAT == "json" else TEXT_FORMAT,
+        rotation=LOG_FILE_SIZE,
+        retention=parse_retention(os.getenv("LOG_RETENTION", retention)),
+        compression=LOG_COMPRESSION,
+        enqueue=True,
+    )
+    if console:
+        logger.add(sys.stdout, level=LOG_CONSOLE_LEVEL, format=TEXT_FORMAT, enqueue=True)
+
+
+def request_sample_rate(method: str, route: str) -> float:
+    """Sampling rate for a route's successful requests."""
+    rate = SAMPLE_ROUTES.get(f"{method} {route}")
+    if rate is None:
+        rate = SAMPLE_ROUTES.get(route, LOG_REQUEST_SAMPLE_RATE)
+    return rate
+
+
+def log_request(method: str, route: str, path: str, status_code: int, duration: float):
+    """Log a finished request: always for errors and slow requests, sampled otherwise."""
+    duration_ms = duration * 1000
+    if status_code < 400 and duration_ms < LOG_SLOW_REQUEST_MS:
+        rate = request_sample_rate(method, route)
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            return
+
+    log = logger.bind(method=method, route=route, path=path, status=status_code, duration_ms=round(duration_ms, 2))
+    if status_code >= 500:
+        log.error(f"📤 {method} {path} - {status_code} [{duration_ms:.1f}ms]")
+    elif status_code >= 400 or duration_ms >= LOG_SLOW_REQUEST_MS:
+        log.warning(f"📤 {method} {path} - {status_code} [{duration_ms:.1f}ms]")
+    else:
+        log.info(f"📤 {method} {path} - {status_code} [{duration_ms:.1f}ms]")
@@ -1,47 +1,62 @@
 import streamlit as st
 from loguru import logger
 import requests
-from src.utils import display_exception, API_URL
+from src.utils import (
+    upload_file_chunked,
+    display_exception, API_URL, fetch_content_files, fetch_thumbnail,
+    delete_content_file, content_offset, content_pagination
+)
 
 # Constants
 FILE_EXTENSIONS = {
     "Image": ["png", "jpg", "jpeg", "zip", "rar"],
     "Video": ["webm", "mp4", "avi", "mpeg", "zip", "rar"]
 }
+PAGE_SIZE = 12  # Backgrounds per page
+GRID_COLUMNS = 3
 
-def fetch_uploaded_backgrounds(bg_type):
-    """Fetch previously uploaded backgrounds from the API."""
-    try:
-        response = requests.get(f"{API_URL}/list_content/?content_type={bg_type}", timeout=30)
-        response.raise_for_status()
-        return response.json().get("files", [])
-    except requests.RequestException as e:
-        logger.error(f"Failed to fetch {bg_type} backgrounds: {e}")
-        return []
+def background_content_type(bg_type):
+    """Map the UI background type to the API content type."""
+    return "image_backgrounds" if bg_type == "Image" else "video_backgrounds"
+
+def display_backgrounds(bg_type):
+    """Show one page of existing backgrounds as a thumbnail grid."""
+    content_type = background_content_type(bg_type)
+    search = st.text_input(f"🔍 Filter {bg_type.lower()} backgrounds", key=f"{content_type}_search").strip()
+    listing = fetch_content_files(content_type, search, content_offset(content_type, PAGE_SIZE), PAGE_SIZE)
+
+    if not listing["items"]:
+        st.info(f"No {bg_type.lower()} backgrounds found.")
+        return
+
+    columns = st.columns(GRID_COLUMNS)
+    for i, item in enumerate(listing["items"]):
+        with columns[i % GRID_COLUMNS]:
+            thumbnail = fetch_thumbnail(item["thumbnail_url"]) if item.get("thumbnail_url") else None
+            if thumbnail:
+                st.image(thumbnail, use_container_width=True)
+            st.caption(f"`{item['name']}` · {item['size_bytes'] / (1024 * 1024):.1f} MB")
+            if st.button("🗑️ Delete", key=f"delete_{content_type}_{item['name']}"):
+                if delete_content_file(content_type, item["name"]):
+                    st.success(f"🗑️ Deleted `{item['name']}` successfully!")
+                    st.rerun()
+                else:
+                    st.error(f"Failed to delete `{item['name']}`. Please try again.")
+
+    content_pagination(content_type, listing["total"], PAGE_SIZE)
 
 def upload_background(uploaded_file, bg_type):
     """Handle background upload and provide UI feedback."""
     try:
         logger.info(f"Uploading {bg_type} background: {uploaded_file.name}")
-        files = {"file": uploaded_file}
-        data = {"content_type": "image_backgrounds" if bg_type == "Image" else "video_backgrounds"}
-
-        with st.spinner("Uploading..."):
-            response = requests.post(
-                f"{API_URL}/upload_content/", files=files, data=data, timeout=60
-            )
+        resp_json = upload_file_chunked(uploaded_file, background_content_type(bg_type), "Uploading background")
 
-        if response.status_code == 200:
-            resp_json = response.json()
-            if "error" in resp_json:
-                st.error(f"Upload failed: {resp_json['error']}")
-                logger.error(f"Server error: {resp_json['error']}")
-            else:
-                st.success("✅ Background uploaded successfully!")
-                st.rerun()  # Refresh UI to show newly uploaded backgrounds
+        if "error" in resp_json:
+            st.error(f"Upload failed: {resp_json['error']}")
+            logger.error(f"Upload failed for {uploaded_file.name}: {resp_json['error']}")
         else:
-            st.error(f"Upload failed: {response.text}")
-            logger.error(f"Upload failed for {uploaded_file.name}, Status Code: {response.status_code}")
+            st.success("✅ Background uploaded successfully!")
+            st.rerun()  # Refresh UI to show newly uploaded backgrounds
     except Exception as e:
         display_exception(e, f"Error uploading {bg_type} background")
 
@@ -67,10 +82,4 @@ def backgrounds_page():
 
             # Display Existing Backgrounds
             st.write(f"📂 **Existing {bg_type} Backgrounds**")
-            uploaded_backgrounds = fetch_uploaded_backgrounds(bg_type)
-
-            if uploaded_backgrounds:
-                for bg in uploaded_backgrounds:
-                    st.markdown(f"- `{bg}`")
-            else:
-                st.info(f"No {bg_type.lower()} backgrounds found.")
\ No newline at end of file
+            display_backgrounds(bg_type)
\ No newline at end of file
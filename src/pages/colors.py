@@ -1,54 +1,36 @@
 import streamlit as st
 from loguru import logger
 import requests
-from src.utils import display_exception, API_URL
+from src.utils import (
+    upload_file_chunked,
+    display_exception, API_URL, fetch_content_files, delete_content_file, content_offset, content_pagination
+)
 
 # Allowed file types
 ALLOWED_EXTENSIONS = ["ini", "zip", "rar"]
-
-def fetch_uploaded_colors():
-    """Fetch previously uploaded color profiles from the API."""
-    try:
-        response = requests.get(f"{API_URL}/list_content/?content_type=colors", timeout=30)
-        response.raise_for_status()
-        return response.json().get("files", [])
-    except requests.RequestException as e:
-        logger.error(f"Failed to fetch color profiles: {e}")
-        return []
+PAGE_SIZE = 25  # Color profiles per page
 
 def upload_color_profile(uploaded_file):
     """Handle color profile upload and provide UI feedback."""
     try:
         logger.info(f"Uploading color profile: {uploaded_file.name}")
-        files = {"file": uploaded_file}
-        data = {"content_type": "colors"}
-
-        with st.spinner("Uploading..."):
-            response = requests.post(f"{API_URL}/upload_content/", files=files, data=data, timeout=60)
+        resp_json = upload_file_chunked(uploaded_file, "colors", "Uploading color profile")
 
-        if response.status_code == 200:
-            resp_json = response.json()
-            if "error" in resp_json:
-                st.error(f"Upload failed: {resp_json['error']}")
-                logger.error(f"Server error: {resp_json['error']}")
-            else:
-                st.success("✅ Color profile uploaded successfully!")
-                st.rerun()  # Refresh UI to show newly uploaded profiles
+        if "error" in resp_json:
+            st.error(f"Upload failed: {resp_json['error']}")
+            logger.error(f"Upload failed for {uploaded_file.name}: {resp_json['error']}")
         else:
-            st.error(f"Upload failed: {response.text}")
-            logger.error(f"Upload failed for {uploaded_file.name}, Status Code: {response.status_code}")
+            st.success("✅ Color profile uploaded successfully!")
+            st.rerun()  # Refresh UI to show newly uploaded profiles
     except Exception as e:
         display_exception(e, "Error uploading color profile")
 
 def delete_color_profile(profile_name):
     """Delete a color profile via API request."""
-    try:
-        response = requests.delete(f"{API_URL}/delete_content/?content_type=colors&file={profile_name}", timeout=30)
-        response.raise_for_status()
+    if delete_content_file("colors", profile_name):
         st.success(f"🗑️ Deleted `{profile_name}` successfully!")
         st.rerun()
-    except requests.RequestException as e:
-        logger.error(f"Failed to delete {profile_name}: {e}")
+    else:
         st.error(f"Failed to delete `{profile_name}`. Please try again.")
 
 def colors_page():
@@ -65,7 +47,9 @@ def colors_page():
 
     # Display Existing Color Profiles
     st.write("📂 **Existing Color Profiles**")
-    uploaded_profiles = fetch_uploaded_colors()
+    search = st.text_input("🔍 Filter color profiles", key="colors_search").strip()
+    listing = fetch_content_files("colors", search, content_offset("colors", PAGE_SIZE), PAGE_SIZE)
+    uploaded_profiles = [item["name"] for item in listing["items"]]
 
     if uploaded_profiles:
         for profile in uploaded_profiles:
@@ -75,5 +59,6 @@ def colors_page():
             with col2:
                 if st.button("🗑️ Delete", key=f"delete_{hash(profile)}"):
                     delete_color_profile(profile)
+        content_pagination("colors", listing["total"], PAGE_SIZE)
     else:
         st.info("No color profiles found.")
\ No newline at end of file
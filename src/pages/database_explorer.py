@@ -1,27 +1,118 @@
+import time
 import streamlit as st
 import requests
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from loguru import logger
-from src.utils import API_URL
+from src.utils import (
+    API_URL, display_waveform, display_song_metadata, SONG_LIST_FIELDS,
+    api_get_json, get_api_session, get_etag_cache
+)
 
 # Constants
 PAGE_SIZE = 10  # Number of songs per page
+MAX_CACHED_PAGES = 50  # Pages kept per browser session
+PAGE_CACHE_TTL = 60  # Seconds before a cached page is fetched again
+PREFETCH_WORKERS = 4
+SUGGESTION_LIMIT = 6
 
-@st.cache_data(ttl=30)
-def fetch_songs(search_query=None, limit=PAGE_SIZE, offset=0):
-    """Fetch all songs from the database with optional search filtering and pagination."""
+@st.cache_resource
+def get_prefetch_executor():
+    """Shared thread pool that loads the next page while the current one is being read."""
+    return ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="explorer-prefetch")
+
+def fetch_songs(search_query=None, after_id=None, limit=PAGE_SIZE, session=None, cache=None):
+    """Fetch one page of songs after a keyset cursor and return (songs, next_cursor)."""
+    params = {
+        "search": search_query.strip() if search_query else None,
+        "limit": limit,
+        "after_id": after_id,
+        "fields": SONG_LIST_FIELDS
+    }
+    data = api_get_json("songs/", params=params, session=session, cache=cache)
+    return data.get("songs", []), data.get("next_cursor")
+
+def get_page_cache():
+    """Return this session's LRU of fetched pages, keyed by (search, cursor)."""
+    if "explorer_page_cache" not in st.session_state:
+        st.session_state.explorer_page_cache = OrderedDict()
+        st.session_state.explorer_prefetches = {}
+    return st.session_state.explorer_page_cache
+
+def clear_page_cache():
+    """Drop cached and in-flight pages (after a delete or a new search)."""
+    get_page_cache().clear()
+    st.session_state.explorer_prefetches = {}
+
+def get_page(search_query, cursor):
+    """Return a page from the cache, a finished prefetch, or the API, in that order."""
+    cache = get_page_cache()
+    key = (search_query, cursor)
+    entry = cache.get(key)
+
+    if entry is None or time.monotonic() - entry["fetched_at"] > PAGE_CACHE_TTL:
+        future = st.session_state.explorer_prefetches.pop(key, None)
+        try:
+            songs, next_cursor = future.result() if future else fetch_songs(search_query, cursor)
+        except Exception as e:
+            logger.error(f"❌ Failed to fetch songs: {e}")
+            return [], None
+        entry = {"songs": songs, "next_cursor": next_cursor, "fetched_at": time.monotonic()}
+        cache[key] = entry
+
+    cache.move_to_end(key)
+    while len(cache) > MAX_CACHED_PAGES:
+        cache.popitem(last=False)
+    return entry["songs"], entry["next_cursor"]
+
+def prefetch_page(search_query, cursor):
+    """Start loading a page in the background unless it is already cached or in flight."""
+    key = (search_query, cursor)
+    if cursor is None or key in get_page_cache() or key in st.session_state.explorer_prefetches:
+        return
+
+    # The worker thread has no Streamlit context, so hand it the shared session and ETag cache
+    st.session_state.explorer_prefetches[key] = get_prefetch_executor().submit(
+        fetch_songs, search_query, cursor, PAGE_SIZE, get_api_session(), get_etag_cache()
+    )
+
+def fetch_suggestions(prefix):
+    """Fetch typeahead completions for the search box."""
     try:
-        params = {"search": search_query.strip() if search_query else None, "limit": limit, "offset": offset}
-        response = requests.get(f"{API_URL}/songs/", params=params, timeout=30)
-        response.raise_for_status()
-        return response.json().get("songs", [])
+        params = {"q": prefix, "limit": SUGGESTION_LIMIT}
+        return api_get_json("songs/suggest", params=params, timeout=5).get("suggestions", [])
     except requests.RequestException as e:
-        logger.error(f"❌ Failed to fetch songs: {e}")
+        logger.warning(f"⚠️ Failed to fetch suggestions: {e}")
         return []
 
+def use_suggestion(value):
+    """Put a suggestion into the search box."""
+    st.session_state.explorer_search = value
+
+def display_suggestions(search_query):
+    """Offer completions for the current search text as one-click buttons."""
+    suggestions = [
+        suggestion for suggestion in fetch_suggestions(search_query)
+        if suggestion["value"].casefold() != search_query.casefold()
+    ]
+    if not suggestions:
+        return
+
+    columns = st.columns(len(suggestions))
+    for column, suggestion in zip(columns, suggestions):
+        with column:
+            st.button(
+                f"{suggestion['value']} ({suggestion['field']})",
+                key=f"suggestion_{suggestion['field']}_{suggestion['value']}",
+                on_click=use_suggestion,
+                args=(suggestion["value"],),
+                use_container_width=True
+            )
+
 def delete_song(song_id):
     """Delete a song from the database and return a success or error response."""
     try:
-        response = requests.delete(f"{API_URL}/songs/{song_id}", timeout=30)
+        response = get_api_session().delete(f"{API_URL}/songs/{song_id}", timeout=30)
         response.raise_for_status()
         return {"success": True}
     except requests.RequestException as e:
@@ -33,36 +124,40 @@ def database_explorer_page():
     st.title("📁 Song Database Explorer")
     st.write("Manage and explore the Clone Hero song database.")
 
-    # Initialize Session State for Pagination
-    if "page" not in st.session_state:
-        st.session_state.page = 0
+    # Pages are addressed by keyset cursors; the stack holds the cursor of every page visited
+    if "explorer_cursors" not in st.session_state:
+        st.session_state.explorer_cursors = [None]
 
     # Search and Pagination State
-    search_query = st.text_input("🔍 Search for a song (title, artist, album)", "").strip()
+    search_query = st.text_input("🔍 Search for a song (title, artist, album)", key="explorer_search").strip()
+    if search_query:
+        display_suggestions(search_query)
 
     # Reset pagination when a new search is performed
     if search_query != st.session_state.get("last_search", ""):
-        st.session_state.page = 0
+        st.session_state.explorer_cursors = [None]
         st.session_state.last_search = search_query
+        clear_page_cache()
 
     # Fetch Songs
-    songs = fetch_songs(search_query, limit=PAGE_SIZE, offset=st.session_state.page * PAGE_SIZE)
+    songs, next_cursor = get_page(search_query, st.session_state.explorer_cursors[-1])
 
     if not songs:
         st.warning("⚠️ No songs found in the database.")
         return
 
+    # Load the next page while this one is on screen so Next is served from memory
+    prefetch_page(search_query, next_cursor)
+
     # Song Listing
     for song in songs:
         with st.expander(f"🎵 {song.get('title', 'Unknown Title')} - {song.get('artist', 'Unknown Artist')}"):
             st.write(f"**Album:** {song.get('album', 'Unknown')}")
             st.write(f"**File Path:** `{song.get('file_path', 'N/A')}`")
+            display_waveform(song["id"])
 
-            # Show Metadata if available
-            metadata = song.get("metadata", {})
-            non_empty_metadata = {k: v for k, v in metadata.items() if v}  # Hide empty fields
-            if non_empty_metadata:
-                st.json(non_empty_metadata, expanded=False)
+            # Metadata is loaded on demand
+            display_song_metadata(song["id"])
 
             # Delete Button
             if st.button("🗑️ Delete", key=f"delete_{song['id']}"):
@@ -72,17 +167,18 @@ def database_explorer_page():
                     st.error(f"❌ Error deleting song: {result['error']}")
                 else:
                     st.success("✅ Song deleted successfully!")
+                    clear_page_cache()
                     st.rerun()
 
     # Pagination Controls
     col1, col3 = st.columns([1, 1])
     with col1:
-        if st.button("⬅️ Previous", disabled=st.session_state.page == 0):
-            st.session_state.page = max(st.session_state.page - 1, 0)
+        if st.button("⬅️ Previous", disabled=len(st.session_state.explorer_cursors) == 1):
+            st.session_state.explorer_cursors.pop()
             st.rerun()
     with col3:
-        if st.button("Next ➡️", disabled=len(songs) < PAGE_SIZE):
-            st.session_state.page += 1
+        if st.button("Next ➡️", disabled=next_cursor is None):
+            st.session_state.explorer_cursors.append(next_cursor)
             st.rerun()
 
     # Divider
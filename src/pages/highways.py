@@ -1,7 +1,11 @@
 import streamlit as st
 import requests
 from loguru import logger
-from src.utils import API_URL, display_exception
+from src.utils import (
+    upload_file_chunked,
+    API_URL, display_exception, fetch_content_files, fetch_thumbnail,
+    delete_content_file, content_offset, content_pagination
+)
 
 # Allowed file types
 FILE_EXTENSIONS = {
@@ -9,55 +13,33 @@ FILE_EXTENSIONS = {
     "Video": ["webm", "zip", "rar"]  # Clone Hero requires .webm for videos
 }
 
-def fetch_uploaded_highways(hw_type):
-    """Fetch previously uploaded highways from the API."""
-    try:
-        content_type = "image_highways" if hw_type == "Image" else "video_highways"
-        response = requests.get(f"{API_URL}/list_content/?content_type={content_type}", timeout=30)
-        response.raise_for_status()
-        return response.json().get("files", [])
-    except requests.RequestException as e:
-        logger.error(f"Failed to fetch {hw_type} highways: {e}")
-        return []
+PAGE_SIZE = 12  # Highways per page
+
+def highway_content_type(hw_type):
+    """Map the UI highway type to the API content type."""
+    return "image_highways" if hw_type == "Image" else "video_highways"
 
 def upload_highway(uploaded_file, hw_type):
     """Handle highway upload and provide UI feedback."""
     try:
         logger.info(f"Uploading {hw_type} highway: {uploaded_file.name}")
-        files = {"file": uploaded_file}
-        data = {"content_type": "image_highways" if hw_type == "Image" else "video_highways"}
-
-        with st.spinner("Uploading..."):
-            response = requests.post(
-                f"{API_URL}/upload_content/", files=files, data=data, timeout=60
-            )
+        resp_json = upload_file_chunked(uploaded_file, highway_content_type(hw_type), "Uploading highway")
 
-        if response.status_code == 200:
-            resp_json = response.json()
-            if "error" in resp_json:
-                st.error(f"Upload failed: {resp_json['error']}")
-                logger.error(f"Server error: {resp_json['error']}")
-            else:
-                st.success("✅ Highway uploaded successfully!")
-                st.rerun()  # Refresh UI to show newly uploaded highways
+        if "error" in resp_json:
+            st.error(f"Upload failed: {resp_json['error']}")
+            logger.error(f"Upload failed for {uploaded_file.name}: {resp_json['error']}")
         else:
-            st.error(f"Upload failed: {response.text}")
-            logger.error(f"Upload failed for {uploaded_file.name}, Status Code: {response.status_code}")
+            st.success("✅ Highway uploaded successfully!")
+            st.rerun()  # Refresh UI to show newly uploaded highways
     except Exception as e:
         display_exception(e, f"Error uploading {hw_type} highway")
 
 def delete_highway(hw_type, highway_name):
     """Delete a highway via API request."""
-    try:
-        content_type = "image_highways" if hw_type == "Image" else "video_highways"
-        response = requests.delete(
-            f"{API_URL}/delete_content/?content_type={content_type}&file={highway_name}", timeout=30
-        )
-        response.raise_for_status()
+    if delete_content_file(highway_content_type(hw_type), highway_name):
         st.success(f"🗑️ Deleted `{highway_name}` successfully!")
         st.rerun()
-    except requests.RequestException as e:
-        logger.error(f"Failed to delete {highway_name}: {e}")
+    else:
         st.error(f"Failed to delete `{highway_name}`. Please try again.")
 
 def highways_page():
@@ -83,16 +65,23 @@ def highways_page():
 
             # Display Existing Highways
             st.write(f"📂 **Existing {hw_type} Highways**")
-            uploaded_highways = fetch_uploaded_highways(hw_type)
+            content_type = highway_content_type(hw_type)
+            search = st.text_input(f"🔍 Filter {hw_type.lower()} highways", key=f"{content_type}_search").strip()
+            listing = fetch_content_files(content_type, search, content_offset(content_type, PAGE_SIZE), PAGE_SIZE)
 
-            if uploaded_highways:
-                for highway in uploaded_highways:
-                    col1, col2 = st.columns([4, 1])
+            if listing["items"]:
+                for highway in listing["items"]:
+                    col1, col2, col3 = st.columns([1, 3, 1])
                     with col1:
-                        st.markdown(f"- `{highway}`")
+                        thumbnail = fetch_thumbnail(highway["thumbnail_url"]) if highway.get("thumbnail_url") else None
+                        if thumbnail:
+                            st.image(thumbnail, use_container_width=True)
                     with col2:
-                        if st.button("🗑️ Delete", key=f"delete_{hash(highway)}"):
-                            delete_highway(hw_type, highway)
+                        st.markdown(f"- `{highway['name']}`")
+                    with col3:
+                        if st.button("🗑️ Delete", key=f"delete_{content_type}_{highway['name']}"):
+                            delete_highway(hw_type, highway["name"])
+                content_pagination(content_type, listing["total"], PAGE_SIZE)
             else:
                 st.info(f"No {hw_type.lower()} highways found.")
 
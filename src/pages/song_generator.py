@@ -1,14 +1,15 @@
+import json
 import streamlit as st
 import requests
 from loguru import logger
-from src.utils import API_URL, display_exception
+from src.utils import GENERATOR_API_URL, display_exception, get_api_session
 
 def process_song(file) -> dict:
     """Uploads a song to the backend for processing into Clone Hero format."""
     try:
         files = {"file": file}
         with st.spinner("Uploading and processing song..."):
-            response = requests.post(f"{API_URL}/process_song/", files=files, timeout=60)
+            response = get_api_session().post(f"{GENERATOR_API_URL}/process_song/", files=files, timeout=60)
         
         response.raise_for_status()
         result = response.json()
@@ -24,6 +25,45 @@ def process_song(file) -> dict:
         logger.error(f"Unexpected response format: {e}")
         return {"error": "Invalid server response format."}
 
+def process_song_batch(files, artist: str = "", album: str = "") -> dict:
+    """Uploads several songs for batch processing, showing per-file progress as it streams back."""
+    progress_bar = st.progress(0.0, text="Uploading songs...")
+    status_area = st.empty()
+    final_event = {"error": "Batch processing ended unexpectedly."}
+
+    try:
+        upload = [("files", (file.name, file, "application/octet-stream")) for file in files]
+        form = {"artist": artist, "album": album}  # Used for files without tags
+        with get_api_session().post(
+            f"{GENERATOR_API_URL}/process_songs_batch/", files=upload, data=form, stream=True, timeout=600
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                event = json.loads(line)
+                status = event.get("status")
+
+                if status in ("done", "error"):
+                    progress_bar.progress(
+                        event["completed"] / event["total"],
+                        text=f"Processed {event['completed']}/{event['total']} songs"
+                    )
+                    if status == "error":
+                        status_area.warning(f"⚠️ {event.get('song_name', 'Song')}: {event['error']}")
+                elif status == "complete":
+                    final_event = event
+                elif status == "failed":
+                    final_event = {"error": event.get("message", "Batch processing failed.")}
+
+        return final_event
+    except requests.RequestException as e:
+        logger.error(f"Failed to process song batch: {e}")
+        return {"error": str(e)}
+    except ValueError as e:
+        logger.error(f"Unexpected batch response format: {e}")
+        return {"error": "Invalid server response format."}
+
 def song_generation_page():
     """Streamlit UI for processing songs into Clone Hero format."""
     st.title("🎸 Clone Hero Song Processor")
@@ -53,7 +93,7 @@ def song_generation_page():
             notes_chart_url = result.get("notes_chart")
             if notes_chart_url:
                 try:
-                    response = requests.get(notes_chart_url, timeout=10)
+                    response = get_api_session().get(notes_chart_url, timeout=10)
                     response.raise_for_status()
                     st.download_button(
                         "⬇️ Download notes.chart",
@@ -64,6 +104,35 @@ def song_generation_page():
                 except requests.RequestException as e:
                     st.error(f"⚠️ Failed to retrieve the generated notes.chart file: {e}")
 
+    # Batch processing
+    st.header("📦 Batch Process an Album")
+    batch_files = st.file_uploader(
+        "Choose several song files or a .zip of them",
+        type=["mp3", "wav", "flac", "ogg", "zip"],
+        accept_multiple_files=True
+    )
+    batch_artist = st.text_input("Artist (for files without tags)")
+    batch_album = st.text_input("Album (for files without tags)")
+
+    if batch_files and st.button("🚀 Process Batch"):
+        result = process_song_batch(batch_files, batch_artist, batch_album)
+
+        if "error" in result:
+            st.error(f"🚨 Error processing batch: {result['error']}")
+        else:
+            st.success(f"✅ Generated {result['succeeded']} songs ({result['failed']} failed).")
+            try:
+                response = get_api_session().get(f"{GENERATOR_API_URL}{result['archive_url']}", timeout=120)
+                response.raise_for_status()
+                st.download_button(
+                    "⬇️ Download song folders (.zip)",
+                    data=response.content,
+                    file_name=f"songs_{result['batch_id']}.zip",
+                    mime="application/zip"
+                )
+            except requests.RequestException as e:
+                st.error(f"⚠️ Failed to retrieve the batch archive: {e}")
+
     st.markdown("---")
     st.subheader("📖 How It Works")
     st.write(
@@ -1,85 +1,85 @@
 import streamlit as st
 import requests
 from loguru import logger
-from src.utils import API_URL, display_exception
-import itertools
+from src.utils import (
+    API_URL, display_exception, display_waveform, display_song_metadata, SONG_LIST_FIELDS,
+    api_get_json, upload_file_chunked
+)
 
 # Constants
-PAGE_SIZE = 10  # Number of songs per page
+ARTISTS_PER_PAGE = 20  # Number of artists per library page
 ALLOWED_EXTENSIONS = ["zip", "rar"]
 MAX_FILE_SIZE_GB = 10
 MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_GB * 1024 * 1024 * 1024  # 10GB limit
 
-@st.cache_data(ttl=300)
-def fetch_songs(skip=0, limit=PAGE_SIZE):
-    """Fetch song list from the API with pagination."""
+def fetch_library_tree(after_artist=None, limit=ARTISTS_PER_PAGE):
+    """Fetch one page of the artist → album tree from the API (revalidated with its ETag)."""
     try:
-        logger.info(f"Fetching song list from API (skip={skip}, limit={limit}).")
-        response = requests.get(f"{API_URL}/content/", params={"skip": skip, "limit": limit}, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-
-        if isinstance(data, dict) and "content" in data:
-            songs = data["content"]
-        elif isinstance(data, list):
-            songs = data
-        else:
-            logger.error(f"Unexpected API response format: {data}")
-            return []
-        
-        logger.success(f"Fetched {len(songs)} songs from the database.")
-        return songs
+        logger.debug(f"Fetching library tree from API (after_artist={after_artist}, limit={limit}).")
+        return api_get_json("songs/tree", params={"after_artist": after_artist, "limit": limit})
     except requests.RequestException as e:
-        logger.error(f"Failed to fetch songs: {e}")
+        logger.error(f"Failed to fetch library tree: {e}")
         st.error("Error fetching songs. Please try again later.")
+        return {"artists": [], "next_cursor": None}
+
+def fetch_album_songs(artist, album):
+    """Fetch the songs of a single album, only once the album is expanded."""
+    try:
+        params = {"artist": artist, "album": album, "fields": SONG_LIST_FIELDS}
+        return api_get_json("songs/tree/album", params=params).get("songs", [])
+    except requests.RequestException as e:
+        logger.error(f"Failed to fetch songs for {artist} - {album}: {e}")
+        st.error("Error fetching album songs. Please try again later.")
         return []
 
+def display_album(artist, album):
+    """Display an album header; its songs are loaded lazily when the album is expanded."""
+    album_name = album.get("album") or "Unknown Album"
+    expanded = st.toggle(
+        f"📀 {album_name} ({album['song_count']} songs)", key=f"album_{artist}_{album_name}"
+    )
+    if not expanded:
+        return
+
+    for song in fetch_album_songs(artist, album.get("album")):
+        with st.container():
+            st.markdown(f"**🎵 Title:** {song.get('title', 'N/A')}")
+            st.write(f"📁 **Folder Path:** `{song.get('file_path', 'N/A')}`")
+            display_waveform(song["id"])
+            display_song_metadata(song["id"])
+        st.write("---")
+
 def display_songs():
-    """Display songs grouped by artist and album with pagination."""
-    songs = fetch_songs(st.session_state.page * PAGE_SIZE, PAGE_SIZE)
-    if not songs:
+    """Display songs grouped by artist and album, paginated by artist."""
+    # Cursor stack: the last entry is the cursor for the current page
+    if "library_cursors" not in st.session_state:
+        st.session_state.library_cursors = [None]
+
+    tree = fetch_library_tree(st.session_state.library_cursors[-1])
+    if not tree["artists"]:
         st.info("No songs found in the library.")
         return
 
-    total_songs = len(songs)
-    total_pages = (total_songs + PAGE_SIZE - 1) // PAGE_SIZE
-
-    # Pagination State
-    if "page" not in st.session_state:
-        st.session_state.page = 0
+    page = len(st.session_state.library_cursors)
 
     # Pagination Controls
     col1, col2, col3 = st.columns([1, 2, 1])
     with col1:
-        if st.button("⬅️ Previous", disabled=st.session_state.page == 0):
-            st.session_state.page = max(st.session_state.page - 1, 0)
+        if st.button("⬅️ Previous", disabled=page == 1):
+            st.session_state.library_cursors.pop()
             st.rerun()
 
     with col3:
-        if st.button("Next ➡️", disabled=(st.session_state.page + 1) >= total_pages):
-            st.session_state.page += 1
+        if st.button("Next ➡️", disabled=tree["next_cursor"] is None):
+            st.session_state.library_cursors.append(tree["next_cursor"])
             st.rerun()
 
-    st.subheader(f"📚 Song Library (Page {st.session_state.page + 1}/{total_pages})")
-    
-    songs.sort(key=lambda s: (s.get('artist', 'N/A').lower(),
-                              s.get('album', 'N/A').lower(),
-                              s.get('title', 'N/A').lower()))
-    
-    for artist, artist_group in itertools.groupby(songs, key=lambda s: s.get('artist', 'N/A')):
-        st.markdown(f"## 🎸 {artist}")
-        artist_songs = list(artist_group)
-        for album, album_group in itertools.groupby(artist_songs, key=lambda s: s.get('album', 'N/A')):
-            st.markdown(f"### 📀 {album}")
-            for song in album_group:
-                with st.container():
-                    st.markdown(f"**🎵 Title:** {song.get('title', 'N/A')}")
-                    st.write(f"📁 **Folder Path:** `{song.get('file_path', 'N/A')}`")
-                    metadata = song.get("metadata", {})
-                    if metadata:
-                        with st.expander("🔍 Show Metadata"):
-                            st.json(metadata, expanded=False)
-                st.write("---")
+    st.subheader(f"📚 Song Library (Page {page})")
+
+    for artist in tree["artists"]:
+        st.markdown(f"## 🎸 {artist['artist']}")
+        for album in artist["albums"]:
+            display_album(artist["artist"], album)
 
 def upload_song():
     """Handles song upload UI."""
@@ -91,29 +91,24 @@ def upload_song():
             st.error(f"File size exceeds {MAX_FILE_SIZE_GB}GB limit.")
             return
         
+        # The uploader keeps the file across reruns; only send each file once
+        upload_key = f"uploaded_{uploaded_file.file_id}"
+        if st.session_state.get(upload_key):
+            st.success(f"✅ {uploaded_file.name} uploaded successfully!")
+            return
+
         logger.info(f"Uploading file: {uploaded_file.name}")
-        
-        files = {"file": (uploaded_file.name, uploaded_file, "application/octet-stream")}
-        data = {"content_type": "songs"}  # Ensure this matches the API expectation
-
-        with st.spinner("Uploading song..."):
-            try:
-                response = requests.post(f"{API_URL}/upload_content/", files=files, data=data, timeout=300)
-                
-                if response.status_code == 200:
-                    resp_json = response.json()
-                    if "error" in resp_json:
-                        st.error(f"Upload error: {resp_json['error']}")
-                        logger.error(f"Upload error: {resp_json['error']}")
-                    else:
-                        st.success("✅ Song uploaded successfully!")
-                        logger.success(f"Successfully uploaded: {uploaded_file.name}")
-                        st.rerun()
-                else:
-                    st.error(f"Upload failed: {response.text}")
-                    logger.error(f"Upload failed: {uploaded_file.name}, Status Code: {response.status_code}")
-            except Exception as e:
-                display_exception(e, f"An error occurred while uploading {uploaded_file.name}")
+        try:
+            resp_json = upload_file_chunked(uploaded_file, "songs", "Uploading song")
+            if "error" in resp_json:
+                st.error(f"Upload error: {resp_json['error']}")
+                logger.error(f"Upload error: {resp_json['error']}")
+            else:
+                st.session_state[upload_key] = True
+                logger.success(f"Successfully uploaded: {uploaded_file.name}")
+                st.rerun()
+        except Exception as e:
+            display_exception(e, f"An error occurred while uploading {uploaded_file.name}")
 
 def songs_page():
     """Streamlit UI for managing Clone Hero songs."""
@@ -1,5 +1,8 @@
-from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Request
+from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Request, Response, Query
+from fastapi.responses import FileResponse
 import os
+import time
+import asyncio
 import aiofiles
 import tempfile
 import uuid
@@ -7,9 +10,20 @@ import httpx
 from loguru import logger
 from dotenv import load_dotenv
 from typing import Dict, Any
+from pathlib import Path
 from pydantic import BaseModel
-from src.services.content_manager import process_and_store_content
-from src.services.content_utils import extract_content, list_all_content
+from src.services.content_manager import fetch_content_from_db, count_content
+from src.services.database_explorer import parse_fields, get_library_version
+from src.services.content_utils import extract_content, get_final_directory, CONTENT_EXTENSIONS
+from src.services.content_index import get_directory_index
+from src.services.blob_store import storage_report
+from src.services.asset_thumbnails import ensure_thumbnail, delete_asset, thumbnail_url_for, THUMBNAIL_CONTENT_FOLDERS
+from src.services.http_cache import make_etag, is_not_modified, library_etag, set_etag_headers, not_modified
+from src.services.metrics import observe_stage, INGEST_STAGE_DURATION, INGEST_BYTES
+from src.services.tracing import start_trace, span, summarize_trace
+from src.services.upload_sessions import (
+    create_upload_session, get_upload_session, append_upload_chunk, claim_upload_file, delete_upload_session
+)
 
 # Load environment variables
 load_dotenv()
@@ -17,8 +31,16 @@ load_dotenv()
 router = APIRouter()
 
 # Allowed content types
-ALLOWED_CONTENT_TYPES = {"backgrounds", "colors", "highways", "songs"}
-ALLOWED_EXTENSIONS = {".zip", ".rar", ".png", ".jpg"}
+ALLOWED_CONTENT_TYPES = {
+    "backgrounds", "image_backgrounds", "video_backgrounds",
+    "colors",
+    "highways", "image_highways", "video_highways",
+    "songs",
+}
+ALLOWED_EXTENSIONS = {".zip", ".rar", ".png", ".jpg", ".jpeg", ".webm", ".mp4", ".avi", ".mpeg", ".ini"}
+
+# Thumbnail URLs are versioned, so browsers and proxies may keep them for a year
+THUMBNAIL_CACHE_CONTROL = "public, max-age=31536000, immutable"
 
 # File size limits
 MAX_FILE_SIZE_GB = int(os.getenv("MAX_FILE_SIZE_GB", 10))
@@ -31,6 +53,18 @@ def get_temp_file(file_name: str) -> str:
     return os.path.join(temp_dir, f"{uuid.uuid4().hex}_{file_name}")
 
 
+def format_ingest_result(result) -> Dict[str, Any]:
+    """Song archives return the list of stored and skipped songs; wrap it so every ingest response is a dict."""
+    if isinstance(result, list):
+        songs = [song for song in result if "duplicate_of" not in song]
+        duplicates = [song for song in result if "duplicate_of" in song]
+        message = f"✅ Stored {len(songs)} songs"
+        if duplicates:
+            message += f", skipped {len(duplicates)} duplicates"
+        return {"message": message, "songs": songs, "duplicates": duplicates}
+    return result
+
+
 def validate_file_extension(file_name: str):
     """Ensure the uploaded/downloaded file has a valid extension"""
     ext = os.path.splitext(file_name)[-1].lower()
@@ -58,41 +92,133 @@ async def upload_content(
     if content_type not in ALLOWED_CONTENT_TYPES:
         raise HTTPException(status_code=400, detail=f"Invalid content type: {content_type}")
 
-    await validate_file_size(file)
     validate_file_extension(file.filename)
     temp_file_path = get_temp_file(file.filename)
 
     logger.info(f"📤 Received upload for {content_type}, file={file.filename}")
 
-    try:
-        async with aiofiles.open(temp_file_path, "wb") as buffer:
-            while chunk := await file.read(65536):  # Read in 64KB chunks
-                await buffer.write(chunk)
-
-        logger.info(f"✅ File saved temporarily at: {temp_file_path}")
-
-        # Extract content and process files
-        result = await extract_content(temp_file_path, content_type)
+    with start_trace("upload_content", content_type=content_type, file_name=file.filename) as trace:
+        try:
+            with span("validate_file_size") as validate_span:
+                await validate_file_size(file)
+
+            with span("save_upload") as save_span, observe_stage("upload", content_type):
+                async with aiofiles.open(temp_file_path, "wb") as buffer:
+                    while chunk := await file.read(65536):  # Read in 64KB chunks
+                        await buffer.write(chunk)
+            size = os.path.getsize(temp_file_path)
+            INGEST_BYTES.labels(content_type=content_type).inc(size)
+            for stage_span in (validate_span, save_span):
+                if stage_span:
+                    stage_span.set(bytes=size)
+
+            logger.info(f"✅ File saved temporarily at: {temp_file_path}")
+
+            # Extract the archive (or move the file) and store its songs or assets
+            result = format_ingest_result(await extract_content(temp_file_path, content_type))
+            result["trace"] = summarize_trace(trace)
+            return result
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.exception(f"❌ Error processing file {file.filename}: {e}")
+            return {"status": "error", "message": "Internal Server Error"}
+
+        finally:
+            try:
+                os.remove(temp_file_path)
+                logger.info(f"🗑️ Removed temporary file: {temp_file_path}")
+            except FileNotFoundError:
+                pass
+
+class UploadSessionRequest(BaseModel):
+    file_name: str
+    content_type: str
+    size: int
+
+
+def get_upload_or_404(upload_id: str) -> Dict[str, Any]:
+    """Return an upload session or raise 404."""
+    session = get_upload_session(upload_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return session
+
+
+@router.post("/uploads/", summary="Start a Resumable Upload", tags=["Upload"])
+async def start_upload(upload: UploadSessionRequest) -> Dict[str, Any]:
+    """
+    Start a chunked upload. Send the file with `PUT /uploads/{upload_id}?offset=N` (raw bytes),
+    check progress with `GET /uploads/{upload_id}` and process it with `POST /uploads/{upload_id}/complete`.
+    """
+    if upload.content_type not in ALLOWED_CONTENT_TYPES:
+        raise HTTPException(status_code=400, detail=f"Invalid content type: {upload.content_type}")
+    validate_file_extension(upload.file_name)
+    if upload.size <= 0:
+        raise HTTPException(status_code=400, detail="Upload size must be positive")
+    if upload.size > MAX_FILE_SIZE_BYTES:
+        raise HTTPException(status_code=413, detail=f"File too large (max {MAX_FILE_SIZE_GB}GB)")
+
+    return await asyncio.to_thread(create_upload_session, upload.file_name, upload.content_type, upload.size)
+
+
+@router.get("/uploads/{upload_id}", summary="Get Upload Progress", tags=["Upload"])
+async def get_upload(upload_id: str) -> Dict[str, Any]:
+    """Return how many bytes of an upload have been received, so an interrupted client can resume."""
+    return get_upload_or_404(upload_id)
+
+
+@router.put("/uploads/{upload_id}", summary="Upload a Chunk", tags=["Upload"])
+async def upload_chunk(upload_id: str, request: Request, offset: int = Query(..., ge=0)) -> Dict[str, Any]:
+    """Append the request body at `offset`; the body is streamed to disk without being buffered."""
+    result = await append_upload_chunk(upload_id, offset, request.stream())
+    if "error" in result:
+        detail = {"message": result["error"], "offset": result.get("offset")}
+        raise HTTPException(status_code=result["status_code"], detail=detail)
+    return result
+
+
+@router.post("/uploads/{upload_id}/complete", summary="Process a Finished Upload", tags=["Upload"])
+async def complete_upload(upload_id: str) -> Dict[str, Any]:
+    """Extract and store a fully received upload."""
+    session = get_upload_or_404(upload_id)
+    if session["offset"] != session["size"]:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Upload is incomplete", "offset": session["offset"], "size": session["size"]}
+        )
+
+    file_path = await asyncio.to_thread(claim_upload_file, upload_id)
+    if not file_path:
+        raise HTTPException(status_code=409, detail="Upload is already being processed")
+
+    # The upload stage of a chunked upload spans from session start to completion
+    INGEST_STAGE_DURATION.labels(stage="upload", content_type=session["content_type"]).observe(
+        time.time() - session["created_at"]
+    )
+    INGEST_BYTES.labels(content_type=session["content_type"]).inc(session["size"])
+
+    logger.info(f"📤 Processing upload {upload_id} for {session['content_type']}, file={session['file_name']}")
+    with start_trace(
+        "complete_upload", upload_id=upload_id, content_type=session["content_type"],
+        file_name=session["file_name"], bytes=session["size"]
+    ) as trace:
+        try:
+            result = format_ingest_result(await extract_content(str(file_path), session["content_type"]))
+            result["trace"] = summarize_trace(trace)
+            return result
+        finally:
+            file_path.unlink(missing_ok=True)
 
-        # If songs, process further
-        if content_type == "songs":
-            result = await process_and_store_content(temp_file_path, content_type)
 
-        if not isinstance(result, dict):  # Ensure result is a dictionary
-            raise ValueError(f"Invalid response format from processing functions: {result}")
+@router.delete("/uploads/{upload_id}", summary="Abort an Upload", tags=["Upload"])
+async def abort_upload(upload_id: str) -> Dict[str, Any]:
+    """Abort an upload and delete the bytes received so far."""
+    if not await asyncio.to_thread(delete_upload_session, upload_id):
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return {"message": "Upload aborted", "upload_id": upload_id}
 
-        return result
-
-    except Exception as e:
-        logger.exception(f"❌ Error processing file {file.filename}: {e}")
-        return {"status": "error", "message": "Internal Server Error"}
-    
-    finally:
-        try:
-            os.remove(temp_file_path)
-            logger.info(f"🗑️ Removed temporary file: {temp_file_path}")
-        except FileNotFoundError:
-            pass
 
 class URLDownloadRequest(BaseModel):
     url: str
@@ -120,13 +246,10 @@ async def download_and_extract(request: URLDownloadRequest) -> Dict[str, Any]:
 
         logger.info(f"✅ File downloaded to: {temp_file_path}")
 
-        # Extract content
-        result = await extract_content(temp_file_path, "songs")
-
-        # If songs, process them into the database
-        if "songs" in request.url:
-            result = await process_and_store_content(temp_file_path, "songs")
-
+        # Extract the archive and store its songs
+        with start_trace("download_and_extract", url=request.url, bytes=os.path.getsize(temp_file_path)) as trace:
+            result = format_ingest_result(await extract_content(temp_file_path, "songs"))
+            result["trace"] = summarize_trace(trace)
         return result
 
     except Exception as e:
@@ -142,20 +265,136 @@ async def download_and_extract(request: URLDownloadRequest) -> Dict[str, Any]:
 
 
 @router.get("/content/", summary="List All Content", tags=["Content"])
-async def list_content(skip: int = 0, limit: int = 10) -> Dict[str, Any]:
+async def list_content(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(10, ge=1, le=1000),
+    fields: str = Query(None, description="Comma-separated fields to return (e.g. id,title,artist)")
+) -> Dict[str, Any]:
     """
     List all stored content (songs, backgrounds, highways, colors) with pagination.
     """
     try:
-        content = await list_all_content()  # Run DB query asynchronously
-        paginated_content = content[skip: skip + limit]
+        selected_fields = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        return {
-            "total": len(content),
-            "returned": len(paginated_content),
-            "content": paginated_content
-        }
+    etag = library_etag(request, await asyncio.to_thread(get_library_version))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
 
+    try:
+        paginated_content = await asyncio.to_thread(fetch_content_from_db, skip, limit, selected_fields)
+        total = await asyncio.to_thread(count_content)
     except Exception as e:
         logger.exception("❌ Error listing content")
-        raise HTTPException(status_code=500, detail="Failed to fetch content")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to fetch content")
+
+    set_etag_headers(response, etag)
+    return {
+        "total": total,
+        "returned": len(paginated_content),
+        "content": paginated_content
+    }
+
+
+@router.get("/list_content/", summary="List Content Files", tags=["Content"])
+async def list_content_files(
+    request: Request,
+    response: Response,
+    content_type: str = Query(..., description="Content type, e.g. colors, image_backgrounds, video_highways"),
+    search: str = Query(None, description="Case-insensitive substring filter on file names"),
+    skip: int = Query(0, ge=0, description="Pagination offset"),
+    limit: int = Query(100, ge=1, le=1000, description="Number of files to return")
+) -> Dict[str, Any]:
+    """List files in a content folder from the in-memory directory index."""
+    if content_type not in CONTENT_EXTENSIONS:
+        raise HTTPException(status_code=400, detail=f"Invalid content type: {content_type}")
+
+    folder = get_final_directory(content_type)
+    index = get_directory_index(folder)
+    await asyncio.to_thread(index.refresh)  # Rescans (scandir + stat per entry) when the folder changed
+
+    etag = make_etag("list_content", index.fingerprint, request.url.query)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    set_etag_headers(response, etag)
+
+    total, entries = await asyncio.to_thread(
+        index.list,
+        search=search.strip() if search else None,
+        extensions=CONTENT_EXTENSIONS[content_type],
+        skip=skip,
+        limit=limit
+    )
+
+    items = [
+        {
+            **entry,
+            "thumbnail_url": thumbnail_url_for(folder.name, entry["name"], entry["mtime"])
+            if folder.name in THUMBNAIL_CONTENT_FOLDERS else None
+        }
+        for entry in entries
+    ]
+    return {
+        "content_type": content_type,
+        "total": total,
+        "returned": len(items),
+        "files": [item["name"] for item in items],
+        "items": items
+    }
+
+
+@router.delete("/delete_content/", summary="Delete Content File", tags=["Content"])
+async def delete_content_file(
+    content_type: str = Query(..., description="Content type the file belongs to"),
+    file: str = Query(..., description="File name to delete")
+) -> Dict[str, Any]:
+    """Delete a file from a content folder, keeping the directory index and asset metadata in sync."""
+    if content_type not in CONTENT_EXTENSIONS:
+        raise HTTPException(status_code=400, detail=f"Invalid content type: {content_type}")
+    if Path(file).name != file or os.path.splitext(file)[1].lower() not in CONTENT_EXTENSIONS[content_type]:
+        raise HTTPException(status_code=400, detail=f"Invalid file name: {file}")
+
+    folder = get_final_directory(content_type)
+    if not await asyncio.to_thread(get_directory_index(folder).delete, file):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    if folder.name in THUMBNAIL_CONTENT_FOLDERS:
+        await asyncio.to_thread(delete_asset, folder.name, file)
+
+    logger.info(f"🗑️ Deleted {content_type} file: {file}")
+    return {"message": f"✅ Deleted {file}"}
+
+
+@router.get("/storage/report", summary="Blob Store Savings", tags=["Content"])
+async def blob_storage_report() -> Dict[str, Any]:
+    """Storage mode, blob counts, and the bytes saved by hardlinking identical song files (STORAGE_MODE=blobs)."""
+    return await asyncio.to_thread(storage_report)
+
+
+@router.get("/thumbnails/{content_type}/{file_name}", summary="Asset Thumbnail", tags=["Content"])
+async def get_thumbnail(content_type: str, file_name: str, request: Request):
+    """
+    Serve the downscaled preview of a background or highway.
+    Missing thumbnails are regenerated on demand.
+    """
+    if content_type not in THUMBNAIL_CONTENT_FOLDERS or Path(file_name).name != file_name:
+        raise HTTPException(status_code=400, detail="Invalid thumbnail request")
+
+    asset_path = get_final_directory(content_type) / file_name
+    if not asset_path.is_file():
+        raise HTTPException(status_code=404, detail="Asset not found")
+
+    stat = asset_path.stat()
+    etag = make_etag(content_type, file_name, stat.st_size, stat.st_mtime_ns)
+    headers = {"ETag": etag, "Cache-Control": THUMBNAIL_CACHE_CONTROL}
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    thumbnail_path = await asyncio.to_thread(ensure_thumbnail, content_type, asset_path)
+    if not thumbnail_path:
+        raise HTTPException(status_code=404, detail="Thumbnail not available")
+
+    return FileResponse(thumbnail_path, media_type="image/jpeg", headers=headers)
\ No newline at end of file
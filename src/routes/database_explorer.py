@@ -1,33 +1,182 @@
-from fastapi import APIRouter, HTTPException, Query
-from src.services.database_explorer import get_all_songs, delete_song_by_id
+import asyncio
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from src.services.database_explorer import (
+    get_all_songs, delete_song_by_id, get_library_tree, get_album_songs, get_song_by_id, parse_fields,
+    get_library_version
+)
+from src.services.waveform import get_waveform, get_songs_missing_waveforms, schedule_waveform_generation
+from src.services.fingerprint import (
+    get_same_recording, get_songs_missing_fingerprints, schedule_fingerprinting, FINGERPRINT_MAX_DISTANCE
+)
+from src.services.http_cache import is_not_modified, library_etag, set_etag_headers, not_modified
+from src.services.suggest_index import suggest_index, SUGGEST_FIELDS
+from src.services.dedup import duplicate_report, DEDUP_MIN_SIMILARITY
 from loguru import logger
 
 router = APIRouter()
 
 @router.get("/songs/")
 async def fetch_songs(
+    request: Request,
+    response: Response,
     search: str = Query(None, title="Search Query", description="Filter by title, artist, or album"),
     limit: int = Query(50, ge=1, le=100, title="Limit", description="Number of results to return"),
-    offset: int = Query(0, ge=0, title="Offset", description="Pagination offset")
+    offset: int = Query(0, ge=0, title="Offset", description="Pagination offset"),
+    after_id: int = Query(None, ge=1, title="Cursor", description="Return songs after this ID (the previous page's next_cursor)"),
+    instrument: str = Query(None, title="Instrument", description="Only songs charted for this instrument (e.g. guitar, drums)"),
+    difficulty: str = Query(None, title="Difficulty", description="Chart difficulty (easy, medium, hard, expert)"),
+    min_peak_nps: float = Query(None, ge=0, title="Min Peak NPS", description="Minimum peak notes per second"),
+    max_peak_nps: float = Query(None, ge=0, title="Max Peak NPS", description="Maximum peak notes per second"),
+    fields: str = Query(None, title="Fields", description="Comma-separated fields to return (e.g. id,title,artist)")
 ):
-    """Fetch all songs from the database with optional search and pagination."""
+    """Fetch all songs from the database with optional search, chart difficulty filters and pagination."""
     try:
-        songs = get_all_songs(search_query=search.strip() if search else None, limit=limit, offset=offset)
-        total_songs = len(songs)
-        
-        if total_songs == 0:
-            return {"message": "⚠️ No songs found.", "total": 0, "songs": []}
-        
-        return {"total": total_songs, "songs": songs}
+        selected_fields = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    etag = library_etag(request, await asyncio.to_thread(get_library_version))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
+    try:
+        songs = await asyncio.to_thread(
+            get_all_songs,
+            search_query=search.strip() if search else None,
+            limit=limit + 1,  # One extra row tells us whether another page exists
+            offset=offset,
+            instrument=instrument,
+            difficulty=difficulty,
+            min_peak_nps=min_peak_nps,
+            max_peak_nps=max_peak_nps,
+            fields=selected_fields,
+            after_id=after_id
+        )
     except Exception as e:
         logger.exception(f"❌ Error fetching songs: {e}")
         raise HTTPException(status_code=500, detail="Error fetching songs")
 
+    # Only a successful query may be revalidated; a failure must not be cached as an empty page
+    set_etag_headers(response, etag)
+    next_cursor = songs[limit - 1]["id"] if len(songs) > limit else None
+    songs = songs[:limit]
+    total_songs = len(songs)
+
+    if total_songs == 0:
+        return {"message": "⚠️ No songs found.", "total": 0, "songs": [], "next_cursor": None}
+
+    return {"total": total_songs, "songs": songs, "next_cursor": next_cursor}
+
+@router.get("/songs/tree")
+async def fetch_library_tree(
+    request: Request,
+    response: Response,
+    after_artist: str = Query(None, title="Cursor", description="Return artists after this one (the previous page's next_cursor)"),
+    limit: int = Query(20, ge=1, le=100, title="Limit", description="Number of artists to return")
+):
+    """Fetch the library grouped as artist → album, paginated by artist."""
+    etag = library_etag(request, await asyncio.to_thread(get_library_version))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
+    try:
+        tree = await asyncio.to_thread(get_library_tree, after_artist=after_artist, artist_limit=limit)
+    except Exception as e:
+        logger.exception(f"❌ Error fetching library tree: {e}")
+        raise HTTPException(status_code=500, detail="Error fetching library tree")
+
+    set_etag_headers(response, etag)
+    return {"total": len(tree["artists"]), **tree}
+
+@router.get("/songs/tree/album")
+async def fetch_album_songs(
+    request: Request,
+    response: Response,
+    artist: str = Query(..., title="Artist"),
+    album: str = Query(None, title="Album", description="Album name; omit for songs without an album"),
+    fields: str = Query(None, title="Fields", description="Comma-separated fields to return (e.g. id,title,artist)")
+):
+    """Fetch the songs of one album in the library tree."""
+    try:
+        selected_fields = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    etag = library_etag(request, await asyncio.to_thread(get_library_version))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
+    try:
+        songs = await asyncio.to_thread(get_album_songs, artist, album, fields=selected_fields)
+    except Exception as e:
+        logger.exception(f"❌ Error fetching songs for {artist} - {album}: {e}")
+        raise HTTPException(status_code=500, detail="Error fetching album songs")
+
+    set_etag_headers(response, etag)
+    return {"total": len(songs), "songs": songs}
+
+@router.get("/songs/suggest")
+async def suggest_songs(
+    q: str = Query(..., min_length=1, max_length=200, title="Query", description="Prefix typed so far"),
+    limit: int = Query(10, ge=1, le=50, title="Limit", description="Number of suggestions to return"),
+    field: str = Query(None, title="Field", description="Only suggest titles, artists or albums")
+):
+    """Typeahead completions for titles, artists and albums from the in-memory prefix index."""
+    if field and field not in SUGGEST_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Invalid field: {field}")
+
+    # Lookups are sub-millisecond, so they run inline rather than in the thread pool
+    return {
+        "query": q,
+        "ready": suggest_index.ready,
+        "suggestions": suggest_index.suggest(q, limit=limit, field=field),
+    }
+
+@router.get("/songs/duplicates")
+async def fetch_duplicates(
+    request: Request,
+    response: Response,
+    min_similarity: float = Query(DEDUP_MIN_SIMILARITY, ge=0, le=1, title="Min Similarity", description="Trigram similarity of artist and title (0-1)"),
+    limit: int = Query(50, ge=1, le=500, title="Limit", description="Number of duplicate groups to return"),
+    offset: int = Query(0, ge=0, title="Offset", description="Pagination offset")
+):
+    """Report groups of likely duplicate songs across the library, largest groups first."""
+    etag = library_etag(request, await asyncio.to_thread(get_library_version))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
+    try:
+        report = await asyncio.to_thread(duplicate_report, min_similarity=min_similarity, limit=limit, offset=offset)
+    except Exception as e:
+        logger.exception(f"❌ Error building duplicate report: {e}")
+        raise HTTPException(status_code=500, detail="Error building duplicate report")
+
+    set_etag_headers(response, etag)
+    return report
+
+@router.get("/songs/{song_id}")
+async def fetch_song(song_id: int, request: Request, response: Response):
+    """Fetch a single song with its full metadata and chart statistics."""
+    etag = library_etag(request, await asyncio.to_thread(get_library_version))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
+    try:
+        song = await asyncio.to_thread(get_song_by_id, song_id)
+    except Exception as e:
+        logger.exception(f"❌ Error fetching song ID {song_id}: {e}")
+        raise HTTPException(status_code=500, detail="Error fetching song")
+    if not song:
+        raise HTTPException(status_code=404, detail="Song not found")
+
+    set_etag_headers(response, etag)
+    return song
+
 @router.delete("/songs/{song_id}")
 async def delete_song(song_id: int):
     """Delete a song by ID from the database, ensuring it exists before deletion."""
     try:
-        deleted = delete_song_by_id(song_id)
+        deleted = await asyncio.to_thread(delete_song_by_id, song_id)
         if not deleted:
             logger.warning(f"⚠️ Attempted to delete non-existent song ID {song_id}.")
             raise HTTPException(status_code=404, detail="Song not found")
@@ -35,4 +184,50 @@ async def delete_song(song_id: int):
         return {"message": f"✅ Song ID {song_id} deleted successfully."}
     except Exception as e:
         logger.exception(f"❌ Error deleting song ID {song_id}: {e}")
-        raise HTTPException(status_code=500, detail="Error deleting song")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Error deleting song")
+
+@router.get("/songs/{song_id}/waveform")
+async def fetch_song_waveform(song_id: int, request: Request):
+    """
+    Return a song's precomputed waveform as raw bytes: `buckets` interleaved
+    (min, max) int8 pairs. Responses carry a strong ETag and can be cached.
+    """
+    waveform = await asyncio.to_thread(get_waveform, song_id)
+    if not waveform:
+        raise HTTPException(status_code=404, detail="Waveform not found")
+
+    headers = {
+        "ETag": waveform["etag"],
+        "Cache-Control": "public, max-age=86400",
+        "X-Waveform-Buckets": str(waveform["buckets"]),
+        "X-Waveform-Duration": str(waveform["duration_seconds"]),
+    }
+    if is_not_modified(request, waveform["etag"]):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=waveform["peaks"], media_type="application/octet-stream", headers=headers)
+
+@router.get("/songs/{song_id}/same_recording")
+async def fetch_same_recording(
+    song_id: int,
+    max_distance: int = Query(FINGERPRINT_MAX_DISTANCE, ge=0, le=7, title="Max Distance", description="Differing fingerprint bits still treated as the same recording")
+):
+    """Songs charting the same audio recording as this one, closest fingerprint first."""
+    matches = await asyncio.to_thread(get_same_recording, song_id, max_distance)
+    if matches is None:
+        raise HTTPException(status_code=404, detail="Fingerprint not found")
+    return {"song_id": song_id, "total": len(matches), "songs": matches}
+
+@router.post("/songs/fingerprints/backfill")
+async def backfill_fingerprints(limit: int = Query(100, ge=1, le=1000, description="Maximum songs to schedule")):
+    """Schedule audio fingerprinting for songs that do not have a fingerprint yet."""
+    songs = await asyncio.to_thread(get_songs_missing_fingerprints, limit)
+    schedule_fingerprinting(songs)
+    return {"message": f"🎧 Scheduled fingerprinting for {len(songs)} songs.", "scheduled": len(songs)}
+
+@router.post("/songs/waveforms/backfill")
+async def backfill_waveforms(limit: int = Query(100, ge=1, le=1000, description="Maximum songs to schedule")):
+    """Schedule waveform generation for songs that do not have one yet."""
+    songs = await asyncio.to_thread(get_songs_missing_waveforms, limit)
+    schedule_waveform_generation(songs)
+    return {"message": f"🌊 Scheduled waveform generation for {len(songs)} songs.", "scheduled": len(songs)}
\ No newline at end of file
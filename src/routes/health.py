@@ -1,7 +1,7 @@
 import time
-from fastapi import APIRouter, HTTPException
-from loguru import logger
-from src.database import get_connection  # Assuming you have a function to get DB connection
+from fastapi import APIRouter, HTTPException, Response
+from src.services.health_probe import health_probe
+from src.services.metrics import render_metrics
 import os
 
 router = APIRouter()
@@ -13,47 +13,52 @@ def get_service_uptime():
     """Calculate service uptime in seconds."""
     return round(time.time() - SERVICE_START_TIME, 2)
 
-def check_database():
-    """Check if the database is reachable."""
-    try:
-        with get_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute("SELECT 1")
-        return True
-    except Exception as e:
-        logger.error(f"Database health check failed: {e}")
-        return False
+def readiness_report():
+    """Return (ready, body) from the health prober's cached snapshot."""
+    ready, snapshot = health_probe.readiness()
+    database = snapshot.get("database") or {}
+    return ready, {
+        "status": "ok" if ready else "degraded",
+        "database": database.get("status", "unknown"),
+        "database_latency_ms": database.get("latency_ms"),
+        "uptime_seconds": get_service_uptime(),
+        "version": os.getenv("APP_VERSION", "1.0.0"),  # Retrieve from env if set
+        "reasons": snapshot["reasons"],
+        "checked_at": snapshot["checked_at"],
+        "pool": snapshot.get("pool"),
+        "queue_depth": snapshot.get("queue_depth"),
+        "disk_free_mb": snapshot.get("disk_free_mb"),
+    }
 
 @router.get("/health", summary="Health Check", tags=["Health"])
 async def health_check():
     """
-    Health check endpoint that verifies:
-    - API status
-    - Database connectivity
-    - Uptime
-
-    Returns:
-        A JSON object with system health details.
+    Readiness (see /health/ready), kept for existing Docker, nginx and worker checks.
+    Served from the background prober's snapshot; never queries the database.
     """
-    try:
-        logger.info("Health check endpoint called.")
-
-        db_status = check_database()
-        uptime = get_service_uptime()
-
-        health_status = {
-            "status": "ok" if db_status else "degraded",
-            "database": "ok" if db_status else "down",
-            "uptime_seconds": uptime,
-            "version": os.getenv("APP_VERSION", "1.0.0")  # Retrieve from env if set
-        }
+    ready, body = readiness_report()
+    if not ready:
+        raise HTTPException(status_code=503, detail=body)
+    return body
 
-        if not db_status:
-            logger.warning("Health check returned degraded status.")
-            raise HTTPException(status_code=503, detail=health_status)
+@router.get("/health/live", summary="Liveness Probe", tags=["Health"])
+async def liveness():
+    """The process is up and its event loop is serving requests."""
+    return {"status": "alive", "uptime_seconds": get_service_uptime()}
 
-        return health_status
+@router.get("/health/ready", summary="Readiness Probe", tags=["Health"])
+async def readiness():
+    """
+    Whether this worker should receive traffic: database reachable, connection pool and job queue
+    below their limits, enough free disk. Returns 503 with the failing checks otherwise.
+    """
+    ready, body = readiness_report()
+    if not ready:
+        raise HTTPException(status_code=503, detail=body)
+    return body
 
-    except Exception as e:
-        logger.exception("Health check failed")
-        raise HTTPException(status_code=500, detail="Health check failed")
\ No newline at end of file
+@router.get("/metrics", summary="Prometheus Metrics", tags=["Health"])
+async def metrics():
+    """Expose API, database pool and ingest metrics in the Prometheus text format."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
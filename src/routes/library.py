@@ -0,0 +1,85 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, Query
+from loguru import logger
+from src.services.library_snapshot import (
+    library_snapshot, get_song_titles, LIBRARY_SNAPSHOT_ENABLED, SORT_COLUMNS, CODED_COLUMNS
+)
+
+router = APIRouter()
+
+FACET_COLUMNS = CODED_COLUMNS + ("year",)
+
+
+def require_snapshot():
+    """Raise 503 unless the snapshot is enabled and loaded."""
+    if not LIBRARY_SNAPSHOT_ENABLED:
+        raise HTTPException(status_code=503, detail="Library snapshot is disabled (set LIBRARY_SNAPSHOT_ENABLED=true)")
+    if not library_snapshot.ready:
+        raise HTTPException(status_code=503, detail=library_snapshot.error or "Library snapshot is still loading")
+
+
+@router.get("/library/query", tags=["Library"])
+async def query_library(
+    artist: str = Query(None, title="Artist", description="Exact artist name"),
+    album: str = Query(None, title="Album", description="Exact album name"),
+    genre: str = Query(None, title="Genre", description="Exact genre"),
+    min_peak_nps: float = Query(None, ge=0, title="Min Peak NPS"),
+    max_peak_nps: float = Query(None, ge=0, title="Max Peak NPS"),
+    min_tempo_max: float = Query(None, ge=0, title="Min Tempo", description="Minimum of the song's fastest tempo"),
+    max_tempo_max: float = Query(None, ge=0, title="Max Tempo", description="Maximum of the song's fastest tempo"),
+    min_year: int = Query(None, title="Min Year"),
+    max_year: int = Query(None, title="Max Year"),
+    min_song_length: float = Query(None, ge=0, title="Min Length", description="Minimum song length in seconds"),
+    max_song_length: float = Query(None, ge=0, title="Max Length", description="Maximum song length in seconds"),
+    sort: str = Query("id", title="Sort", description=f"One of: {', '.join(SORT_COLUMNS)}"),
+    order: str = Query("desc", pattern="^(asc|desc)$", title="Order"),
+    skip: int = Query(0, ge=0, title="Skip"),
+    limit: int = Query(50, ge=0, le=500, title="Limit"),
+    facets: str = Query(None, title="Facets", description=f"Comma-separated facet counts: {', '.join(FACET_COLUMNS)}"),
+    facet_limit: int = Query(20, ge=1, le=200, title="Facet Limit"),
+    titles: bool = Query(True, title="Titles", description="Look up titles for the returned page")
+):
+    """Filter, sort and facet the library from the in-memory columnar snapshot."""
+    require_snapshot()
+
+    if sort not in SORT_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"Invalid sort column: {sort}")
+    facet_names = [name.strip() for name in facets.split(",") if name.strip()] if facets else []
+    invalid = [name for name in facet_names if name not in FACET_COLUMNS]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid facets: {', '.join(invalid)}")
+
+    filters = {
+        "artist": artist, "album": album, "genre": genre,
+        "min_peak_nps": min_peak_nps, "max_peak_nps": max_peak_nps,
+        "min_tempo_max": min_tempo_max, "max_tempo_max": max_tempo_max,
+        "min_year": min_year, "max_year": max_year,
+        "min_song_length": min_song_length, "max_song_length": max_song_length,
+    }
+    result = library_snapshot.query(
+        filters, sort=sort, descending=order == "desc", skip=skip, limit=limit,
+        facets=facet_names, facet_limit=facet_limit
+    )
+
+    if titles and result["songs"]:
+        song_titles = await asyncio.to_thread(get_song_titles, [song["id"] for song in result["songs"]])
+        for song in result["songs"]:
+            song["title"] = song_titles.get(song["id"])
+
+    return result
+
+
+@router.get("/library/stats", tags=["Library"])
+async def library_stats():
+    """Report the snapshot's state, size and memory use."""
+    return library_snapshot.stats()
+
+
+@router.post("/library/reload", tags=["Library"])
+async def reload_library():
+    """Rebuild the snapshot from the database."""
+    if not LIBRARY_SNAPSHOT_ENABLED:
+        raise HTTPException(status_code=503, detail="Library snapshot is disabled (set LIBRARY_SNAPSHOT_ENABLED=true)")
+    logger.info("🔄 Reloading library snapshot")
+    await asyncio.to_thread(library_snapshot.build)
+    return library_snapshot.stats()
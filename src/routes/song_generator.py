@@ -1,31 +1,47 @@
 import os
+import re
+import json
 import uuid
+import shutil
+import asyncio
+import zipfile
 import aiofiles
 from pathlib import Path
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from typing import List, Tuple, Optional
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi.responses import StreamingResponse, FileResponse
 from loguru import logger
-from src.services.song_generator import process_song_file
+from src.services.song_generator import process_song_file, generate_song_folder
+from src.services.process_pool import run_in_process_pool
 
 router = APIRouter()
 
 OUTPUT_DIR = Path("/app/data/clonehero_content/generator")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+# Batch jobs are kept outside the generator folder so they are not picked up as songs
+BATCH_DIR = Path(os.getenv("BATCH_DIR", "/app/data/generator_batches"))
+BATCH_DIR.mkdir(parents=True, exist_ok=True)
+
 SUPPORTED_FORMATS = {".mp3", ".ogg", ".wav", ".flac"}
+BATCH_ARCHIVE_FORMATS = {".zip"}
+MAX_BATCH_FILES = int(os.getenv("MAX_BATCH_FILES", 200))
+# Limit on the audio a batch may unpack, checked against zip headers before anything is extracted (zip bombs)
+MAX_BATCH_SIZE_MB = int(os.getenv("MAX_BATCH_SIZE_MB", 2048))
 
 
-async def save_uploaded_file(uploaded_file: UploadFile) -> Path:
+async def save_uploaded_file(uploaded_file: UploadFile, allowed_formats=SUPPORTED_FORMATS, output_dir: Path = OUTPUT_DIR) -> Path:
     """Asynchronously saves an uploaded file with a unique name."""
     file_ext = Path(uploaded_file.filename).suffix.lower()
 
-    if file_ext not in SUPPORTED_FORMATS:
+    if file_ext not in allowed_formats:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid file format: {file_ext}. Supported formats: {', '.join(SUPPORTED_FORMATS)}"
+            detail=f"Invalid file format: {file_ext}. Supported formats: {', '.join(allowed_formats)}"
         )
 
     unique_file_name = f"{uuid.uuid4().hex}{file_ext}"
-    file_path = OUTPUT_DIR / unique_file_name
+    file_path = output_dir / unique_file_name
 
     try:
         async with aiofiles.open(file_path, "wb") as out_file:
@@ -40,6 +56,100 @@ async def save_uploaded_file(uploaded_file: UploadFile) -> Path:
         raise HTTPException(status_code=500, detail="Error saving uploaded file.")
 
 
+def safe_song_name(file_name: str, used_names: set) -> str:
+    """Derive a unique, filesystem-safe song folder name from an audio file name."""
+    base = re.sub(r"[^\w\- ]+", "_", Path(file_name).stem).strip() or "song"
+    name, counter = base, 2
+    while name.lower() in used_names:
+        name = f"{base}_{counter}"
+        counter += 1
+    used_names.add(name.lower())
+    return name
+
+
+def expand_zip_archive(archive_path: Path, input_dir: Path, max_files: int, max_bytes: int) -> List[Tuple[str, Path]]:
+    """
+    Extract supported audio files from a zip archive, ignoring any directory structure.
+    Raises 413 as soon as the archive holds more than `max_files` files or `max_bytes` uncompressed bytes.
+    """
+    audio_files = []
+    total_bytes = 0
+    with zipfile.ZipFile(archive_path, "r") as zip_ref:
+        for member in zip_ref.infolist():
+            member_name = Path(member.filename).name
+            if member.is_dir() or Path(member_name).suffix.lower() not in SUPPORTED_FORMATS:
+                continue
+            if len(audio_files) >= max_files:
+                raise HTTPException(status_code=413, detail=f"Too many files in batch (max {MAX_BATCH_FILES}).")
+            # file_size is the header's uncompressed size; zipfile never reads past it
+            total_bytes += member.file_size
+            if total_bytes > max_bytes:
+                raise HTTPException(status_code=413, detail=f"Batch too large (max {MAX_BATCH_SIZE_MB} MB uncompressed).")
+
+            dst_path = input_dir / f"{uuid.uuid4().hex}{Path(member_name).suffix.lower()}"
+            with zip_ref.open(member) as src, dst_path.open("wb") as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            audio_files.append((member_name, dst_path))
+    return audio_files
+
+
+def progress_line(payload: dict) -> str:
+    """Serialize a progress event as a single NDJSON line."""
+    return json.dumps(payload) + "\n"
+
+
+async def stream_batch_progress(batch_id: str, audio_files: List[Tuple[str, Path]], batch_path: Path, tags: dict):
+    """Generate every song in the batch across the process pool, yielding progress as each one finishes."""
+    output_dir = batch_path / "songs"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    total = len(audio_files)
+    succeeded = 0
+
+    yield progress_line({"status": "started", "batch_id": batch_id, "total": total})
+
+    used_names = set()
+    tasks = {}
+    for original_name, path in audio_files:
+        song_name = safe_song_name(original_name, used_names)
+        task = asyncio.ensure_future(run_in_process_pool(generate_song_folder, str(path), str(output_dir), song_name, tags))
+        tasks[task] = original_name
+
+    try:
+        for completed, future in enumerate(asyncio.as_completed(list(tasks)), start=1):
+            try:
+                result = await future
+            except Exception as e:
+                result = {"error": str(e)}
+
+            event = {"status": "error" if "error" in result else "done", "completed": completed, "total": total}
+            event.update(result)
+            if "error" not in result:
+                succeeded += 1
+            else:
+                logger.warning(f"⚠️ Batch {batch_id}: generation failed - {result['error']}")
+            yield progress_line(event)
+
+        if succeeded == 0:
+            yield progress_line({"status": "failed", "batch_id": batch_id, "message": "No songs could be generated."})
+            return
+
+        archive_path = await asyncio.to_thread(
+            shutil.make_archive, str(BATCH_DIR / batch_id), "zip", root_dir=str(output_dir)
+        )
+        logger.success(f"✅ Batch {batch_id} complete: {succeeded}/{total} songs, archive {archive_path}")
+        yield progress_line({
+            "status": "complete",
+            "batch_id": batch_id,
+            "succeeded": succeeded,
+            "failed": total - succeeded,
+            "archive_url": f"/process_songs_batch/{batch_id}/archive"
+        })
+    finally:
+        for task in tasks:
+            task.cancel()  # No-op for finished tasks; stops queued work if the client disconnected
+        shutil.rmtree(batch_path, ignore_errors=True)
+
+
 @router.post("/process_song/")
 async def process_song(file: UploadFile = File(...)):
     """Handles song uploads and processes them into Clone Hero format."""
@@ -69,4 +179,71 @@ async def process_song(file: UploadFile = File(...)):
             os.remove(temp_file_path)
             logger.info(f"🗑️ Removed temporary song file: {temp_file_path}")
         except FileNotFoundError:
-            pass
\ No newline at end of file
+            pass
+
+
+@router.post("/process_songs_batch/")
+async def process_songs_batch(
+    files: List[UploadFile] = File(...),
+    artist: Optional[str] = Form(None),
+    album: Optional[str] = Form(None)
+):
+    """
+    Generate Clone Hero songs for many audio files (or zip archives of them) at once.
+    Songs take their title, artist and album from the audio tags; `artist` and `album` fill in untagged files.
+    Progress is streamed back as NDJSON; the final event links to a zip of song folders.
+    """
+    batch_id = uuid.uuid4().hex
+    batch_path = BATCH_DIR / batch_id
+    input_dir = batch_path / "input"
+    input_dir.mkdir(parents=True, exist_ok=True)
+
+    try:
+        audio_files = []
+        remaining_bytes = MAX_BATCH_SIZE_MB * 1024 * 1024
+        for uploaded_file in files:
+            saved_path = await save_uploaded_file(
+                uploaded_file, SUPPORTED_FORMATS | BATCH_ARCHIVE_FORMATS, input_dir
+            )
+            if saved_path.suffix.lower() in BATCH_ARCHIVE_FORMATS:
+                extracted = await asyncio.to_thread(
+                    expand_zip_archive, saved_path, input_dir, MAX_BATCH_FILES - len(audio_files), remaining_bytes
+                )
+                saved_path.unlink(missing_ok=True)
+            else:
+                if len(audio_files) >= MAX_BATCH_FILES:
+                    raise HTTPException(status_code=413, detail=f"Too many files in batch (max {MAX_BATCH_FILES}).")
+                if saved_path.stat().st_size > remaining_bytes:
+                    raise HTTPException(status_code=413, detail=f"Batch too large (max {MAX_BATCH_SIZE_MB} MB uncompressed).")
+                extracted = [(uploaded_file.filename, saved_path)]
+            audio_files.extend(extracted)
+            remaining_bytes -= sum(path.stat().st_size for _, path in extracted)
+
+        if not audio_files:
+            raise HTTPException(status_code=400, detail="No supported audio files found in upload.")
+    except HTTPException:
+        shutil.rmtree(batch_path, ignore_errors=True)
+        raise
+    except Exception as e:
+        shutil.rmtree(batch_path, ignore_errors=True)
+        logger.exception(f"❌ Error preparing batch {batch_id}: {e}")
+        raise HTTPException(status_code=500, detail="Error preparing batch upload.")
+
+    logger.info(f"🎵 Batch {batch_id}: generating {len(audio_files)} songs")
+    return StreamingResponse(
+        stream_batch_progress(batch_id, audio_files, batch_path, {"artist": artist, "album": album}),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.get("/process_songs_batch/{batch_id}/archive")
+async def download_batch_archive(batch_id: str):
+    """Download the zip of generated song folders for a finished batch."""
+    if not re.fullmatch(r"[0-9a-f]{32}", batch_id):
+        raise HTTPException(status_code=400, detail="Invalid batch ID")
+
+    archive_path = BATCH_DIR / f"{batch_id}.zip"
+    if not archive_path.exists():
+        raise HTTPException(status_code=404, detail="Batch archive not found")
+
+    return FileResponse(archive_path, media_type="application/zip", filename=f"songs_{batch_id}.zip")
@@ -0,0 +1,167 @@
+import os
+import shutil
+import mimetypes
+import subprocess
+from pathlib import Path
+from urllib.parse import quote
+from PIL import Image, ImageOps
+from loguru import logger
+from dotenv import load_dotenv
+from typing import Dict, Any, Optional, Tuple
+from src.services.storage import storage
+
+# Load environment variables
+load_dotenv()
+
+# Thumbnails live outside the content folder so Syncthing never ships them to game clients
+THUMBNAIL_DIR = Path(os.getenv("THUMBNAIL_DIR", "/app/data/thumbnails"))
+THUMBNAIL_MAX_SIZE = (
+    int(os.getenv("THUMBNAIL_MAX_WIDTH", 480)),
+    int(os.getenv("THUMBNAIL_MAX_HEIGHT", 270)),
+)
+THUMBNAIL_QUALITY = int(os.getenv("THUMBNAIL_QUALITY", 80))
+VIDEO_THUMBNAIL_OFFSET = os.getenv("VIDEO_THUMBNAIL_OFFSET", "1")  # Seconds into the video
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg"}
+VIDEO_EXTENSIONS = {".webm", ".mp4", ".avi", ".mpeg"}
+
+# Content folders whose files get previews
+THUMBNAIL_CONTENT_FOLDERS = {"backgrounds", "highways"}
+
+
+def thumbnail_path_for(folder: str, file_name: str) -> Path:
+    """Return where the thumbnail for an asset is cached."""
+    return THUMBNAIL_DIR / folder / f"{file_name}.jpg"
+
+
+def thumbnail_url_for(folder: str, file_name: str, mtime: float) -> str:
+    """Return a cache-busting thumbnail URL; the version changes whenever the asset is replaced."""
+    return f"/thumbnails/{folder}/{quote(file_name)}?v={int(mtime)}"
+
+
+def generate_image_thumbnail(src_path: Path, dst_path: Path) -> Tuple[int, int]:
+    """Downscale an image to a JPEG thumbnail and return the source dimensions."""
+    with Image.open(src_path) as img:
+        width, height = img.size
+        img.draft("RGB", THUMBNAIL_MAX_SIZE)  # Lets the JPEG decoder skip full-resolution decoding
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail(THUMBNAIL_MAX_SIZE)
+        img.convert("RGB").save(dst_path, "JPEG", quality=THUMBNAIL_QUALITY, optimize=True)
+    return width, height
+
+
+def generate_video_thumbnail(src_path: Path, dst_path: Path) -> Optional[Tuple[int, int]]:
+    """Grab a single downscaled frame from a video with ffmpeg and return the video dimensions."""
+    if not shutil.which("ffmpeg") or not shutil.which("ffprobe"):
+        logger.warning(f"⚠️ ffmpeg/ffprobe not installed, skipping video thumbnail for {src_path}")
+        return None
+
+    probe = subprocess.run(
+        [
+            "ffprobe", "-v", "error", "-select_streams", "v:0",
+            "-show_entries", "stream=width,height", "-of", "csv=p=0:s=x", str(src_path)
+        ],
+        capture_output=True, text=True, timeout=30, check=True
+    )
+    width, height = (int(value) for value in probe.stdout.strip().split("x")[:2])
+
+    max_width, max_height = THUMBNAIL_MAX_SIZE
+    subprocess.run(
+        [
+            "ffmpeg", "-v", "error", "-y", "-ss", VIDEO_THUMBNAIL_OFFSET, "-i", str(src_path),
+            "-frames:v", "1",
+            "-vf", f"scale={max_width}:{max_height}:force_original_aspect_ratio=decrease",
+            str(dst_path)
+        ],
+        capture_output=True, timeout=60, check=True
+    )
+    return width, height
+
+
+def create_thumbnail(folder: str, asset_path: Path) -> Dict[str, Any]:
+    """Generate the thumbnail for an asset and describe the source file."""
+    dst_path = thumbnail_path_for(folder, asset_path.name)
+    dst_path.parent.mkdir(parents=True, exist_ok=True)
+    ext = asset_path.suffix.lower()
+
+    dimensions = None
+    try:
+        if ext in IMAGE_EXTENSIONS:
+            dimensions = generate_image_thumbnail(asset_path, dst_path)
+        elif ext in VIDEO_EXTENSIONS:
+            dimensions = generate_video_thumbnail(asset_path, dst_path)
+    except Exception as e:
+        logger.error(f"❌ Failed to generate thumbnail for {asset_path}: {e}")
+
+    width, height = dimensions or (None, None)
+    return {
+        "width": width,
+        "height": height,
+        "mime_type": mimetypes.guess_type(asset_path.name)[0],
+        "thumbnail_path": str(dst_path) if dimensions and dst_path.exists() else None,
+    }
+
+
+def register_asset(folder: str, asset_path: Path) -> Optional[Dict[str, Any]]:
+    """Create (or refresh) the thumbnail and metadata row for a stored asset."""
+    if folder not in THUMBNAIL_CONTENT_FOLDERS:
+        return None
+
+    stat = asset_path.stat()
+    thumbnail = create_thumbnail(folder, asset_path)
+
+    try:
+        storage.upsert_asset({
+            "content_type": folder,
+            "file_name": asset_path.name,
+            "file_path": str(asset_path),
+            "mime_type": thumbnail["mime_type"],
+            "width": thumbnail["width"],
+            "height": thumbnail["height"],
+            "size_bytes": stat.st_size,
+            "thumbnail_path": thumbnail["thumbnail_path"],
+        })
+    except Exception as e:
+        logger.exception(f"❌ Error saving asset metadata for {asset_path}: {e}")
+
+    logger.info(f"🖼️ Registered asset {folder}/{asset_path.name}")
+    return {
+        "file_name": asset_path.name,
+        "size_bytes": stat.st_size,
+        "width": thumbnail["width"],
+        "height": thumbnail["height"],
+        "mime_type": thumbnail["mime_type"],
+        "thumbnail_url": thumbnail_url_for(folder, asset_path.name, stat.st_mtime) if thumbnail["thumbnail_path"] else None,
+    }
+
+
+def get_asset(folder: str, file_name: str) -> Optional[Dict[str, Any]]:
+    """Fetch the stored metadata row for an asset."""
+    try:
+        return storage.get_asset(folder, file_name)
+    except Exception as e:
+        logger.exception(f"❌ Error fetching asset {folder}/{file_name}: {e}")
+        return None
+
+
+def ensure_thumbnail(folder: str, asset_path: Path) -> Optional[Path]:
+    """Return the cached thumbnail for an asset, regenerating it lazily if it is missing or stale."""
+    if folder not in THUMBNAIL_CONTENT_FOLDERS or not asset_path.is_file():
+        return None
+
+    thumbnail_path = thumbnail_path_for(folder, asset_path.name)
+    if thumbnail_path.exists() and thumbnail_path.stat().st_mtime >= asset_path.stat().st_mtime:
+        return thumbnail_path
+
+    logger.info(f"♻️ Regenerating missing thumbnail for {folder}/{asset_path.name}")
+    register_asset(folder, asset_path)
+    return thumbnail_path if thumbnail_path.exists() else None
+
+
+def delete_asset(folder: str, file_name: str):
+    """Remove an asset's metadata row and cached thumbnail."""
+    thumbnail_path_for(folder, file_name).unlink(missing_ok=True)
+    try:
+        storage.delete_asset(folder, file_name)
+    except Exception as e:
+        logger.exception(f"❌ Error deleting asset metadata for {folder}/{file_name}: {e}")
@@ -0,0 +1,203 @@
+import os
+import sys
+import uuid
+import hashlib
+import argparse
+from pathlib import Path
+from loguru import logger
+from dotenv import load_dotenv
+from typing import Dict, Any, Optional
+from src.services.storage import storage
+
+# Load environment variables
+load_dotenv()
+
+# copy (default): every song folder holds its own files. blobs: each distinct file is stored once under its SHA-256
+# in BLOB_STORE_DIR and song folders hold hardlinks to it, so Syncthing and Clone Hero still see ordinary files.
+STORAGE_MODE = os.getenv("STORAGE_MODE", "copy").lower()
+CONTENT_BASE_DIR = Path(os.getenv("CONTENT_BASE_DIR", "/app/data/clonehero_content")).resolve()
+# Must share a filesystem with CONTENT_BASE_DIR (hardlinks cannot cross filesystems) and sit outside it,
+# or Syncthing would sync every blob a second time
+BLOB_STORE_DIR = Path(os.getenv("BLOB_STORE_DIR", "/app/data/blobs")).resolve()
+# Smaller files (song.ini, notes.chart) are rarely shared and not worth a blob
+BLOB_MIN_SIZE_BYTES = int(os.getenv("BLOB_MIN_SIZE_BYTES", 16384))
+BLOB_GC_BATCH_SIZE = int(os.getenv("BLOB_GC_BATCH_SIZE", 1000))
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+blob_store_ready: Optional[bool] = None
+
+
+def blob_store_enabled() -> bool:
+    """True in blobs mode once BLOB_STORE_DIR is usable; otherwise songs are stored as plain copies."""
+    global blob_store_ready
+    if blob_store_ready is not None:
+        return blob_store_ready
+
+    blob_store_ready = False
+    if STORAGE_MODE != "blobs":
+        return False
+    if BLOB_STORE_DIR == CONTENT_BASE_DIR or CONTENT_BASE_DIR in BLOB_STORE_DIR.parents:
+        logger.error(f"❌ BLOB_STORE_DIR {BLOB_STORE_DIR} is inside the synced content folder; storing plain copies.")
+        return False
+    try:
+        BLOB_STORE_DIR.mkdir(parents=True, exist_ok=True)
+        CONTENT_BASE_DIR.mkdir(parents=True, exist_ok=True)
+        if BLOB_STORE_DIR.stat().st_dev != CONTENT_BASE_DIR.stat().st_dev:
+            logger.error("❌ BLOB_STORE_DIR and CONTENT_BASE_DIR are on different filesystems; storing plain copies.")
+            return False
+    except OSError as e:
+        logger.error(f"❌ Blob store unavailable ({e}); storing plain copies.")
+        return False
+
+    blob_store_ready = True
+    logger.info(f"🧬 Deduplicating song files into {BLOB_STORE_DIR}")
+    return True
+
+
+def blob_path(blob_hash: str) -> Path:
+    """Where a blob lives, fanned out over two directory levels."""
+    return BLOB_STORE_DIR / blob_hash[:2] / blob_hash[2:4] / blob_hash
+
+
+def hash_file(path: Path) -> str:
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def link_file(path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Make `path` a hardlink of its blob. The first copy of a file becomes the blob itself; later copies are
+    swapped for a link to it with an atomic rename, so readers always see a complete file.
+    Returns the blob reference and the bytes saved, or None if the file cannot be linked.
+    """
+    blob_hash = hash_file(path)
+    size = path.stat().st_size
+    target = blob_path(blob_hash)
+    target.parent.mkdir(parents=True, exist_ok=True)
+
+    try:
+        os.link(path, target)
+        return {"hash": blob_hash, "size_bytes": size, "saved": 0}
+    except FileExistsError:
+        pass
+
+    if os.path.samefile(path, target):
+        return {"hash": blob_hash, "size_bytes": size, "saved": 0}
+    if target.stat().st_size != size:
+        logger.warning(f"⚠️ Blob {blob_hash} does not match {path} in size; keeping the file as is")
+        return None
+
+    temp_link = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.link")
+    os.link(target, temp_link)
+    os.replace(temp_link, path)
+    return {"hash": blob_hash, "size_bytes": size, "saved": size}
+
+
+def link_song_folder(song_id: int, folder: str) -> Optional[Dict[str, Any]]:
+    """Replace a song folder's files with hardlinks to their blobs and record the references."""
+    folder = Path(folder)
+    files, saved = [], 0
+    try:
+        for path in sorted(folder.rglob("*")):
+            if not path.is_file() or path.is_symlink() or path.stat().st_size < BLOB_MIN_SIZE_BYTES:
+                continue
+            linked = link_file(path)
+            if linked:
+                files.append({"path": path.relative_to(folder).as_posix(), **linked})
+                saved += linked["saved"]
+
+        storage.save_song_files(song_id, files)
+
+        # A concurrent collect_garbage() may have removed a blob that was unreferenced until the refs above
+        # were committed; the song's own link still holds the data, so restore the blob from it
+        for file in files:
+            try:
+                os.link(folder / file["path"], blob_path(file["hash"]))
+            except FileExistsError:
+                pass
+
+        if saved:
+            logger.info(f"🧬 Linked {len(files)} files for song {song_id}, saving {saved / 1e6:.1f} MB")
+        return {"files": len(files), "bytes_saved": saved}
+    except Exception as e:
+        logger.exception(f"❌ Error linking files of song {song_id} into the blob store: {e}")
+        return None
+
+
+def collect_garbage(batch_size: int = BLOB_GC_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Remove blobs no song references, paging through them in hash order. A blob whose file still has
+    other links (a song folder being ingested or not yet deleted) is skipped and left for a later pass.
+    """
+    removed, freed, skipped, after_hash = 0, 0, 0, ""
+    while batch := storage.unreferenced_blobs(after_hash, batch_size):
+        for blob_hash in batch:
+            path = blob_path(blob_hash)
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                stat = None
+            if stat and stat.st_nlink > 1:
+                skipped += 1
+                continue
+            if storage.delete_blob(blob_hash):
+                path.unlink(missing_ok=True)
+                removed += 1
+                freed += stat.st_size if stat else 0
+        after_hash = batch[-1]
+    if removed:
+        logger.info(f"🧹 Removed {removed} unreferenced blobs ({freed / 1e6:.1f} MB)")
+    return {"removed": removed, "freed_bytes": freed, "skipped": skipped}
+
+
+def import_library(batch_size: int = 100) -> Dict[str, int]:
+    """Link the folders of songs stored before blobs mode was enabled."""
+    songs, saved, after_id = 0, 0, 0
+    while batch := storage.songs_without_files(after_id, batch_size):
+        for song in batch:
+            linked = link_song_folder(song["id"], song["folder_path"]) if Path(song["folder_path"]).is_dir() else None
+            if linked:
+                songs += 1
+                saved += linked["bytes_saved"]
+        after_id = batch[-1]["id"]
+    logger.success(f"✅ Linked {songs} existing songs, saving {saved / 1e6:.1f} MB")
+    return {"songs": songs, "bytes_saved": saved}
+
+
+def storage_report() -> Dict[str, Any]:
+    """Storage mode and how many bytes hardlinking saves."""
+    report: Dict[str, Any] = {"mode": STORAGE_MODE, "enabled": blob_store_enabled()}
+    try:
+        report.update(storage.blob_report())
+    except Exception as e:
+        logger.exception(f"❌ Error building blob store report: {e}")
+        report["error"] = str(e)
+    return report
+
+
+def main():
+    """Command-line entry point: print the savings report, collect garbage, or link existing songs."""
+    parser = argparse.ArgumentParser(description="Manage the content-addressed blob store.")
+    parser.add_argument("--import", dest="import_library", action="store_true", help="Link songs stored before blobs mode")
+    parser.add_argument("--gc", action="store_true", help="Remove unreferenced blobs")
+    args = parser.parse_args()
+
+    if (args.import_library or args.gc) and not blob_store_enabled():
+        logger.error("❌ Set STORAGE_MODE=blobs (with a valid BLOB_STORE_DIR) first.")
+        return 1
+    if args.import_library:
+        import_library()
+    if args.gc:
+        collect_garbage()
+    for key, value in storage_report().items():
+        print(f"{key:<20} {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+import os
+import json
+import select
+import threading
+from loguru import logger
+from dotenv import load_dotenv
+from typing import Dict, Any, List, Callable
+from src.database import create_connection
+from src.services.storage import storage
+
+# Load environment variables
+load_dotenv()
+
+# Channel the songs trigger publishes on (see notify_song_change in the baseline migration)
+CHANGE_FEED_CHANNEL = "song_changes"
+CHANGE_FEED_POLL_SECONDS = float(os.getenv("CHANGE_FEED_POLL_SECONDS", 5))
+CHANGE_FEED_RETRY_SECONDS = float(os.getenv("CHANGE_FEED_RETRY_SECONDS", 5))
+# Storages without notifications (SQLite): how often each worker reads the song_changes log, and rows per read
+CHANGE_LOG_POLL_SECONDS = float(os.getenv("CHANGE_LOG_POLL_SECONDS", 1))
+CHANGE_LOG_BATCH_SIZE = 1000
+
+# Subscribers receive a batch of events: {"op": "INSERT" | "UPDATE" | "DELETE", "id": ...}.
+# A {"op": "RESYNC"} event means notifications may have been missed (reconnect or TRUNCATE)
+# and the subscriber should rebuild from the database.
+subscribers: List[Callable[[List[Dict[str, Any]]], None]] = []
+listener_thread = None
+stop_event = threading.Event()
+
+
+def subscribe(callback: Callable[[List[Dict[str, Any]]], None]):
+    """Register a callback for song change batches."""
+    subscribers.append(callback)
+
+
+def publish(events: List[Dict[str, Any]]):
+    """Hand a batch of events to every subscriber; one failing subscriber does not affect the others."""
+    for callback in subscribers:
+        try:
+            callback(events)
+        except Exception as e:
+            logger.exception(f"❌ Change feed subscriber {callback.__name__} failed: {e}")
+
+
+def parse_notification(payload: str) -> Dict[str, Any]:
+    """Decode a notification payload, treating anything unreadable as a resync request."""
+    try:
+        event = json.loads(payload)
+    except ValueError:
+        return {"op": "RESYNC"}
+    return {"op": "RESYNC"} if event.get("op") == "TRUNCATE" else event
+
+
+def listen_forever():
+    """Hold a LISTEN connection and forward notifications in batches until stopped, reconnecting on errors."""
+    first_connect = True
+    while not stop_event.is_set():
+        conn = None
+        try:
+            conn = create_connection()
+            conn.set_session(autocommit=True)
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANGE_FEED_CHANNEL};")
+            logger.info(f"👂 Listening for changes on '{CHANGE_FEED_CHANNEL}'")
+
+            if not first_connect:
+                publish([{"op": "RESYNC"}])  # Changes made while disconnected were not delivered
+            first_connect = False
+
+            while not stop_event.is_set():
+                if select.select([conn], [], [], CHANGE_FEED_POLL_SECONDS) == ([], [], []):
+                    continue
+                conn.poll()
+                # Everything that arrived together (e.g. a bulk ingest) is delivered as one batch
+                events = [parse_notification(notify.payload) for notify in conn.notifies]
+                conn.notifies.clear()
+                if events:
+                    publish(events)
+        except Exception as e:
+            logger.warning(f"⚠️ Change feed connection lost: {e}. Reconnecting in {CHANGE_FEED_RETRY_SECONDS}s")
+            stop_event.wait(CHANGE_FEED_RETRY_SECONDS)
+        finally:
+            if conn:
+                conn.close()
+
+
+def poll_forever(position: int):
+    """
+    Forward rows appended to the song_changes log after `position` in batches until stopped. Every
+    worker reads the log itself, so writes made by other workers and processes reach its subscribers too.
+    """
+    while not stop_event.is_set():
+        try:
+            changes = storage.song_changes(position, CHANGE_LOG_BATCH_SIZE)
+            if changes:
+                # seq has no gaps except where old rows were pruned past us: changes were missed
+                missed = changes[0]["seq"] > position + 1
+                position = changes[-1]["seq"]
+                publish([{"op": "RESYNC"}] if missed else [{"op": change["op"], "id": change["id"]} for change in changes])
+                if len(changes) == CHANGE_LOG_BATCH_SIZE:
+                    continue  # More are waiting
+        except Exception as e:
+            logger.warning(f"⚠️ Reading the change log failed: {e}. Retrying in {CHANGE_FEED_RETRY_SECONDS}s")
+            stop_event.wait(CHANGE_FEED_RETRY_SECONDS)
+            continue
+        stop_event.wait(CHANGE_LOG_POLL_SECONDS)
+
+
+def start_change_feed():
+    """Start the listener (Postgres) or change log poller (SQLite) thread, once per worker process."""
+    global listener_thread
+    if listener_thread and listener_thread.is_alive():
+        return
+
+    stop_event.clear()
+    if storage.has_change_notifications:
+        listener_thread = threading.Thread(target=listen_forever, name="change-feed", daemon=True)
+    else:
+        # Read the position now, before the caller builds from the table, so no change falls in between
+        position = storage.change_log_position()
+        listener_thread = threading.Thread(target=poll_forever, args=(position,), name="change-feed", daemon=True)
+        logger.info(f"👂 Polling the change log every {CHANGE_LOG_POLL_SECONDS}s")
+    listener_thread.start()
+
+
+def stop_change_feed():
+    """Stop the listener thread."""
+    stop_event.set()
+    if listener_thread:
+        listener_thread.join(timeout=max(CHANGE_FEED_POLL_SECONDS, CHANGE_LOG_POLL_SECONDS) + 1)
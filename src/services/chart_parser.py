@@ -0,0 +1,207 @@
+import re
+import mido
+import numpy as np
+from pathlib import Path
+from loguru import logger
+from typing import Dict, Any, List, Optional, Tuple
+
+# .chart section prefixes and instrument names (aligned with the song.ini diff_* fields)
+CHART_DIFFICULTIES = {"Easy": "easy", "Medium": "medium", "Hard": "hard", "Expert": "expert"}
+CHART_INSTRUMENTS = {
+    "Single": "guitar",
+    "DoubleGuitar": "guitar_coop",
+    "DoubleBass": "bass",
+    "DoubleRhythm": "rhythm",
+    "Drums": "drums",
+    "Keyboard": "keys",
+    "GHLGuitar": "guitarghl",
+    "GHLBass": "bassghl",
+    "GHLRhythm": "rhythm_ghl",
+    "GHLCoop": "guitar_coop_ghl",
+}
+
+# .chart note values that are modifiers rather than playable gems
+GUITAR_FLAG_NOTES = {5, 6}
+DRUM_FLAG_NOTES = set(range(34, 45)) | {66, 67, 68}
+
+# MIDI track names and per-difficulty note ranges (covers 5-fret, GHL and drums)
+MIDI_INSTRUMENTS = {
+    "PART GUITAR": "guitar",
+    "PART GUITAR COOP": "guitar_coop",
+    "PART BASS": "bass",
+    "PART RHYTHM": "rhythm",
+    "PART DRUMS": "drums",
+    "PART KEYS": "keys",
+    "PART GUITAR GHL": "guitarghl",
+    "PART BASS GHL": "bassghl",
+    "PART RHYTHM GHL": "rhythm_ghl",
+    "PART GUITAR COOP GHL": "guitar_coop_ghl",
+}
+MIDI_DIFFICULTY_RANGES = {
+    "easy": (58, 64),
+    "medium": (70, 76),
+    "hard": (82, 88),
+    "expert": (94, 100),
+}
+
+DEFAULT_RESOLUTION = 192
+DEFAULT_BPM = 120.0
+NPS_WINDOW_SECONDS = 1.0
+
+CHART_LINE_PATTERN = re.compile(r"^\s*(\d+)\s*=\s*(\w+)\s+(.*)$")
+
+
+def ticks_to_seconds(ticks: np.ndarray, tempo_ticks: np.ndarray, tempo_bpm: np.ndarray, resolution: int) -> np.ndarray:
+    """Convert tick positions to seconds using a piecewise-constant tempo map."""
+    seconds_per_tick = 60.0 / (tempo_bpm * resolution)
+    segment_seconds = np.diff(tempo_ticks) * seconds_per_tick[:-1]
+    tempo_start_seconds = np.concatenate(([0.0], np.cumsum(segment_seconds)))
+
+    idx = np.searchsorted(tempo_ticks, ticks, side="right") - 1
+    idx = np.clip(idx, 0, len(tempo_ticks) - 1)
+    return tempo_start_seconds[idx] + (ticks - tempo_ticks[idx]) * seconds_per_tick[idx]
+
+
+def note_density(note_ticks: List[int], tempo_ticks: np.ndarray, tempo_bpm: np.ndarray, resolution: int) -> Dict[str, Any]:
+    """Compute note count, average and peak notes per second for one track."""
+    # Chords count as a single note event
+    ticks = np.unique(np.asarray(note_ticks, dtype=np.int64))
+    times = ticks_to_seconds(ticks, tempo_ticks, tempo_bpm, resolution)
+
+    note_count = int(times.size)
+    duration = float(times[-1] - times[0]) if note_count > 1 else 0.0
+
+    # Peak: the most notes starting within any sliding window beginning at a note
+    window_end = np.searchsorted(times, times + NPS_WINDOW_SECONDS, side="left")
+    peak_notes = int((window_end - np.arange(note_count)).max()) if note_count else 0
+
+    return {
+        "note_count": note_count,
+        "avg_nps": round(note_count / duration, 3) if duration > 0 else float(note_count),
+        "peak_nps": round(peak_notes / NPS_WINDOW_SECONDS, 3),
+        "length_seconds": round(float(times[-1]), 3) if note_count else 0.0,
+    }
+
+
+def build_stats(tracks: Dict[Tuple[str, str], List[int]], tempo_map: List[Tuple[int, float]], resolution: int) -> Dict[str, Any]:
+    """Turn raw note ticks per (instrument, difficulty) into chart statistics."""
+    # A zero or negative BPM marker would make seconds-per-tick infinite; such markers are ignored
+    tempo_map = sorted((tick, bpm) for tick, bpm in tempo_map if np.isfinite(bpm) and bpm > 0) or [(0, DEFAULT_BPM)]
+    resolution = resolution if resolution > 0 else DEFAULT_RESOLUTION
+    if tempo_map[0][0] != 0:
+        tempo_map.insert(0, (0, tempo_map[0][1]))
+
+    tempo_ticks = np.array([tick for tick, _ in tempo_map], dtype=np.int64)
+    tempo_bpm = np.array([bpm for _, bpm in tempo_map], dtype=np.float64)
+
+    stats = []
+    for (instrument, difficulty), note_ticks in tracks.items():
+        if not note_ticks:
+            continue
+        stats.append({
+            "instrument": instrument,
+            "difficulty": difficulty,
+            **note_density(note_ticks, tempo_ticks, tempo_bpm, resolution)
+        })
+
+    return {
+        "tempo_min": round(float(tempo_bpm.min()), 3),
+        "tempo_max": round(float(tempo_bpm.max()), 3),
+        "peak_nps": max((track["peak_nps"] for track in stats), default=0.0),
+        "tracks": stats,
+    }
+
+
+def chart_section_track(section: str) -> Optional[Tuple[str, str]]:
+    """Map a .chart section name such as `ExpertSingle` to (instrument, difficulty)."""
+    for prefix, difficulty in CHART_DIFFICULTIES.items():
+        if section.startswith(prefix):
+            instrument = CHART_INSTRUMENTS.get(section[len(prefix):])
+            return (instrument, difficulty) if instrument else None
+    return None
+
+
+def parse_chart_file(chart_path: Path) -> Dict[str, Any]:
+    """Parse a .chart file into per-track note statistics."""
+    resolution = DEFAULT_RESOLUTION
+    tempo_map = []
+    tracks = {}
+    section = None
+    track = None
+
+    with chart_path.open("r", encoding="utf-8-sig", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("[") and line.endswith("]"):
+                section = line[1:-1]
+                track = chart_section_track(section)
+                continue
+
+            if section == "Song" and line.startswith("Resolution"):
+                resolution = int(line.split("=", 1)[1].strip().strip('"'))
+                continue
+
+            match = CHART_LINE_PATTERN.match(line)
+            if not match:
+                continue
+            tick, event, values = int(match.group(1)), match.group(2), match.group(3).split()
+
+            if section == "SyncTrack":
+                if event == "B":
+                    tempo_map.append((tick, int(values[0]) / 1000.0))
+                continue
+
+            if event != "N" or not track:
+                continue
+
+            instrument, note = track[0], int(values[0])
+            flags = DRUM_FLAG_NOTES if instrument == "drums" else GUITAR_FLAG_NOTES
+            if note in flags:
+                continue
+            tracks.setdefault(track, []).append(tick)
+
+    return build_stats(tracks, tempo_map, resolution)
+
+
+def parse_midi_file(midi_path: Path) -> Dict[str, Any]:
+    """Parse a notes.mid file into per-track note statistics."""
+    midi = mido.MidiFile(str(midi_path))
+    tempo_map = []
+    tracks = {}
+
+    for track in midi.tracks:
+        instrument = MIDI_INSTRUMENTS.get((track.name or "").strip().upper())
+        tick = 0
+        for message in track:
+            tick += message.time
+            if message.type == "set_tempo" and message.tempo > 0:
+                tempo_map.append((tick, mido.tempo2bpm(message.tempo)))
+            elif instrument and message.type == "note_on" and message.velocity > 0:
+                for difficulty, (low, high) in MIDI_DIFFICULTY_RANGES.items():
+                    if low <= message.note <= high:
+                        tracks.setdefault((instrument, difficulty), []).append(tick)
+                        break
+
+    return build_stats(tracks, tempo_map, midi.ticks_per_beat)
+
+
+def parse_chart_folder(folder: str) -> Optional[Dict[str, Any]]:
+    """
+    Find and parse the chart in a song folder (notes.chart preferred over notes.mid).
+    Runs in a worker process at ingest, so it must stay picklable and never raise.
+    """
+    folder = Path(folder)
+    try:
+        chart_path = folder / "notes.chart"
+        if chart_path.exists():
+            return parse_chart_file(chart_path)
+
+        midi_path = folder / "notes.mid"
+        if midi_path.exists():
+            return parse_midi_file(midi_path)
+
+        logger.warning(f"⚠️ No notes.chart or notes.mid found in {folder}")
+        return None
+    except Exception as e:
+        logger.error(f"❌ Failed to parse chart in {folder}: {e}")
+        return None
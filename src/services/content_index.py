@@ -0,0 +1,130 @@
+import os
+import time
+import shutil
+import hashlib
+import threading
+from pathlib import Path
+from loguru import logger
+from dotenv import load_dotenv
+from typing import Dict, Any, List, Optional, Tuple
+
+# Load environment variables
+load_dotenv()
+
+# A folder's mtime only changes when entries are added, removed or renamed, so also
+# rescan periodically to pick up files replaced in place (e.g. by Syncthing)
+CONTENT_INDEX_MAX_AGE = float(os.getenv("CONTENT_INDEX_MAX_AGE", 300))
+
+
+class DirectoryIndex:
+    """In-memory listing of one content folder, rebuilt with os.scandir only when the folder changes."""
+
+    def __init__(self, folder: Path):
+        self.folder = folder
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.names: List[str] = []  # Sorted case-insensitively for stable pagination
+        self.folder_mtime_ns: Optional[int] = None
+        self.scanned_at = 0.0
+        self.fingerprint = ""  # Content hash of the listing; identical across workers for the same folder state
+
+    def scan(self) -> Dict[str, Dict[str, Any]]:
+        """Read the folder's entries with a single scandir pass (stat data comes from the dirent)."""
+        entries = {}
+        with os.scandir(self.folder) as it:
+            for entry in it:
+                if entry.name.startswith("."):
+                    continue  # Skip Syncthing temp files and other hidden entries
+                stat = entry.stat()
+                entries[entry.name] = {
+                    "name": entry.name,
+                    "is_dir": entry.is_dir(),
+                    "size_bytes": stat.st_size,
+                    "mtime": stat.st_mtime,
+                }
+        return entries
+
+    @staticmethod
+    def compute_fingerprint(names: List[str], entries: Dict[str, Dict[str, Any]]) -> str:
+        """Hash the names, sizes and mtimes of the listing."""
+        digest = hashlib.sha256()
+        for name in names:
+            entry = entries[name]
+            digest.update(f"{name}\0{entry['size_bytes']}\0{entry['mtime']}\n".encode("utf-8", "surrogateescape"))
+        return digest.hexdigest()[:32]
+
+    def refresh(self, force: bool = False):
+        """Rescan the folder if its mtime changed or the index is older than the max age."""
+        try:
+            folder_mtime_ns = os.stat(self.folder).st_mtime_ns
+        except FileNotFoundError:
+            folder_mtime_ns = None
+
+        stale = time.monotonic() - self.scanned_at > CONTENT_INDEX_MAX_AGE
+        if not force and not stale and folder_mtime_ns == self.folder_mtime_ns:
+            return
+
+        entries = self.scan() if folder_mtime_ns is not None else {}
+        with self.lock:
+            self.entries = entries
+            self.names = sorted(entries, key=str.lower)
+            self.fingerprint = self.compute_fingerprint(self.names, entries)
+            self.folder_mtime_ns = folder_mtime_ns
+            self.scanned_at = time.monotonic()
+        logger.debug(f"📇 Indexed {len(entries)} entries in {self.folder}")
+
+    def list(
+        self,
+        search: Optional[str] = None,
+        extensions: Optional[set] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """Return the total number of matching entries and one page of them."""
+        self.refresh()
+        search = search.lower() if search else None
+
+        with self.lock:
+            names, entries = self.names, self.entries
+
+        matches = [
+            name for name in names
+            if (not extensions or os.path.splitext(name)[1].lower() in extensions)
+            and (not search or search in name.lower())
+        ]
+        return len(matches), [entries[name] for name in matches[skip: skip + limit]]
+
+    def delete(self, name: str) -> bool:
+        """Delete a file or folder and update the index in the same critical section."""
+        self.refresh()
+        with self.lock:
+            entry = self.entries.get(name)
+            if not entry:
+                return False
+
+            path = self.folder / name
+            if entry["is_dir"]:
+                shutil.rmtree(path)
+            else:
+                path.unlink(missing_ok=True)
+
+            self.entries = {key: value for key, value in self.entries.items() if key != name}
+            self.names = [key for key in self.names if key != name]
+            self.fingerprint = self.compute_fingerprint(self.names, self.entries)
+            self.folder_mtime_ns = os.stat(self.folder).st_mtime_ns
+
+        logger.info(f"🗑️ Deleted {path}")
+        return True
+
+
+# One index per content folder, shared by every request in this worker
+indexes: Dict[Path, DirectoryIndex] = {}
+indexes_lock = threading.Lock()
+
+
+def get_directory_index(folder: Path) -> DirectoryIndex:
+    """Return the index for a content folder, creating it on first use."""
+    with indexes_lock:
+        if folder not in indexes:
+            indexes[folder] = DirectoryIndex(folder)
+        return indexes[folder]
@@ -1,12 +1,20 @@
 import os
 import shutil
+import asyncio
 import uuid
 import configparser
 from pathlib import Path
 from loguru import logger
 from typing import List, Dict, Any
-from src.database import get_connection
-from psycopg2.extras import Json, DictCursor
+from src.services.chart_parser import parse_chart_folder
+from src.services.process_pool import run_in_process_pool
+from src.services.waveform import schedule_waveform_generation
+from src.services.fingerprint import schedule_fingerprinting
+from src.services.storage import storage, DEFAULT_SONG_FIELDS
+from src.services.dedup import find_duplicates
+from src.services.blob_store import blob_store_enabled, link_song_folder
+from src.services.metrics import observe_stage, INGEST_SONGS
+from src.services.tracing import span
 
 # Optional metadata fields for songs
 OPTIONAL_FIELDS = [
@@ -51,38 +59,39 @@ def parse_song_ini(ini_path: Path) -> Dict[str, Any]:
         "metadata": {k: v.strip() for k, v in metadata.items() if v is not None}
     }
 
-def add_content_to_db(title: str, artist: str, album: str, file_path: str, metadata: dict = None) -> int:
+def add_content_to_db(title: str, artist: str, album: str, file_path: str, metadata: dict = None, chart_stats: dict = None) -> int:
     """Insert content into the database and return its ID."""
     metadata = metadata or {}
 
     try:
-        with get_connection() as conn:
-            with conn.cursor(cursor_factory=DictCursor) as cursor:
-                cursor.execute(
-                    "SELECT id FROM songs WHERE title = %s AND artist = %s AND album = %s",
-                    (title, artist, album)
-                )
-                existing_song = cursor.fetchone()
-                if existing_song:
-                    logger.warning(f"⚠️ Duplicate detected, skipping insert: {file_path}")
-                    return existing_song[0]
-
-                cursor.execute(
-                    """
-                    INSERT INTO songs (title, artist, album, file_path, metadata)
-                    VALUES (%s, %s, %s, %s, %s) RETURNING id
-                    """,
-                    (title, artist, album, file_path, Json(metadata))
-                )
-                content_id = cursor.fetchone()[0]
-                conn.commit()
-
+        content_id = storage.insert_song(title, artist, album, file_path, metadata, chart_stats)
         logger.success(f"✅ Content added: {title} - {artist} ({album})")
         return content_id
     except Exception as e:
         logger.exception(f"❌ Error inserting content: {e}")
         return -1
 
+def folder_size(folder: Path) -> int:
+    """Total size of the files directly inside a song folder."""
+    with os.scandir(folder) as it:
+        return sum(entry.stat().st_size for entry in it if entry.is_file())
+
+def remove_song_folder(folder: str) -> bool:
+    """Delete a stored song's folder, and its artist folder once that is empty."""
+    from src.services.content_utils import get_final_directory  # Import inside function to prevent circular imports
+
+    path = Path(folder).resolve()
+    songs_dir = Path(get_final_directory("songs")).resolve()
+    if songs_dir not in path.parents:
+        logger.warning(f"⚠️ Not removing {path}: outside {songs_dir}")
+        return False
+    shutil.rmtree(path, ignore_errors=True)
+    try:
+        path.parent.rmdir()  # The artist folder, once its last song is gone
+    except OSError:
+        pass
+    return True
+
 async def process_and_store_content(temp_extract_dir: str, content_type: str) -> List[Dict[str, Any]]:
     """Process and store content, including songs and visual assets."""
     from src.services.content_utils import get_final_directory  # Import inside function to prevent circular imports
@@ -90,12 +99,42 @@ async def process_and_store_content(temp_extract_dir: str, content_type: str) ->
     stored_content = []
     temp_extract_dir = Path(temp_extract_dir)
 
-    for ini_path in temp_extract_dir.rglob("song.ini"):
-        parsed = parse_song_ini(ini_path)
-        if not parsed:
-            continue  # Skip if parsing failed
-
+    songs = []
+    with span("parse_songs") as parse_span, observe_stage("parse", content_type):
+        for ini_path in temp_extract_dir.rglob("song.ini"):
+            parsed = parse_song_ini(ini_path)
+            if parsed:  # Skip if parsing failed
+                songs.append((ini_path, parsed))
+            else:
+                INGEST_SONGS.labels(outcome="invalid").inc()
+
+        # Parse every chart in parallel across CPU cores before the songs are moved
+        all_chart_stats = await asyncio.gather(
+            *(run_in_process_pool(parse_chart_folder, str(ini_path.parent)) for ini_path, _ in songs),
+            return_exceptions=True
+        )
+        if parse_span:
+            parse_span.set(songs=len(songs))
+
+    for (ini_path, parsed), chart_stats in zip(songs, all_chart_stats):
         title, artist, album, metadata = parsed["title"], parsed["artist"], parsed["album"], parsed["metadata"]
+        if isinstance(chart_stats, Exception):
+            logger.error(f"❌ Chart parsing failed for {ini_path.parent}: {chart_stats}")
+            chart_stats = None
+
+        # Same normalized title, artist and album as a stored song: skip it before moving any files
+        with span("dedup"), observe_stage("dedup", content_type):
+            duplicates = find_duplicates(title, artist, album)
+        if duplicates["duplicate_of"] is not None:
+            INGEST_SONGS.labels(outcome="duplicate").inc()
+            logger.warning(f"⚠️ Duplicate of song {duplicates['duplicate_of']}, skipping: {ini_path.parent}")
+            stored_content.append({
+                "title": title,
+                "artist": artist,
+                "album": album,
+                "duplicate_of": duplicates["duplicate_of"]
+            })
+            continue
 
         # Ensure unique file storage
         artist_dir = Path(get_final_directory("songs")) / artist
@@ -103,9 +142,17 @@ async def process_and_store_content(temp_extract_dir: str, content_type: str) ->
         final_dir = artist_dir / f"{title}_{uuid.uuid4().hex[:8]}"
 
         try:
-            shutil.move(str(ini_path.parent), str(final_dir))
-            content_id = add_content_to_db(title, artist, album, str(final_dir), metadata)
-
+            with span("store_song", title=title, artist=artist, bytes=folder_size(ini_path.parent)):
+                with span("move"), observe_stage("move", content_type):
+                    shutil.move(str(ini_path.parent), str(final_dir))
+                with span("db_write"), observe_stage("db_write", content_type):
+                    content_id = add_content_to_db(title, artist, album, str(final_dir), metadata, chart_stats)
+                if content_id != -1 and blob_store_enabled():
+                    # Swap files already in the blob store for hardlinks (STORAGE_MODE=blobs)
+                    with span("link_blobs"), observe_stage("link_blobs", content_type):
+                        await asyncio.to_thread(link_song_folder, content_id, str(final_dir))
+
+            INGEST_SONGS.labels(outcome="stored" if content_id != -1 else "failed").inc()
             if content_id != -1:
                 stored_content.append({
                     "id": content_id,
@@ -113,40 +160,28 @@ async def process_and_store_content(temp_extract_dir: str, content_type: str) ->
                     "artist": artist,
                     "album": album,
                     "folder_path": str(final_dir),
-                    "metadata": metadata
+                    "metadata": metadata,
+                    "chart_stats": chart_stats,
+                    "duplicate_candidates": duplicates["candidates"]
                 })
+                if duplicates["candidates"]:
+                    logger.info(f"🔍 {artist} - {title} resembles {len(duplicates['candidates'])} stored songs")
         except Exception as e:
+            INGEST_SONGS.labels(outcome="failed").inc()
             logger.error(f"❌ Error moving file {ini_path.parent} to {final_dir}: {e}")
-    
+
+    # Decode audio into waveform thumbnails and recording fingerprints in the background
+    new_songs = [song for song in stored_content if "duplicate_of" not in song]
+    schedule_waveform_generation(new_songs)
+    schedule_fingerprinting(new_songs)
+
     return stored_content
 
-def fetch_content_from_db(skip: int = 0, limit: int = 50) -> List[Dict[str, Any]]:
-    """Fetch paginated content from the database."""
-    try:
-        with get_connection() as conn:
-            with conn.cursor(cursor_factory=DictCursor) as cursor:
-                cursor.execute(
-                    """
-                    SELECT id, title, artist, album, file_path, metadata
-                    FROM songs
-                    ORDER BY id DESC
-                    LIMIT %s OFFSET %s
-                    """,
-                    (limit, skip)
-                )
-                content = cursor.fetchall()
-
-        return [
-            {
-                "id": row["id"],
-                "title": row["title"],
-                "artist": row["artist"],
-                "album": row["album"],
-                "file_path": row["file_path"],
-                "metadata": row["metadata"] if row["metadata"] else {}
-            }
-            for row in content
-        ]
-    except Exception as e:
-        logger.exception(f"❌ Error fetching content: {e}")
-        return []
\ No newline at end of file
+def fetch_content_from_db(skip: int = 0, limit: int = 50, fields: List[str] = None) -> List[Dict[str, Any]]:
+    """Fetch paginated content from the database, selecting only the requested fields. Database errors propagate."""
+    fields = fields or list(DEFAULT_SONG_FIELDS)
+    return storage.list_songs(fields, limit=limit, offset=skip)
+
+def count_content() -> int:
+    """Return the total number of songs in the database. Database errors propagate."""
+    return storage.count_songs()
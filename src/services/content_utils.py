@@ -7,31 +7,50 @@ import tempfile
 import asyncio
 import aiofiles
 from pathlib import Path
-from src.database import get_connection
-from psycopg2.extras import DictCursor
 from loguru import logger
 from dotenv import load_dotenv
 from typing import Dict, Any, List
 from src.services.content_manager import process_and_store_content
+from src.services.asset_thumbnails import register_asset, IMAGE_EXTENSIONS, VIDEO_EXTENSIONS
+from src.services.metrics import observe_stage
+from src.services.tracing import span
 
 # Load environment variables
 load_dotenv()
 
 CONTENT_BASE_DIR = Path(os.getenv("CONTENT_BASE_DIR", "/app/data/clonehero_content")).resolve()
 
+# Archives are unpacked into extract_* folders here; the worker's cleanup job removes leftovers (see maintenance.py)
+EXTRACT_TEMP_DIR = Path(os.getenv("EXTRACT_TEMP_DIR", tempfile.gettempdir()))
+
 if not CONTENT_BASE_DIR.exists():
     logger.warning("⚠️ CONTENT_BASE_DIR does not exist. Creating it now.")
     CONTENT_BASE_DIR.mkdir(parents=True, exist_ok=True)
 
 CONTENT_FOLDERS = {
     "backgrounds": "backgrounds",
+    "image_backgrounds": "backgrounds",
+    "video_backgrounds": "backgrounds",
     "colors": "colors",
     "generator": "generator",
     "highways": "highways",
+    "image_highways": "highways",
+    "video_highways": "highways",
     "songs": "songs",
     "temp": "temp",
 }
 
+# File types kept when storing extracted (non-song) content
+CONTENT_EXTENSIONS = {
+    "backgrounds": IMAGE_EXTENSIONS | VIDEO_EXTENSIONS,
+    "image_backgrounds": IMAGE_EXTENSIONS,
+    "video_backgrounds": VIDEO_EXTENSIONS,
+    "colors": {".ini"},
+    "highways": IMAGE_EXTENSIONS | {".webm"},
+    "image_highways": IMAGE_EXTENSIONS,
+    "video_highways": {".webm"},  # Clone Hero requires .webm for video highways
+}
+
 def get_final_directory(content_type: str) -> Path:
     """Return subfolder path for the given content_type, ensuring the directory exists."""
     subfolder = CONTENT_FOLDERS.get(content_type, content_type)
@@ -39,8 +58,40 @@ def get_final_directory(content_type: str) -> Path:
     final_dir.mkdir(parents=True, exist_ok=True)  # Ensure the directory exists
     return final_dir
 
+def unique_destination(final_dir: Path, file_name: str) -> Path:
+    """Return a destination path in final_dir that does not overwrite an existing file."""
+    dst_path = final_dir / file_name
+    if dst_path.exists():
+        dst_path = final_dir / f"{Path(file_name).stem}_{uuid.uuid4().hex[:8]}{Path(file_name).suffix}"
+    return dst_path
+
+async def store_asset(file_path: Path, content_type: str, file_name: str = None) -> Dict[str, Any]:
+    """Move a single asset into its content folder and build its thumbnail and metadata."""
+    final_dir = get_final_directory(content_type)
+    dst_path = unique_destination(final_dir, file_name or file_path.name)
+    with span("store_asset", file_name=dst_path.name, bytes=file_path.stat().st_size):
+        with span("move"):
+            shutil.move(str(file_path), str(dst_path))
+        with span("register_asset"):
+            asset = await asyncio.to_thread(register_asset, final_dir.name, dst_path)
+    return asset or {"file_name": dst_path.name}
+
+async def store_asset_files(temp_extract_dir: str, content_type: str) -> Dict[str, Any]:
+    """Move extracted backgrounds, highways or color profiles to their content folder."""
+    allowed_extensions = CONTENT_EXTENSIONS.get(content_type, set())
+    stored = []
+
+    for file_path in sorted(Path(temp_extract_dir).rglob("*")):
+        if file_path.is_file() and file_path.suffix.lower() in allowed_extensions:
+            stored.append(await store_asset(file_path, content_type))
+
+    logger.info(f"📁 Stored {len(stored)} {content_type} files from archive")
+    return {"message": f"✅ Stored {len(stored)} files", "files": stored}
+
 async def store_extracted_content(temp_extract_dir: str, content_type: str) -> Dict[str, Any]:
     """Move extracted content to the final directory asynchronously."""
+    if content_type != "songs":
+        return await store_asset_files(temp_extract_dir, content_type)
     return await process_and_store_content(temp_extract_dir, content_type)
 
 async def extract_archive(file_path: str, extract_dir: str, file_ext: str) -> Dict[str, Any]:
@@ -77,7 +128,7 @@ async def extract_content(file_path: str, content_type: str) -> Dict[str, Any]:
     - For `backgrounds`, `colors`, `highways`, moves extracted content.
     """
     file_name = Path(file_path).name
-    temp_extract_dir = Path(tempfile.gettempdir()) / f"extract_{uuid.uuid4().hex[:6]}"
+    temp_extract_dir = EXTRACT_TEMP_DIR / f"extract_{uuid.uuid4().hex[:6]}"
 
     try:
         file_ext = Path(file_path).suffix.lower()
@@ -86,7 +137,8 @@ async def extract_content(file_path: str, content_type: str) -> Dict[str, Any]:
             temp_extract_dir.mkdir(parents=True, exist_ok=True)
             logger.info(f"📦 Extracting {file_path} to {temp_extract_dir}")
 
-            extract_result = await extract_archive(file_path, temp_extract_dir, file_ext)
+            with span("extract_archive", bytes=os.path.getsize(file_path)), observe_stage("extract", content_type):
+                extract_result = await extract_archive(file_path, temp_extract_dir, file_ext)
             if "error" in extract_result:
                 return extract_result
 
@@ -94,42 +146,16 @@ async def extract_content(file_path: str, content_type: str) -> Dict[str, Any]:
             return await store_extracted_content(str(temp_extract_dir), content_type)
 
         # Handle direct file storage
-        final_dir = get_final_directory(content_type)
-        dst_path = final_dir / file_name
-
         if content_type == "songs":
             return {"error": "⚠️ Please upload a .zip or .rar file containing a song.ini"}
 
-        shutil.move(file_path, str(dst_path))
-        return {"message": f"✅ Stored file: {file_name}", "file": str(dst_path)}
+        # Uploaded temp files are prefixed with a UUID; store them under their original name
+        asset = await store_asset(Path(file_path), content_type, file_name.split("_", 1)[-1])
+        return {"message": f"✅ Stored file: {asset['file_name']}", "file": asset["file_name"], "asset": asset}
 
     except Exception as e:
         logger.exception(f"❌ Error processing {file_path}: {e}")
         return {"error": str(e)}
 
     finally:
-        shutil.rmtree(temp_extract_dir, ignore_errors=True)  # Cleanup temp dir even on failure
-
-async def list_all_content() -> List[Dict[str, Any]]:
-    """List all stored content (songs, backgrounds, highways, colors)."""
-    try:
-        conn = await asyncio.to_thread(get_connection)  # Ensure connection runs asynchronously
-        async with conn:
-            async with conn.cursor(cursor_factory=DictCursor) as cursor:
-                await cursor.execute("SELECT * FROM songs")
-                content = await cursor.fetchall()
-
-        return [
-            {
-                "id": row["id"],
-                "title": row["title"],
-                "artist": row["artist"],
-                "album": row["album"],
-                "file_path": row["file_path"],
-                "metadata": row["metadata"] if row["metadata"] else {}
-            }
-            for row in content
-        ]
-    except Exception as e:
-        logger.exception(f"❌ Error listing content: {e}")
-        return []  # Always return a list (consistent with function signature)
\ No newline at end of file
+        shutil.rmtree(temp_extract_dir, ignore_errors=True)  # Cleanup temp dir even on failure
\ No newline at end of file
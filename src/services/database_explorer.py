@@ -1,58 +1,103 @@
-from src.database import get_connection
 from loguru import logger
-import psycopg2.extras  # For DictCursor
-from pathlib import Path
 from typing import List, Dict, Any, Optional
+from src.services.storage import storage, row_to_song, SONG_FIELDS, DEFAULT_SONG_FIELDS
+from src.services.blob_store import blob_store_enabled, collect_garbage
+from src.services.content_manager import remove_song_folder
 
-def get_all_songs(search_query: Optional[str] = None, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
-    """Retrieve songs from the database, optionally filtering by search query with pagination."""
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """
+    Validate a comma-separated `fields=` projection against the known song columns.
+    The `id` column is always included; raises ValueError for unknown fields.
+    """
+    if not fields:
+        return list(DEFAULT_SONG_FIELDS)
+
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in SONG_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    return list(dict.fromkeys(["id"] + requested))
+
+def get_library_version() -> int:
+    """Return the library version counter, bumped by a trigger on every change to songs."""
     try:
-        with get_connection() as conn:
-            with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as cursor:
-                query = "SELECT id, title, artist, album, file_path, metadata FROM songs"
-                params = []
-
-                if search_query and search_query.strip():  # Avoid matching everything if empty
-                    query += " WHERE title ILIKE %s OR artist ILIKE %s OR album ILIKE %s"
-                    params.extend([f"%{search_query.strip()}%"] * 3)
-                
-                query += " ORDER BY id DESC LIMIT %s OFFSET %s"
-                params.extend([limit, offset])
-                cursor.execute(query, params)
-                songs = cursor.fetchall()
-
-        return [
-            {
-                "id": row["id"],
-                "title": row["title"],
-                "artist": row["artist"],
-                "album": row["album"],
-                "file_path": row["file_path"],
-                "metadata": row["metadata"] if row["metadata"] else {}
-            }
-            for row in songs
-        ]
+        return storage.library_version()
     except Exception as e:
-        logger.exception(f"❌ Error fetching songs from database: {e}")
-        return []
+        logger.exception(f"❌ Error fetching library version: {e}")
+        return -1
+
+def get_all_songs(
+    search_query: Optional[str] = None,
+    limit: int = 50,
+    offset: int = 0,
+    instrument: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    min_peak_nps: Optional[float] = None,
+    max_peak_nps: Optional[float] = None,
+    fields: Optional[List[str]] = None,
+    after_id: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Retrieve songs from the database, optionally filtering by search query and by
+    measured chart difficulty (peak notes per second), with pagination.
+    Pass `after_id` (the last ID of the previous page) for keyset pagination instead of `offset`.
+    Only the requested `fields` are selected. Database errors propagate, so an outage is never
+    served (and cached) as an empty page.
+    """
+    fields = fields or list(DEFAULT_SONG_FIELDS)
+    return storage.list_songs(
+        fields,
+        search_query=search_query,
+        limit=limit,
+        offset=offset,
+        instrument=instrument,
+        difficulty=difficulty,
+        min_peak_nps=min_peak_nps,
+        max_peak_nps=max_peak_nps,
+        after_id=after_id
+    )
+
+def get_library_tree(after_artist: Optional[str] = None, artist_limit: int = 20) -> Dict[str, Any]:
+    """
+    Return one page of the library as an artist → album tree with song counts.
+    Pages are keyed on artist name (keyset pagination), so groups never split across pages.
+    Database errors propagate.
+    """
+    # One extra artist tells us whether another page exists
+    artists = storage.library_tree(after_artist, artist_limit + 1)
+
+    has_more = len(artists) > artist_limit
+    artists = artists[:artist_limit]
+    return {
+        "artists": artists,
+        "next_cursor": artists[-1]["artist"] if has_more else None
+    }
+
+def get_album_songs(artist: str, album: Optional[str], fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Return the songs of one album, ordered by title, for lazy loading in the library tree. Database errors propagate."""
+    fields = fields or list(DEFAULT_SONG_FIELDS)
+    return storage.album_songs(artist, album, fields)
+
+def get_song_by_id(song_id: int) -> Optional[Dict[str, Any]]:
+    """Fetch every field of a single song, including metadata and per-track chart statistics (None if missing)."""
+    return storage.get_song(song_id)
 
 def delete_song_by_id(song_id: int) -> bool:
     """Delete a song from the database by its ID, ensuring it exists before deletion."""
     try:
-        with get_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute("SELECT id FROM songs WHERE id = %s", (song_id,))
-                song = cursor.fetchone()
-
-                if not song:
-                    logger.warning(f"⚠️ Song ID {song_id} not found, cannot delete.")
-                    return False
-
-                cursor.execute("DELETE FROM songs WHERE id = %s", (song_id,))
-                conn.commit()
+        folders = storage.songs_by_ids([song_id], ["id", "file_path"])
+        if not storage.delete_songs([song_id]):
+            logger.warning(f"⚠️ Song ID {song_id} not found, cannot delete.")
+            return False
+        if folders:
+            remove_song_folder(folders[0]["file_path"])
+        if blob_store_enabled():
+            # The song's blob references went with its row and its links with the folder
+            collect_garbage()
 
         logger.success(f"✅ Successfully deleted song ID {song_id}")
         return True
     except Exception as e:
         logger.exception(f"❌ Error deleting song with ID {song_id}: {e}")
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,90 @@
+import os
+from loguru import logger
+from dotenv import load_dotenv
+from typing import Dict, Any, List
+from src.services.storage import storage
+from src.services.song_matching import match_key, shingles, similarity, band_hashes
+
+# Load environment variables
+load_dotenv()
+
+# Near-duplicates need at least this trigram similarity on normalized artist + title to be reported
+DEDUP_MIN_SIMILARITY = float(os.getenv("DEDUP_MIN_SIMILARITY", 0.6))
+# Candidates returned per ingested song, and bucket rows verified per lookup
+DEDUP_MAX_CANDIDATES = int(os.getenv("DEDUP_MAX_CANDIDATES", 5))
+DEDUP_CANDIDATE_POOL = int(os.getenv("DEDUP_CANDIDATE_POOL", 50))
+# The library report skips bigger buckets (e.g. dozens of "Intro" tracks), which would otherwise yield O(n²) pairs
+DEDUP_MAX_BUCKET_SIZE = int(os.getenv("DEDUP_MAX_BUCKET_SIZE", 50))
+
+
+def find_duplicates(title: str, artist: str, album: str) -> Dict[str, Any]:
+    """
+    Check a song before it is stored: `duplicate_of` is the ID of a song with the same normalized
+    title, artist and album; `candidates` are similar songs found through the MinHash band index.
+    """
+    key = match_key(title, artist, album)
+    try:
+        duplicate_of = storage.find_song(key)
+        grams = shingles(title, artist)
+        candidates = []
+        for song in storage.match_candidates(band_hashes(title, artist), DEDUP_CANDIDATE_POOL):
+            score = similarity(grams, shingles(song["title"], song["artist"]))
+            if score >= DEDUP_MIN_SIMILARITY and song["id"] != duplicate_of:
+                candidates.append({
+                    "id": song["id"], "title": song["title"], "artist": song["artist"],
+                    "album": song["album"], "similarity": round(score, 3)
+                })
+        candidates.sort(key=lambda candidate: -candidate["similarity"])
+        return {"match_key": key, "duplicate_of": duplicate_of, "candidates": candidates[:DEDUP_MAX_CANDIDATES]}
+    except Exception as e:
+        logger.exception(f"❌ Duplicate check failed for {artist} - {title}: {e}")
+        return {"match_key": key, "duplicate_of": None, "candidates": []}
+
+
+def find(parents: Dict[int, int], song_id: int) -> int:
+    """Union-find root of a song, compressing the path."""
+    while parents[song_id] != song_id:
+        parents[song_id] = parents[parents[song_id]]
+        song_id = parents[song_id]
+    return song_id
+
+
+def duplicate_report(min_similarity: float = DEDUP_MIN_SIMILARITY, limit: int = 50, offset: int = 0) -> Dict[str, Any]:
+    """
+    Group the library into clusters of likely duplicates: pairs sharing a band bucket are verified
+    on trigram similarity and joined into groups, largest first.
+    """
+    pairs = storage.duplicate_pairs(DEDUP_MAX_BUCKET_SIZE)
+    song_ids = sorted({song_id for pair in pairs for song_id in pair})
+    songs = {song["id"]: song for song in storage.songs_by_ids(song_ids, ["id", "title", "artist", "album", "file_path"])}
+    grams = {song_id: shingles(song["title"], song["artist"]) for song_id, song in songs.items()}
+
+    parents: Dict[int, int] = {}
+    scores: Dict[int, float] = {}
+    for a, b in pairs:
+        if a not in songs or b not in songs:
+            continue
+        score = similarity(grams[a], grams[b])
+        if score < min_similarity:
+            continue
+        parents.setdefault(a, a)
+        parents.setdefault(b, b)
+        root_a, root_b = find(parents, a), find(parents, b)
+        if root_a != root_b:
+            parents[max(root_a, root_b)] = min(root_a, root_b)
+        scores[a] = max(scores.get(a, 0), score)
+        scores[b] = max(scores.get(b, 0), score)
+
+    groups: Dict[int, List[Dict[str, Any]]] = {}
+    for song_id in sorted(parents):
+        groups.setdefault(find(parents, song_id), []).append({**songs[song_id], "similarity": round(scores[song_id], 3)})
+
+    ordered = sorted(groups.values(), key=lambda group: (-len(group), group[0]["id"]))
+    return {
+        "total_groups": len(ordered),
+        "duplicate_songs": sum(len(group) - 1 for group in ordered),
+        "groups": [
+            {"keep": group[0]["id"], "songs": group}  # The oldest entry is the suggested one to keep
+            for group in ordered[offset:offset + limit]
+        ],
+    }
@@ -0,0 +1,188 @@
+import os
+import asyncio
+import numpy as np
+from pathlib import Path
+from loguru import logger
+from typing import Dict, Any, List, Optional
+from src.services.storage import storage
+from src.services.process_pool import run_in_process_pool
+from src.services.waveform import find_song_audio
+
+# Audio fingerprints spot charts of the same recording: a short window after the leading silence is reduced to
+# chroma and log-mel energy contours, then to a 64-bit SimHash, so re-encodes and volume changes of one recording
+# land a few bits apart while different songs differ in about half of them.
+FINGERPRINT_SAMPLE_RATE = 11025
+FINGERPRINT_WINDOW_SECONDS = float(os.getenv("FINGERPRINT_WINDOW_SECONDS", 20))
+# Leading silence skipped before the window; charters pad the same audio differently
+FINGERPRINT_MAX_SILENCE_SECONDS = float(os.getenv("FINGERPRINT_MAX_SILENCE_SECONDS", 10))
+FINGERPRINT_ONSET_DB = 30
+FINGERPRINT_SEGMENTS = 10
+FINGERPRINT_MEL_BANDS = 16
+# Songs within this many differing bits are the same recording; lookups find every match up to 7
+FINGERPRINT_MAX_DISTANCE = int(os.getenv("FINGERPRINT_MAX_DISTANCE", 6))
+
+FINGERPRINT_BITS = 64
+# The fingerprint is indexed as four 16-bit bands. Two fingerprints within 7 bits differ in at most one bit of
+# some band (pigeonhole), so probing each band's value and its 16 one-bit neighbours finds them all
+FINGERPRINT_BANDS = 4
+FINGERPRINT_BAND_BITS = 16
+FINGERPRINT_SEED = 49
+
+FINGERPRINT_PLANES = np.random.default_rng(FINGERPRINT_SEED).standard_normal(
+    (FINGERPRINT_BITS, FINGERPRINT_SEGMENTS * (12 + FINGERPRINT_MEL_BANDS))
+)
+
+# Keep references to running background stages so they are not garbage-collected
+background_tasks = set()
+
+
+def segment_means(features: np.ndarray) -> np.ndarray:
+    """Average a (bins, frames) feature matrix over FINGERPRINT_SEGMENTS equal time segments."""
+    return np.stack([segment.mean(axis=1) for segment in np.array_split(features, FINGERPRINT_SEGMENTS, axis=1)], axis=1)
+
+
+def compute_fingerprint(folder: str) -> Optional[int]:
+    """
+    Decode a short window of a song's audio and reduce it to a 64-bit fingerprint.
+    Runs in a worker process, so it must stay picklable and never raise.
+    """
+    import librosa  # Only the process-pool children that decode audio load librosa
+
+    try:
+        audio_path = find_song_audio(Path(folder))
+        if not audio_path:
+            logger.warning(f"⚠️ No audio found for fingerprint in {folder}")
+            return None
+
+        y, sr = librosa.load(
+            str(audio_path), sr=FINGERPRINT_SAMPLE_RATE, mono=True,
+            duration=FINGERPRINT_MAX_SILENCE_SECONDS + FINGERPRINT_WINDOW_SECONDS
+        )
+        # The first sample within FINGERPRINT_ONSET_DB of the peak; sample-accurate, unlike frame-based trimming
+        loud = np.abs(y) >= np.abs(y).max() * 10 ** (-FINGERPRINT_ONSET_DB / 20)
+        start = int(np.argmax(loud))
+        window = y[start:start + int(FINGERPRINT_WINDOW_SECONDS * sr)]
+        if len(window) < FINGERPRINT_SEGMENTS * sr // 2:
+            logger.warning(f"⚠️ Audio too short to fingerprint in {folder}")
+            return None
+
+        chroma = segment_means(librosa.feature.chroma_stft(y=window, sr=sr))
+        mel = segment_means(librosa.power_to_db(
+            librosa.feature.melspectrogram(y=window, sr=sr, n_mels=FINGERPRINT_MEL_BANDS), ref=np.max, top_db=40
+        ))
+        # Centre each feature so only the song's shape over time remains (no loudness or overall timbre),
+        # as random-hyperplane hashing needs
+        features = np.concatenate([
+            (chroma - chroma.mean(axis=1, keepdims=True)).ravel(),
+            ((mel - mel.mean(axis=1, keepdims=True)) / (mel.std() + 1e-6)).ravel(),
+        ])
+        bits = FINGERPRINT_PLANES @ features > 0
+        return int(sum(1 << i for i, bit in enumerate(bits) if bit))
+    except Exception as e:
+        logger.error(f"❌ Failed to compute fingerprint for {folder}: {e}")
+        return None
+
+
+def fingerprint_bands(fingerprint: int) -> List[int]:
+    """The fingerprint's 16-bit bands, lowest first."""
+    mask = (1 << FINGERPRINT_BAND_BITS) - 1
+    return [(fingerprint >> (band * FINGERPRINT_BAND_BITS)) & mask for band in range(FINGERPRINT_BANDS)]
+
+
+def band_probes(fingerprint: int) -> List[List[int]]:
+    """Per band, its value and every value one bit away."""
+    return [
+        [value] + [value ^ (1 << bit) for bit in range(FINGERPRINT_BAND_BITS)]
+        for value in fingerprint_bands(fingerprint)
+    ]
+
+
+def to_signed(fingerprint: int) -> int:
+    """Store the unsigned 64-bit fingerprint in a signed BIGINT column."""
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+def to_unsigned(value: int) -> int:
+    """Read a fingerprint back from its BIGINT column."""
+    return value & ((1 << 64) - 1)
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits."""
+    return bin(a ^ b).count("1")
+
+
+def save_fingerprint(song_id: int, fingerprint: int) -> bool:
+    """Store (or replace) a song's fingerprint and its band columns."""
+    try:
+        storage.save_fingerprint(song_id, to_signed(fingerprint), fingerprint_bands(fingerprint))
+        return True
+    except Exception as e:
+        logger.exception(f"❌ Error saving fingerprint for song ID {song_id}: {e}")
+        return False
+
+
+def find_same_recording(fingerprint: int, max_distance: int = FINGERPRINT_MAX_DISTANCE, exclude_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Songs whose fingerprint is within `max_distance` bits (at most 7), closest first."""
+    try:
+        candidates = storage.fingerprint_candidates(band_probes(fingerprint))
+    except Exception as e:
+        logger.exception(f"❌ Error looking up fingerprint candidates: {e}")
+        return []
+
+    matches = []
+    for candidate in candidates:
+        distance = hamming(fingerprint, to_unsigned(candidate["fingerprint"]))
+        if distance <= max_distance and candidate["id"] != exclude_id:
+            matches.append({
+                "id": candidate["id"], "title": candidate["title"], "artist": candidate["artist"],
+                "album": candidate["album"], "distance": distance
+            })
+    return sorted(matches, key=lambda match: (match["distance"], match["id"]))
+
+
+def get_same_recording(song_id: int, max_distance: int = FINGERPRINT_MAX_DISTANCE) -> Optional[List[Dict[str, Any]]]:
+    """Songs charting the same recording as `song_id`; None if the song has no fingerprint."""
+    try:
+        fingerprint = storage.get_fingerprint(song_id)
+        if fingerprint is None:
+            return None
+        return find_same_recording(to_unsigned(fingerprint), max_distance, exclude_id=song_id)
+    except Exception as e:
+        logger.exception(f"❌ Error finding recordings matching song ID {song_id}: {e}")
+        return None
+
+
+def get_songs_missing_fingerprints(limit: int = 100) -> List[Dict[str, Any]]:
+    """Return songs that do not have a stored fingerprint yet."""
+    try:
+        return storage.songs_missing_fingerprints(limit)
+    except Exception as e:
+        logger.exception(f"❌ Error listing songs missing fingerprints: {e}")
+        return []
+
+
+async def generate_fingerprints(songs: List[Dict[str, Any]]) -> int:
+    """Compute and store fingerprints for the given songs (dicts with `id` and `folder_path`), one at a time."""
+    generated = 0
+    for song in songs:
+        fingerprint = await run_in_process_pool(compute_fingerprint, song["folder_path"])
+        if fingerprint is None or not await asyncio.to_thread(save_fingerprint, song["id"], fingerprint):
+            continue
+        generated += 1
+        matches = await asyncio.to_thread(find_same_recording, fingerprint, exclude_id=song["id"])
+        if matches:
+            logger.info(f"🎧 Song {song['id']} shares its recording with songs {[match['id'] for match in matches]}")
+
+    logger.info(f"🎧 Generated {generated}/{len(songs)} audio fingerprints.")
+    return generated
+
+
+def schedule_fingerprinting(songs: List[Dict[str, Any]]):
+    """Run fingerprinting as a background stage so ingest does not wait on audio decoding."""
+    if not songs:
+        return
+
+    task = asyncio.create_task(generate_fingerprints(songs))
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
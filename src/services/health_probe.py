@@ -0,0 +1,157 @@
+import os
+import time
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from loguru import logger
+from dotenv import load_dotenv
+from typing import Dict, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from src import database
+from src.services import process_pool
+from src.services.storage import storage
+from src.services.waveform import background_tasks as waveform_tasks
+from src.services.fingerprint import background_tasks as fingerprint_tasks
+
+# Load environment variables
+load_dotenv()
+
+# Health endpoints serve the prober's last snapshot, so polling them never touches the database
+HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", 5))
+HEALTH_DB_TIMEOUT = float(os.getenv("HEALTH_DB_TIMEOUT", 2))
+# A snapshot older than this means the prober itself is stuck
+HEALTH_STALE_SECONDS = float(os.getenv("HEALTH_STALE_SECONDS", HEALTH_PROBE_INTERVAL * 3))
+# Not ready above this share of pool connections in use, or this many queued CPU-bound jobs
+HEALTH_MAX_POOL_SATURATION = float(os.getenv("HEALTH_MAX_POOL_SATURATION", 0.9))
+HEALTH_MAX_QUEUE_DEPTH = int(os.getenv("HEALTH_MAX_QUEUE_DEPTH", 100))
+# Not ready when any of these directories has less free space (uploads are extracted into the temp dir)
+HEALTH_MIN_FREE_DISK_MB = int(os.getenv("HEALTH_MIN_FREE_DISK_MB", 1024))
+HEALTH_DISK_PATHS = os.getenv(
+    "HEALTH_DISK_PATHS",
+    ",".join([
+        os.getenv("CONTENT_BASE_DIR", "/app/data/clonehero_content"),
+        os.getenv("UPLOAD_DIR", "/app/data/uploads"),
+        tempfile.gettempdir(),
+    ])
+)
+
+
+def pool_usage() -> Optional[Dict[str, Any]]:
+    """This worker's pooled connections in use versus the pool size (None without a Postgres pool)."""
+    pool = database.db_pool
+    if pool is None:
+        return None
+    # psycopg2's pools keep checked-out connections in _used and idle ones in _pool
+    in_use = len(pool._used)
+    return {"in_use": in_use, "idle": len(pool._pool), "max": pool.maxconn, "saturation": round(in_use / pool.maxconn, 3)}
+
+
+def queue_depth() -> Dict[str, int]:
+    """CPU-bound jobs waiting in or running on the process pool, and pending waveform and fingerprint stages."""
+    executor = process_pool.process_pool
+    # ProcessPoolExecutor tracks submitted, unfinished jobs in _pending_work_items
+    process_jobs = len(executor._pending_work_items) if executor is not None else 0
+    return {
+        "process_pool": process_jobs,
+        "waveforms": len(waveform_tasks),
+        "fingerprints": len(fingerprint_tasks),
+        "total": process_jobs + len(waveform_tasks) + len(fingerprint_tasks),
+    }
+
+
+def free_disk_mb(path: str) -> Optional[int]:
+    """Free space in MB on the filesystem holding `path`, or None if it does not exist."""
+    try:
+        return shutil.disk_usage(Path(path)).free // (1024 * 1024)
+    except OSError:
+        return None
+
+
+class HealthProbe:
+    """Refreshes a health snapshot on a background thread; readers only ever see the cached result."""
+
+    def __init__(self):
+        self.snapshot: Dict[str, Any] = {"ready": False, "reasons": ["Starting up"], "checked_at": None}
+        self.thread: Optional[threading.Thread] = None
+        self.stop_event = threading.Event()
+        # The database check runs on its own thread so a hung query only delays that check
+        self.db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="health-db")
+        self.db_check = None
+
+    def check_database(self) -> Dict[str, Any]:
+        """Ping the database, giving up after HEALTH_DB_TIMEOUT."""
+        if self.db_check is None or self.db_check.done():
+            self.db_check = self.db_executor.submit(storage.ping)
+        start_time = time.perf_counter()
+        try:
+            self.db_check.result(timeout=HEALTH_DB_TIMEOUT)
+            return {"status": "ok", "latency_ms": round((time.perf_counter() - start_time) * 1000, 2)}
+        except FutureTimeoutError:
+            return {"status": "timeout", "latency_ms": None}
+        except Exception as e:
+            logger.warning(f"⚠️ Database health probe failed: {e}")
+            return {"status": "down", "error": str(e), "latency_ms": None}
+
+    def refresh(self):
+        """Run every check once and publish a new snapshot."""
+        db = self.check_database()
+        pool = pool_usage()
+        queue = queue_depth()
+        disks = {path: free_disk_mb(path) for path in HEALTH_DISK_PATHS.split(",") if path}
+
+        reasons = []
+        if db["status"] != "ok":
+            reasons.append(f"Database {db['status']}")
+        if pool and pool["saturation"] >= HEALTH_MAX_POOL_SATURATION:
+            reasons.append(f"Connection pool {pool['saturation']:.0%} in use")
+        if queue["total"] > HEALTH_MAX_QUEUE_DEPTH:
+            reasons.append(f"{queue['total']} jobs queued")
+        for path, free_mb in disks.items():
+            if free_mb is not None and free_mb < HEALTH_MIN_FREE_DISK_MB:
+                reasons.append(f"Only {free_mb} MB free on {path}")
+
+        self.snapshot = {
+            "ready": not reasons,
+            "reasons": reasons,
+            "checked_at": time.time(),
+            "database": db,
+            "pool": pool,
+            "queue_depth": queue,
+            "disk_free_mb": disks,
+        }
+
+    def run_forever(self):
+        """Refresh until stopped."""
+        while not self.stop_event.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.exception(f"❌ Health probe failed: {e}")
+            self.stop_event.wait(HEALTH_PROBE_INTERVAL)
+
+    def start(self):
+        """Start the prober thread (once per worker process)."""
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run_forever, name="health-probe", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the prober thread."""
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=HEALTH_DB_TIMEOUT + 1)
+        self.db_executor.shutdown(wait=False, cancel_futures=True)
+
+    def readiness(self) -> Tuple[bool, Dict[str, Any]]:
+        """Return (ready, snapshot); a stale snapshot is never ready."""
+        snapshot = self.snapshot
+        checked_at = snapshot["checked_at"]
+        if checked_at is not None and time.time() - checked_at > HEALTH_STALE_SECONDS:
+            return False, {**snapshot, "ready": False, "reasons": snapshot["reasons"] + ["Health probe is stale"]}
+        return snapshot["ready"], snapshot
+
+
+health_probe = HealthProbe()
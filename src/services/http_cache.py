@@ -0,0 +1,48 @@
+import hashlib
+from fastapi import Request, Response
+
+# Clients may store list responses but must revalidate them with If-None-Match
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+def make_etag(*parts) -> str:
+    """Build a strong ETag (quoted) from bytes or values that identify a representation."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, (bytes, bytearray, memoryview)) else str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def library_etag(request: Request, library_version: int):
+    """ETag for a list response: changes whenever the library version or the query changes."""
+    if library_version < 0:
+        return None  # Version unknown, so the response cannot be validated
+    return make_etag("library", library_version, request.url.path, request.url.query)
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Return True if the request's If-None-Match header matches the given ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    # Weak comparison is the rule for If-None-Match (RFC 9110 13.1.2)
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+
+def set_etag_headers(response: Response, etag: str, cache_control: str = REVALIDATE_CACHE_CONTROL):
+    """Attach the ETag and Cache-Control headers to a response."""
+    if not etag:
+        return
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+
+
+def not_modified(etag: str, cache_control: str = REVALIDATE_CACHE_CONTROL) -> Response:
+    """Build an empty 304 response carrying the current validators."""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
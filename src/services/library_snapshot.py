@@ -0,0 +1,397 @@
+import os
+import sys
+import time
+import threading
+import numpy as np
+from loguru import logger
+from dotenv import load_dotenv
+from typing import Dict, Any, List, Optional, Tuple
+from src.database import get_connection
+
+# Load environment variables
+load_dotenv()
+
+# The snapshot is optional: each worker holds its own copy of the library columns
+LIBRARY_SNAPSHOT_ENABLED = os.getenv("LIBRARY_SNAPSHOT_ENABLED", "false").lower() in ("1", "true", "yes")
+LIBRARY_SNAPSHOT_MAX_MB = int(os.getenv("LIBRARY_SNAPSHOT_MAX_MB", 256))
+LIBRARY_SNAPSHOT_MAX_BYTES = LIBRARY_SNAPSHOT_MAX_MB * 1024 * 1024
+BUILD_FETCH_SIZE = 10000  # Rows per round trip of the server-side cursor
+INITIAL_CAPACITY = 1024
+
+# Numeric columns (NaN = unknown); year and song length are parsed from song.ini metadata
+NUMERIC_COLUMNS = ("tempo_min", "tempo_max", "peak_nps", "year", "song_length")
+# Dictionary-encoded string columns (-1 = unknown)
+CODED_COLUMNS = ("artist", "album", "genre")
+SORT_COLUMNS = ("id",) + NUMERIC_COLUMNS + CODED_COLUMNS
+
+SNAPSHOT_QUERY = """
+    SELECT
+        id, artist, album, NULLIF(TRIM(metadata->>'genre'), ''),
+        tempo_min, tempo_max, peak_nps,
+        SUBSTRING(metadata->>'year' FROM '\\d{4}')::REAL,
+        CASE WHEN metadata->>'song_length' ~ '^\\d+$' THEN (metadata->>'song_length')::REAL / 1000 END
+    FROM songs
+"""
+
+
+class StringDictionary:
+    """Maps repeated strings (artists, albums, genres) to dense integer codes."""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+        self.string_bytes = 0
+        self.sort_ranks: Optional[np.ndarray] = None  # Alphabetical rank per code, built on demand
+
+    def encode(self, value: Optional[str]) -> int:
+        """Return the code for a string, adding it on first sight."""
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self.codes[value] = code
+            self.string_bytes += sys.getsizeof(value)
+            self.sort_ranks = None
+        return code
+
+    def ranks(self) -> np.ndarray:
+        """Return each code's position in case-insensitive alphabetical order."""
+        if self.sort_ranks is None or len(self.sort_ranks) != len(self.values):
+            order = sorted(range(len(self.values)), key=lambda code: self.values[code].casefold())
+            self.sort_ranks = np.empty(len(self.values), dtype=np.int32)
+            self.sort_ranks[order] = np.arange(len(self.values), dtype=np.int32)
+        return self.sort_ranks
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the strings, list and lookup dict."""
+        return self.string_bytes + sys.getsizeof(self.values) + sys.getsizeof(self.codes)
+
+
+class LibrarySnapshot:
+    """
+    Column-oriented copy of the song library for vectorized filtering, sorting and facets.
+    Rows are kept sorted by song ID so lookups for incremental updates are a binary search.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ready = False
+        self.building = False
+        self.rebuild_queued = False  # A rebuild was requested while one was running
+        self.error: Optional[str] = None
+        self.pending: List[Dict[str, Any]] = []  # Change events received while a build is running
+        self.loaded_at: Optional[float] = None
+        self.reset()
+
+    def reset(self, capacity: int = INITIAL_CAPACITY):
+        """Empty the snapshot."""
+        self.size = 0
+        self.ids = np.empty(capacity, dtype=np.int32)
+        self.numeric = {name: np.empty(capacity, dtype=np.float32) for name in NUMERIC_COLUMNS}
+        self.coded = {name: np.empty(capacity, dtype=np.int32) for name in CODED_COLUMNS}
+        self.dictionaries = {name: StringDictionary() for name in CODED_COLUMNS}
+
+    def all_columns(self) -> List[np.ndarray]:
+        """Return every column buffer."""
+        return [self.ids, *self.numeric.values(), *self.coded.values()]
+
+    def nbytes(self) -> int:
+        """Memory held by the column buffers and string dictionaries."""
+        return sum(column.nbytes for column in self.all_columns()) + sum(
+            dictionary.nbytes() for dictionary in self.dictionaries.values()
+        )
+
+    def ensure_capacity(self, needed: int):
+        """Grow every column buffer geometrically so appends stay amortized O(1)."""
+        capacity = len(self.ids)
+        if needed <= capacity:
+            return
+        capacity = max(needed, int(capacity * 1.5))
+
+        def grow(column):
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            return grown
+
+        self.ids = grow(self.ids)
+        self.numeric = {name: grow(column) for name, column in self.numeric.items()}
+        self.coded = {name: grow(column) for name, column in self.coded.items()}
+
+    def write_row(self, position: int, row: Tuple):
+        """Store one (id, artist, album, genre, tempo_min, tempo_max, peak_nps, year, song_length) row."""
+        song_id, artist, album, genre, *numbers = row
+        self.ids[position] = song_id
+        for name, value in zip(CODED_COLUMNS, (artist, album, genre)):
+            self.coded[name][position] = self.dictionaries[name].encode(value)
+        for name, value in zip(NUMERIC_COLUMNS, numbers):
+            self.numeric[name][position] = np.nan if value is None else value
+
+    def shift(self, start: int, offset: int):
+        """Move rows from `start` onwards by `offset` positions (in place, no reallocation)."""
+        for column in self.all_columns():
+            column[start + offset:self.size + offset] = column[start:self.size].copy()
+
+    def upsert(self, row: Tuple):
+        """Insert or replace a row, keeping rows ordered by ID."""
+        position = int(np.searchsorted(self.ids[:self.size], row[0]))
+        if position < self.size and self.ids[position] == row[0]:
+            self.write_row(position, row)
+            return
+
+        self.ensure_capacity(self.size + 1)
+        if position < self.size:
+            self.shift(position, 1)  # Rare: new IDs are normally the largest
+        self.size += 1
+        self.write_row(position, row)
+
+    def delete(self, song_id: int):
+        """Remove a row by song ID."""
+        position = int(np.searchsorted(self.ids[:self.size], song_id))
+        if position < self.size and self.ids[position] == song_id:
+            self.shift(position + 1, -1)
+            self.size -= 1
+
+    def load(self) -> "LibrarySnapshot":
+        """Read the library into a new, unshared snapshot; raises if it would exceed the memory limit."""
+        fresh = LibrarySnapshot.__new__(LibrarySnapshot)
+        fresh.reset()
+        with get_connection() as conn:
+            # A named cursor streams rows from the server instead of loading the table at once
+            with conn.cursor(name="library_snapshot_build") as cursor:
+                cursor.itersize = BUILD_FETCH_SIZE
+                cursor.execute(SNAPSHOT_QUERY + " ORDER BY id")
+                while rows := cursor.fetchmany(BUILD_FETCH_SIZE):
+                    fresh.ensure_capacity(fresh.size + len(rows))
+                    for row in rows:
+                        fresh.write_row(fresh.size, row)
+                        fresh.size += 1
+                    if fresh.nbytes() > LIBRARY_SNAPSHOT_MAX_BYTES:
+                        raise MemoryError(
+                            f"Library snapshot exceeds LIBRARY_SNAPSHOT_MAX_MB={LIBRARY_SNAPSHOT_MAX_MB} "
+                            f"after {fresh.size} songs"
+                        )
+            conn.rollback()
+        return fresh
+
+    def build(self):
+        """
+        Load the snapshot from one streaming query; gives up if it would exceed the memory limit.
+        Only one build runs at a time: a request made meanwhile is queued and runs once after it.
+        """
+        with self.lock:
+            if self.building:
+                self.rebuild_queued = True
+                return
+            self.building = True
+
+        while True:
+            with self.lock:
+                self.rebuild_queued = False
+                self.pending = []
+
+            start = time.perf_counter()
+            try:
+                fresh, error = self.load(), None
+            except Exception as e:
+                fresh, error = None, e
+                logger.error(f"❌ Failed to build library snapshot: {e}")
+
+            with self.lock:
+                if fresh is not None:
+                    self.size, self.ids, self.numeric, self.coded = fresh.size, fresh.ids, fresh.numeric, fresh.coded
+                    self.dictionaries = fresh.dictionaries
+                    self.ready = True
+                    self.error = None
+                    self.loaded_at = time.time()
+                else:
+                    self.ready = False
+                    self.error = str(error)
+                    self.reset()
+                if not self.rebuild_queued:
+                    self.building = False
+                    pending, self.pending = self.pending, []
+                    break
+
+        if fresh is None:
+            return
+        logger.success(
+            f"🧮 Library snapshot loaded: {self.size} songs, {self.nbytes() / (1024 * 1024):.1f} MB "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+        if pending:
+            self.apply_changes(pending)  # Replay changes the build's snapshot may have missed
+
+    def apply_changes(self, events: List[Dict[str, Any]]):
+        """Apply a batch of change feed events, re-reading inserted and updated rows in one query."""
+        with self.lock:
+            if self.building:
+                if any(event.get("op") == "RESYNC" for event in events):
+                    self.rebuild_queued = True  # Picked up by the running build
+                else:
+                    self.pending.extend(events)
+                return
+
+        if any(event.get("op") == "RESYNC" for event in events):
+            threading.Thread(target=self.build, name="library-snapshot-build", daemon=True).start()
+            return
+
+        with self.lock:
+            if not self.ready:
+                return
+
+        changed_ids = list({event["id"] for event in events if "id" in event})
+        if not changed_ids:
+            return
+
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(SNAPSHOT_QUERY + " WHERE id = ANY(%s)", (changed_ids,))
+                rows = {row[0]: row for row in cursor.fetchall()}
+            conn.rollback()
+
+        with self.lock:
+            for song_id in sorted(changed_ids):
+                if song_id in rows:
+                    self.upsert(rows[song_id])
+                else:
+                    self.delete(song_id)
+
+            if self.nbytes() > LIBRARY_SNAPSHOT_MAX_BYTES:
+                self.ready = False
+                self.error = f"Library snapshot exceeds LIBRARY_SNAPSHOT_MAX_MB={LIBRARY_SNAPSHOT_MAX_MB}"
+                self.reset()
+                logger.warning(f"⚠️ {self.error}; snapshot disabled until the next rebuild")
+
+    def filter_mask(self, filters: Dict[str, Any]) -> np.ndarray:
+        """Build a boolean row mask from equality filters on coded columns and ranges on numeric ones."""
+        mask = np.ones(self.size, dtype=bool)
+        for name in CODED_COLUMNS:
+            if filters.get(name) is not None:
+                code = self.dictionaries[name].codes.get(filters[name], -2)  # -2 matches nothing
+                mask &= self.coded[name][:self.size] == code
+        for name in NUMERIC_COLUMNS:
+            column = self.numeric[name][:self.size]
+            if filters.get(f"min_{name}") is not None:
+                mask &= column >= filters[f"min_{name}"]  # NaN compares False, so unknowns drop out
+            if filters.get(f"max_{name}") is not None:
+                mask &= column <= filters[f"max_{name}"]
+        return mask
+
+    def sort_key(self, sort: str, rows: np.ndarray, descending: bool) -> np.ndarray:
+        """Return a numeric key for sorting the selected rows, with unknown values always last."""
+        if sort == "id":
+            key = self.ids[rows].astype(np.float64)
+        elif sort in CODED_COLUMNS:
+            codes = self.coded[sort][rows]
+            ranks = self.dictionaries[sort].ranks()
+            key = np.where(codes >= 0, ranks[np.maximum(codes, 0)], np.nan).astype(np.float64)
+        else:
+            key = self.numeric[sort][rows].astype(np.float64)
+
+        if descending:
+            key = -key
+        return np.where(np.isnan(key), np.inf, key)
+
+    def facet_counts(self, name: str, rows: np.ndarray, limit: int) -> List[Dict[str, Any]]:
+        """Count the selected rows per value of a coded column (or per year) and return the top values."""
+        if name == "year":
+            years = self.numeric["year"][rows]
+            values, counts = np.unique(years[~np.isnan(years)].astype(np.int32), return_counts=True)
+            labels = values.tolist()
+        else:
+            codes = self.coded[name][rows]
+            counts = np.bincount(codes[codes >= 0], minlength=len(self.dictionaries[name].values))
+            values = np.flatnonzero(counts)
+            counts = counts[values]
+            labels = [self.dictionaries[name].values[code] for code in values]
+
+        top = np.argsort(-counts, kind="stable")[:limit]
+        return [{"value": labels[i], "count": int(counts[i])} for i in top]
+
+    def row_to_dict(self, position: int) -> Dict[str, Any]:
+        """Decode one row."""
+        song = {"id": int(self.ids[position])}
+        for name in CODED_COLUMNS:
+            code = self.coded[name][position]
+            song[name] = self.dictionaries[name].values[code] if code >= 0 else None
+        for name in NUMERIC_COLUMNS:
+            value = self.numeric[name][position]
+            song[name] = None if np.isnan(value) else round(float(value), 3)
+        if song["year"] is not None:
+            song["year"] = int(song["year"])
+        return song
+
+    def query(
+        self,
+        filters: Dict[str, Any],
+        sort: str = "id",
+        descending: bool = True,
+        skip: int = 0,
+        limit: int = 50,
+        facets: Optional[List[str]] = None,
+        facet_limit: int = 20
+    ) -> Dict[str, Any]:
+        """Filter, sort and page the library, optionally with facet counts over the filtered rows."""
+        start = time.perf_counter()
+        with self.lock:
+            rows = np.flatnonzero(self.filter_mask(filters))
+            total = int(rows.size)
+
+            end = min(skip + limit, total)
+            if skip < end:
+                key = self.sort_key(sort, rows, descending)
+                if end < total:
+                    # Only the rows up to the requested page need a full sort
+                    candidates = np.argpartition(key, end - 1)[:end]
+                    order = candidates[np.lexsort((self.ids[rows[candidates]], key[candidates]))]
+                else:
+                    order = np.lexsort((self.ids[rows], key))
+                songs = [self.row_to_dict(position) for position in rows[order[skip:end]]]
+            else:
+                songs = []
+
+            facet_results = {name: self.facet_counts(name, rows, facet_limit) for name in facets or []}
+
+        return {
+            "total": total,
+            "returned": len(songs),
+            "songs": songs,
+            "facets": facet_results,
+            "took_ms": round((time.perf_counter() - start) * 1000, 3),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Report the snapshot's size and memory use."""
+        with self.lock:
+            return {
+                "enabled": LIBRARY_SNAPSHOT_ENABLED,
+                "ready": self.ready,
+                "building": self.building,
+                "error": self.error,
+                "songs": self.size,
+                "capacity": len(self.ids),
+                "distinct": {name: len(dictionary.values) for name, dictionary in self.dictionaries.items()},
+                "memory_bytes": self.nbytes(),
+                "memory_limit_bytes": LIBRARY_SNAPSHOT_MAX_BYTES,
+                "loaded_at": self.loaded_at,
+            }
+
+
+def get_song_titles(song_ids: List[int]) -> Dict[int, str]:
+    """Fetch titles for one page of snapshot results (titles are not kept in the snapshot)."""
+    if not song_ids:
+        return {}
+    try:
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT id, title FROM songs WHERE id = ANY(%s)", (song_ids,))
+                return dict(cursor.fetchall())
+    except Exception as e:
+        logger.exception(f"❌ Error fetching song titles: {e}")
+        return {}
+
+
+# One snapshot per worker process, kept current by the change feed
+library_snapshot = LibrarySnapshot()
@@ -0,0 +1,120 @@
+import os
+import time
+import shutil
+import tempfile
+import requests
+from pathlib import Path
+from loguru import logger
+from dotenv import load_dotenv
+from typing import Dict, Any, List
+from src.services.storage import storage
+from src.services.upload_sessions import cleanup_stale_uploads
+from src.services.blob_store import blob_store_enabled, collect_garbage
+
+# Load environment variables
+load_dotenv()
+
+API_URL = os.getenv("API_URL", "http://clonehero_api:8000")
+
+# Same directory the API extracts archives into (content_utils.EXTRACT_TEMP_DIR); must be shared with the API
+EXTRACT_TEMP_DIR = Path(os.getenv("EXTRACT_TEMP_DIR", tempfile.gettempdir()))
+# extract_* folders untouched for this long belong to crashed or killed ingests
+EXTRACT_TEMP_MAX_AGE = int(os.getenv("EXTRACT_TEMP_MAX_AGE", 3600))
+
+# GET endpoints requested to warm the API's caches and Postgres' buffer cache after restarts and rebuilds
+CACHE_WARM_PATHS = os.getenv("CACHE_WARM_PATHS", "/songs/?limit=50,/songs/tree")
+
+# Change log rows (SQLite) are only needed until every API worker has polled them
+CHANGE_LOG_RETENTION_HOURS = int(os.getenv("CHANGE_LOG_RETENTION_HOURS", 24))
+
+# Indexes the weekly maintain_indexes job rebuilds with REINDEX INDEX CONCURRENTLY (Postgres), e.g.
+# "idx_songs_title_trgm,idx_songs_artist_album_title". Empty by default: a rebuild rewrites the whole index,
+# so list only indexes whose measured bloat (e.g. pgstatindex / pgstatginindex) calls for it
+REINDEX_INDEXES = [name.strip() for name in os.getenv("REINDEX_INDEXES", "").split(",") if name.strip()]
+
+VACUUM_TABLES = ["songs", "song_chart_stats"]
+ANALYZE_TABLES = ["song_chart_stats", "song_waveforms", "assets"]
+
+
+def cleanup_temp_extracts() -> str:
+    """Remove extract_* folders (and files) older than EXTRACT_TEMP_MAX_AGE left behind by failed ingests."""
+    if not EXTRACT_TEMP_DIR.exists():
+        return "No extract directory"
+
+    removed, freed = 0, 0
+    cutoff = time.time() - EXTRACT_TEMP_MAX_AGE
+    for path in EXTRACT_TEMP_DIR.glob("extract_*"):
+        try:
+            if path.stat().st_mtime >= cutoff:
+                continue
+            if path.is_dir():
+                freed += sum(file.stat().st_size for file in path.rglob("*") if file.is_file())
+                shutil.rmtree(path)
+            else:
+                freed += path.stat().st_size
+                path.unlink()
+            removed += 1
+        except OSError as e:
+            logger.warning(f"⚠️ Could not remove {path}: {e}")
+    return f"Removed {removed} leftover extract folders ({freed / 1e6:.1f} MB)"
+
+
+def cleanup_uploads() -> str:
+    """Remove resumable upload sessions abandoned for longer than UPLOAD_SESSION_MAX_AGE."""
+    return f"Removed {cleanup_stale_uploads()} stale upload sessions"
+
+
+def warm_caches() -> str:
+    """Request the most common listing endpoints so the first user after a restart hits warm caches."""
+    warmed: List[str] = []
+    for path in filter(None, (path.strip() for path in CACHE_WARM_PATHS.split(","))):
+        try:
+            response = requests.get(f"{API_URL}{path}", timeout=30)
+            if response.ok:
+                warmed.append(path)
+            else:
+                logger.warning(f"⚠️ Cache warm-up of {path} returned {response.status_code}")
+        except requests.RequestException as e:
+            logger.warning(f"⚠️ Cache warm-up of {path} failed: {e}")
+    return f"Warmed {len(warmed)} endpoints"
+
+
+def vacuum_analyze() -> str:
+    """Reclaim dead rows and refresh statistics for the song tables."""
+    storage.vacuum_analyze(VACUUM_TABLES)
+    return f"Vacuumed and analyzed {', '.join(VACUUM_TABLES)}"
+
+
+def refresh_stats() -> str:
+    """Refresh planner statistics for the smaller tables."""
+    storage.analyze(ANALYZE_TABLES)
+    return f"Analyzed {', '.join(ANALYZE_TABLES)}"
+
+
+def maintain_indexes() -> str:
+    """Compact the song search indexes and rebuild the ones listed in REINDEX_INDEXES."""
+    rebuilt = storage.maintain_indexes(REINDEX_INDEXES)
+    return f"Search indexes compacted; rebuilt {', '.join(rebuilt) or 'none'}"
+
+
+def prune_change_log() -> str:
+    """Remove song_changes rows older than CHANGE_LOG_RETENTION_HOURS (SQLite storage)."""
+    removed = storage.prune_song_changes(CHANGE_LOG_RETENTION_HOURS * 3600)
+    return f"Removed {removed} change log rows"
+
+
+def collect_blobs() -> str:
+    """Remove blobs left unreferenced by deleted songs (STORAGE_MODE=blobs)."""
+    if not blob_store_enabled():
+        return "Blob store disabled"
+    result = collect_garbage()
+    return f"Removed {result['removed']} unreferenced blobs ({result['freed_bytes'] / 1e6:.1f} MB), {result['skipped']} still linked"
+
+
+def ingest_busy(api_health: Dict[str, Any], max_queue_depth: int, max_pool_saturation: float) -> bool:
+    """True when the API's last health report shows queued ingest work or a busy connection pool."""
+    if not api_health:
+        return False
+    queue_depth = (api_health.get("queue_depth") or {}).get("total", 0)
+    pool = api_health.get("pool") or {}
+    return queue_depth >= max_queue_depth or pool.get("saturation", 0) >= max_pool_saturation
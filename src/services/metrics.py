@@ -0,0 +1,119 @@
+import os
+import time
+from pathlib import Path
+from contextlib import contextmanager
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest, multiprocess
+)
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Under gunicorn every worker writes its samples to this directory and /metrics merges them,
+# so a scrape sees the whole API rather than whichever worker answered it
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+if PROMETHEUS_MULTIPROC_DIR:
+    Path(PROMETHEUS_MULTIPROC_DIR).mkdir(parents=True, exist_ok=True)  # Also covers runs without gunicorn.conf.py
+
+REQUEST_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+INGEST_STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "clonehero_http_request_duration_seconds",
+    "API request latency by route template.",
+    ["method", "route", "status"],
+    buckets=REQUEST_LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "clonehero_http_requests_in_flight",
+    "API requests currently being handled.",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_IN_USE = Gauge(
+    "clonehero_db_pool_connections_in_use",
+    "Database connections checked out of the pool.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_IDLE = Gauge(
+    "clonehero_db_pool_connections_idle",
+    "Open database connections waiting in the pool.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_MAX = Gauge(
+    "clonehero_db_pool_connections_max",
+    "Maximum database connections across worker pools.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_EXHAUSTED = Counter(
+    "clonehero_db_pool_exhausted_total",
+    "Connection requests refused because the pool stayed exhausted for DB_POOL_TIMEOUT.",
+)
+
+INGEST_STAGE_DURATION = Histogram(
+    "clonehero_ingest_stage_duration_seconds",
+    "Time spent in each ingest stage (upload, extract, parse, move, db_write).",
+    ["stage", "content_type"],
+    buckets=INGEST_STAGE_BUCKETS,
+)
+INGEST_SONGS = Counter(
+    "clonehero_ingest_songs_total",
+    "Songs processed by ingest, by outcome.",
+    ["outcome"],
+)
+INGEST_BYTES = Counter(
+    "clonehero_ingest_bytes_total",
+    "Bytes received by upload endpoints.",
+    ["content_type"],
+)
+
+SCHEDULER_JOB_RUNS = Counter(
+    "clonehero_scheduler_job_runs_total",
+    "Scheduled worker jobs by outcome (success, failure, timeout, skipped_overlap, deferred, skipped_busy).",
+    ["job", "outcome"],
+)
+SCHEDULER_JOB_DURATION = Histogram(
+    "clonehero_scheduler_job_duration_seconds",
+    "Run time of scheduled worker jobs.",
+    ["job"],
+    buckets=INGEST_STAGE_BUCKETS,
+)
+SCHEDULER_JOB_LAST_SUCCESS = Gauge(
+    "clonehero_scheduler_job_last_success_timestamp_seconds",
+    "Unix time of each scheduled job's last successful run.",
+    ["job"],
+    multiprocess_mode="max",
+)
+
+
+@contextmanager
+def observe_stage(stage: str, content_type: str = "songs"):
+    """Time a block of ingest work into the stage histogram."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        INGEST_STAGE_DURATION.labels(stage=stage, content_type=content_type).observe(time.perf_counter() - start)
+
+
+def observe_db_pool(pool):
+    """Record the pool's in-use and idle connection counts."""
+    if pool is None:
+        return
+    # psycopg2's pools keep checked-out connections in _used and idle ones in _pool
+    DB_POOL_IN_USE.set(len(pool._used))
+    DB_POOL_IDLE.set(len(pool._pool))
+    DB_POOL_MAX.set(pool.maxconn)
+
+
+def render_metrics():
+    """Return (body, content type) for a scrape, merging every worker's samples when multiprocess mode is on."""
+    if PROMETHEUS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+
+    from prometheus_client import REGISTRY
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,428 @@
+import os
+import re
+import sys
+import time
+import fcntl
+import sqlite3
+import hashlib
+import argparse
+import importlib.util
+from pathlib import Path
+from loguru import logger
+from dotenv import load_dotenv
+from typing import Dict, Any, List, Optional, Tuple
+
+# Load environment variables
+load_dotenv()
+
+# Migrations live in sql/migrations/<backend>/ as NNNN_name.sql or NNNN_name.py and run in version order.
+# Applied migrations are recorded with a checksum in schema_migrations; editing an applied file is an error,
+# so schema changes always go in a new migration.
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "sql" / "migrations"
+MIGRATION_FILE_PATTERN = re.compile(r"^(\d{4})_([a-z0-9_]+)\.(sql|py)$")
+
+# A SQL migration with this line runs statement by statement outside a transaction, as CREATE INDEX CONCURRENTLY
+# requires. It is recorded only once every statement succeeded, so its statements must be safe to re-run.
+NO_TRANSACTION_DIRECTIVE = "-- migrate: no-transaction"
+
+# Key of the Postgres session advisory lock held while migrating, so concurrent workers apply each migration once
+MIGRATION_LOCK_KEY = 4_520_045
+# DDL waiting on a table lock blocks every query queued behind it; give up (and retry at the next start) instead
+MIGRATION_LOCK_TIMEOUT = os.getenv("MIGRATION_LOCK_TIMEOUT", "10s")
+# Batched backfills commit every batch and pause between batches to leave room for live traffic
+MIGRATION_BATCH_SIZE = int(os.getenv("MIGRATION_BATCH_SIZE", 1000))
+MIGRATION_BATCH_SLEEP_MS = int(os.getenv("MIGRATION_BATCH_SLEEP_MS", 50))
+
+
+class MigrationError(Exception):
+    """A migration failed, is misnamed, or was changed after being applied."""
+
+
+class Migration:
+    """One migration file."""
+
+    def __init__(self, path: Path):
+        match = MIGRATION_FILE_PATTERN.match(path.name)
+        if not match:
+            raise MigrationError(f"Migration file name must look like 0001_name.sql or 0001_name.py: {path.name}")
+        self.path = path
+        self.version, self.name, self.kind = match.groups()
+        self.source = path.read_text(encoding="utf-8")
+        self.checksum = hashlib.sha256(self.source.encode("utf-8")).hexdigest()
+
+    def __str__(self) -> str:
+        return f"{self.version}_{self.name}"
+
+    @property
+    def transactional(self) -> bool:
+        """SQL migrations run in one transaction unless marked; Python ones unless they set TRANSACTIONAL = False."""
+        if self.kind == "sql":
+            return NO_TRANSACTION_DIRECTIVE not in self.source
+        return not re.search(r"^TRANSACTIONAL\s*=\s*False", self.source, re.MULTILINE)
+
+    def load_module(self):
+        """Import a Python migration, which defines migrate(runner)."""
+        spec = importlib.util.spec_from_file_location(f"migration_{self.version}_{self.name}", self.path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+
+def load_migrations(backend: str) -> List[Migration]:
+    """Return the backend's migrations in version order."""
+    migrations = [
+        Migration(path) for path in sorted((MIGRATIONS_DIR / backend).iterdir())
+        if path.suffix in (".sql", ".py") and not path.name.startswith("__")
+    ]
+    versions = [migration.version for migration in migrations]
+    duplicates = sorted({version for version in versions if versions.count(version) > 1})
+    if duplicates:
+        raise MigrationError(f"Duplicate migration versions for {backend}: {', '.join(duplicates)}")
+    return migrations
+
+
+class MigrationRunner:
+    """
+    Applies pending migrations over one dedicated connection while holding a cross-process lock.
+    Subclasses provide the backend's locking, transactions and statement execution.
+    """
+
+    backend = "base"
+    placeholder = "%s"
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.current: Optional[Migration] = None
+
+    def lock(self):
+        """Block until no other process is migrating."""
+        raise NotImplementedError
+
+    def unlock(self):
+        """Release the migration lock."""
+        raise NotImplementedError
+
+    def begin(self):
+        """Start a transaction."""
+        raise NotImplementedError
+
+    def commit(self):
+        """Commit the current transaction."""
+        self.conn.commit()
+
+    def rollback(self):
+        """Roll back the current transaction."""
+        self.conn.rollback()
+
+    def execute(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        """Run one statement and return its rows, if any."""
+        raise NotImplementedError
+
+    def split_statements(self, sql: str) -> List[str]:
+        """Split a script into statements (semicolon at end of line, outside $$-quoted bodies)."""
+        statements, current, in_dollar_quote = [], [], False
+        for line in sql.splitlines():
+            current.append(line)
+            if line.count("$$") % 2:
+                in_dollar_quote = not in_dollar_quote
+            if not in_dollar_quote and line.rstrip().endswith(";"):
+                statements.append("\n".join(current))
+                current = []
+        statements.append("\n".join(current))
+        return [statement for statement in statements if self.has_sql(statement)]
+
+    @staticmethod
+    def has_sql(statement: str) -> bool:
+        """True unless the chunk is only whitespace and comments."""
+        return any(line.strip() and not line.strip().startswith("--") for line in statement.splitlines())
+
+    def ensure_table(self):
+        """Create the schema_migrations bookkeeping table."""
+        self.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                checksum TEXT NOT NULL,
+                duration_ms INTEGER NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+
+    def applied(self) -> Dict[str, Dict[str, Any]]:
+        """Applied migrations keyed by version."""
+        rows = self.execute("SELECT version, name, checksum, applied_at FROM schema_migrations ORDER BY version")
+        return {row[0]: {"name": row[1], "checksum": row[2], "applied_at": row[3]} for row in rows}
+
+    def record(self, migration: Migration, duration_ms: int):
+        """Mark a migration as applied."""
+        p = self.placeholder
+        self.execute(
+            f"INSERT INTO schema_migrations (version, name, checksum, duration_ms) VALUES ({p}, {p}, {p}, {p})",
+            (migration.version, migration.name, migration.checksum, duration_ms)
+        )
+
+    def run_migration(self, migration: Migration):
+        """Execute a migration's SQL or Python body."""
+        if migration.kind == "py":
+            migration.load_module().migrate(self)
+        elif migration.transactional:
+            self.execute_script(migration.source)
+        else:
+            for statement in self.split_statements(migration.source):
+                self.execute(statement)
+
+    def execute_script(self, sql: str):
+        """Run a whole script inside the current transaction."""
+        for statement in self.split_statements(sql):
+            self.execute(statement)
+
+    def apply(self, migration: Migration):
+        """Apply one migration and record it (in the same transaction when it is transactional)."""
+        logger.info(f"🧱 Applying migration {migration}{'' if migration.transactional else ' (no transaction)'}...")
+        self.current = migration
+        start_time = time.perf_counter()
+        if migration.transactional:
+            self.begin()
+            try:
+                self.run_migration(migration)
+                self.record(migration, int((time.perf_counter() - start_time) * 1000))
+                self.commit()
+            except Exception:
+                self.rollback()
+                raise
+        else:
+            self.run_migration(migration)
+            self.record(migration, int((time.perf_counter() - start_time) * 1000))
+        self.current = None
+        logger.success(f"✅ Applied migration {migration} in {time.perf_counter() - start_time:.2f}s")
+
+    def pending(self) -> List[Migration]:
+        """Migrations not applied yet; raises if an applied migration's file changed or disappeared."""
+        migrations = load_migrations(self.backend)
+        applied = self.applied()
+        known = {migration.version for migration in migrations}
+        missing = sorted(set(applied) - known)
+        if missing:
+            raise MigrationError(f"Applied migrations missing from {MIGRATIONS_DIR / self.backend}: {', '.join(missing)}")
+
+        pending = []
+        for migration in migrations:
+            record = applied.get(migration.version)
+            if record is None:
+                pending.append(migration)
+            elif record["checksum"] != migration.checksum:
+                raise MigrationError(
+                    f"Migration {migration} changed after it was applied; add a new migration instead of editing it"
+                )
+        return pending
+
+    def run(self) -> List[str]:
+        """Apply every pending migration under the lock; returns the applied names."""
+        self.lock()
+        try:
+            self.ensure_table()
+            pending = self.pending()
+            if not pending:
+                logger.info(f"✅ {self.backend} schema is up to date.")
+            for migration in pending:
+                self.apply(migration)
+            return [str(migration) for migration in pending]
+        finally:
+            self.unlock()
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Each migration with its state: applied, pending or changed."""
+        self.ensure_table()
+        applied = self.applied()
+        statuses = []
+        for migration in load_migrations(self.backend):
+            record = applied.get(migration.version)
+            state = "pending" if record is None else "applied" if record["checksum"] == migration.checksum else "changed"
+            statuses.append({
+                "migration": str(migration),
+                "state": state,
+                "applied_at": record["applied_at"] if record else None
+            })
+        return statuses
+
+    def backfill(
+        self,
+        table: str,
+        set_sql: str,
+        where_sql: str,
+        params: Tuple = (),
+        batch_size: int = MIGRATION_BATCH_SIZE,
+        sleep_ms: int = MIGRATION_BATCH_SLEEP_MS
+    ) -> int:
+        """
+        UPDATE `table` SET `set_sql` on rows matching `where_sql` in id-ordered batches, committing each batch
+        and pausing between them, so no long transaction holds row locks. `where_sql` should exclude rows that
+        are already done (e.g. `match_key IS NULL`) so an interrupted backfill resumes where it stopped.
+        Call it from a Python migration with TRANSACTIONAL = False. Returns the number of rows updated.
+        """
+        p = self.placeholder
+        total = self.execute(f"SELECT COUNT(*) FROM {table} WHERE {where_sql}", params)[0][0]
+        logger.info(f"🔁 Backfilling {total} rows of {table} ({self.current})...")
+        done, last_id = 0, 0
+        while True:
+            self.begin()
+            try:
+                rows = self.execute(
+                    f"""
+                    UPDATE {table} SET {set_sql}
+                    WHERE id IN (SELECT id FROM {table} WHERE id > {p} AND ({where_sql}) ORDER BY id LIMIT {p})
+                    RETURNING id
+                    """,
+                    (last_id, *params, batch_size)
+                )
+                self.commit()
+            except Exception:
+                self.rollback()
+                raise
+            if not rows:
+                break
+
+            done += len(rows)
+            last_id = max(row[0] for row in rows)
+            logger.info(f"🔁 {table} backfill: {done}/{total} rows ({done * 100 // max(total, 1)}%)")
+            time.sleep(sleep_ms / 1000)
+        return done
+
+
+class PostgresMigrationRunner(MigrationRunner):
+    """Runs on a dedicated connection holding a session advisory lock."""
+
+    backend = "postgres"
+
+    def __init__(self, conn):
+        super().__init__(conn)
+        self.conn.autocommit = True
+
+    def lock(self):
+        """Wait for the advisory lock, then bound how long DDL may wait for table locks."""
+        self.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_KEY,))
+        self.execute("SET lock_timeout = %s", (MIGRATION_LOCK_TIMEOUT,))
+        self.execute("SET statement_timeout = 0")  # Index builds and backfill batches may take a while
+
+    def unlock(self):
+        """Release the advisory lock (closing the connection would too)."""
+        if self.conn.closed:
+            return
+        if not self.conn.autocommit:
+            self.rollback()
+        self.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_KEY,))
+
+    def begin(self):
+        """Leave autocommit so the following statements share a transaction."""
+        self.conn.autocommit = False
+
+    def commit(self):
+        """Commit and return to autocommit."""
+        self.conn.commit()
+        self.conn.autocommit = True
+
+    def rollback(self):
+        """Roll back and return to autocommit."""
+        self.conn.rollback()
+        self.conn.autocommit = True
+
+    def execute(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        """Run one statement and return its rows, if any."""
+        with self.conn.cursor() as cursor:
+            cursor.execute(sql, params or None)
+            return cursor.fetchall() if cursor.description else []
+
+    def execute_script(self, sql: str):
+        """Postgres accepts the whole script in one call."""
+        self.execute(sql)
+
+
+class SQLiteMigrationRunner(MigrationRunner):
+    """Runs with explicit transactions, serialized across processes by a lock file next to the database."""
+
+    backend = "sqlite"
+    placeholder = "?"
+
+    def __init__(self, conn: sqlite3.Connection, path: str):
+        super().__init__(conn)
+        self.conn.isolation_level = None  # Explicit BEGIN/COMMIT only
+        self.lock_path = None if path == ":memory:" else Path(f"{path}.migrate.lock")
+        self.lock_file = None
+
+    def lock(self):
+        """Take an exclusive lock on the lock file."""
+        if self.lock_path:
+            self.lock_file = open(self.lock_path, "w")
+            fcntl.flock(self.lock_file, fcntl.LOCK_EX)
+
+    def unlock(self):
+        """Release the lock file."""
+        if self.conn.in_transaction:
+            self.rollback()
+        if self.lock_file:
+            fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+            self.lock_file.close()
+            self.lock_file = None
+
+    def begin(self):
+        """Start a write transaction up front, so it never fails to upgrade midway."""
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def execute(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        """Run one statement and return its rows, if any."""
+        cursor = self.conn.execute(sql, params)
+        rows = cursor.fetchall() if cursor.description else []
+        return [tuple(row) for row in rows]
+
+    def split_statements(self, sql: str) -> List[str]:
+        """Split on complete statements as SQLite parses them (trigger bodies included)."""
+        statements, current = [], []
+        for line in sql.splitlines():
+            current.append(line)
+            if sqlite3.complete_statement("\n".join(current)):
+                statements.append("\n".join(current))
+                current = []
+        statements.append("\n".join(current))
+        return [statement for statement in statements if self.has_sql(statement)]
+
+
+def run_migrations(runner: MigrationRunner) -> List[str]:
+    """Apply pending migrations and close the runner's connection."""
+    try:
+        return runner.run()
+    finally:
+        runner.conn.close()
+
+
+def create_runner() -> MigrationRunner:
+    """A runner for the configured STORAGE_BACKEND on a new connection."""
+    from src.database import STORAGE_BACKEND, create_connection
+    from src.services.storage import storage  # Import inside function to prevent circular imports
+
+    if STORAGE_BACKEND == "sqlite":
+        return SQLiteMigrationRunner(storage.connect(), storage.path)
+    return PostgresMigrationRunner(create_connection())
+
+
+def main():
+    """Command-line entry point: apply pending migrations, or list their state with --status."""
+    parser = argparse.ArgumentParser(description="Apply or inspect schema migrations.")
+    parser.add_argument("--status", action="store_true", help="List migrations and whether they are applied")
+    args = parser.parse_args()
+
+    runner = create_runner()
+    if not args.status:
+        run_migrations(runner)
+        return
+
+    try:
+        for status in runner.status():
+            print(f"{status['migration']:<40} {status['state']:<8} {status['applied_at'] or ''}")
+    finally:
+        runner.conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+import os
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from loguru import logger
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Gunicorn worker processes (gunicorn reads WEB_CONCURRENCY as its worker count); every one starts its own pool
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", 1)))
+# CPU-bound work (audio analysis, chart parsing) is fanned out across this worker's share of the cores,
+# so all the pools together use about one process per core
+MAX_PROCESS_WORKERS = int(os.getenv("MAX_PROCESS_WORKERS", max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY)))
+
+# Shared process pool, created lazily on first use
+process_pool = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Return the shared process pool, creating it on first use."""
+    global process_pool
+    if process_pool is None:
+        process_pool = ProcessPoolExecutor(max_workers=MAX_PROCESS_WORKERS)
+        logger.info(f"⚙️ Process pool started with {MAX_PROCESS_WORKERS} workers.")
+    return process_pool
+
+
+async def run_in_process_pool(func, *args):
+    """Run a picklable, CPU-bound function in the shared process pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), func, *args)
+
+
+def shutdown_process_pool():
+    """Shut down the shared process pool if it was started."""
+    global process_pool
+    if process_pool is not None:
+        process_pool.shutdown(wait=False, cancel_futures=True)
+        process_pool = None
+        logger.info("🛑 Process pool shut down.")
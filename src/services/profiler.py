@@ -0,0 +1,129 @@
+import os
+import re
+import sys
+import hmac
+import time
+import random
+import threading
+from pathlib import Path
+from collections import Counter
+from contextlib import contextmanager
+from typing import Optional
+from loguru import logger
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Requests sending `X-Profile: <PROFILE_TOKEN>` are profiled; without a token the header is ignored
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+PROFILE_HEADER = "x-profile"
+# Fraction of requests (and worker jobs) profiled at random; 0 disables sampling
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", 5)) / 1000
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", str(Path(os.getenv("LOG_DIR", "logs")) / "profiles")))
+PROFILE_MAX_STACK_DEPTH = 128
+
+LABEL_PATTERN = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def frame_label(frame) -> str:
+    """Describe a stack frame as `function (file.py:line)`."""
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of every thread in the process at a fixed interval and aggregates them
+    in the folded format used by flamegraph.pl, speedscope and inferno.
+    Threads are sampled (not just the caller) because async requests hop between the event loop
+    and the default executor; the thread name is the root frame so the flame graph separates them.
+    """
+
+    def __init__(self, label: str, interval: float = PROFILE_INTERVAL):
+        self.label = LABEL_PATTERN.sub("_", label).strip("_")[:80] or "profile"
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.started_at = 0.0
+        self.output_path: Optional[Path] = None
+
+    def sample(self):
+        """Record the current stack of every thread except the sampler itself."""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        own_id = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack = []
+            while frame is not None and len(stack) < PROFILE_MAX_STACK_DEPTH:
+                stack.append(frame_label(frame))
+                frame = frame.f_back
+            stack.append(names.get(thread_id, f"thread-{thread_id}"))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def run(self):
+        """Sampling loop."""
+        while not self.stop_event.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        """Start sampling in a background thread."""
+        self.started_at = time.perf_counter()
+        self.thread = threading.Thread(target=self.run, name="profiler", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> Optional[Path]:
+        """Stop sampling and write the folded stacks to PROFILE_DIR; returns the file path."""
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+        elapsed = time.perf_counter() - self.started_at
+
+        if not self.stacks:
+            return None
+
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        path = PROFILE_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}_{os.getpid()}_{self.label}.folded"
+        with path.open("w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        logger.info(f"🔥 Profiled {self.label}: {self.samples} samples over {elapsed:.3f}s -> {path}")
+        self.output_path = path
+        return path
+
+
+def profile_requested(header_value: Optional[str]) -> bool:
+    """Decide whether to profile a request: a valid X-Profile token, or the random sample rate."""
+    if header_value and PROFILE_TOKEN and hmac.compare_digest(header_value, PROFILE_TOKEN):
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+@contextmanager
+def profile(label: str, enabled: bool = True):
+    """Profile a block of work; yields the profiler, or None when disabled."""
+    if not enabled:
+        yield None
+        return
+
+    profiler = SamplingProfiler(label)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+
+
+@contextmanager
+def maybe_profile_job(name: str):
+    """Profile a background job at PROFILE_SAMPLE_RATE, or always when it is listed in PROFILE_JOBS."""
+    forced = name in {job.strip() for job in os.getenv("PROFILE_JOBS", "").split(",") if job.strip()}
+    sampled = PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+    with profile(f"job_{name}", enabled=forced or sampled) as profiler:
+        yield profiler
@@ -0,0 +1,260 @@
+import os
+import re
+import time
+import random
+import asyncio
+from datetime import datetime, timedelta
+from loguru import logger
+from dotenv import load_dotenv
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Set
+from src.services.metrics import SCHEDULER_JOB_RUNS, SCHEDULER_JOB_DURATION, SCHEDULER_JOB_LAST_SUCCESS
+from src.services.profiler import maybe_profile_job
+
+# Load environment variables
+load_dotenv()
+
+# How many limited (maintenance) jobs may run at once
+SCHEDULER_MAX_CONCURRENT_JOBS = int(os.getenv("SCHEDULER_MAX_CONCURRENT_JOBS", 1))
+SCHEDULER_TICK_SECONDS = float(os.getenv("SCHEDULER_TICK_SECONDS", 1))
+# Jobs that defer while ingest is busy retry after this long, up to SCHEDULER_MAX_DEFERRALS times per slot
+SCHEDULER_DEFER_SECONDS = float(os.getenv("SCHEDULER_DEFER_SECONDS", 300))
+SCHEDULER_MAX_DEFERRALS = int(os.getenv("SCHEDULER_MAX_DEFERRALS", 12))
+SCHEDULER_SHUTDOWN_GRACE_SECONDS = float(os.getenv("SCHEDULER_SHUTDOWN_GRACE_SECONDS", 30))
+
+INTERVAL_PATTERN = re.compile(r"^every\s+(\d+)\s*([smhd])$")
+INTERVAL_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+CRON_FIELDS = (("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7))
+
+
+def parse_cron_field(spec: str, low: int, high: int) -> Set[int]:
+    """Expand one cron field (`*`, `*/n`, `a-b`, `a-b/n`, lists) into its values."""
+    values = set()
+    for part in spec.split(","):
+        range_spec, _, step = part.partition("/")
+        if range_spec == "*":
+            start, end = low, high
+        elif "-" in range_spec:
+            start, end = (int(value) for value in range_spec.split("-", 1))
+        else:
+            start = end = int(range_spec)
+        if start < low or end > high or start > end:
+            raise ValueError(f"Cron field {spec!r} is outside {low}-{high}")
+        values.update(range(start, end + 1, int(step) if step else 1))
+    return values
+
+
+class CronSchedule:
+    """A five-field cron expression (minute hour day month weekday; Sunday = 0), evaluated in local time."""
+
+    def __init__(self, expression: str):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        self.expression = expression
+        self.fields = {
+            name: parse_cron_field(part, low, high) for part, (name, low, high) in zip(parts, CRON_FIELDS)
+        }
+        self.fields["weekday"] = {day % 7 for day in self.fields["weekday"]}  # 7 is Sunday too
+        # As in cron, a restricted day-of-month and day-of-week match if either does
+        self.any_day = parts[2] == "*"
+        self.any_weekday = parts[4] == "*"
+
+    def matches(self, moment: datetime) -> bool:
+        """True if the minute of `moment` is a scheduled slot."""
+        fields = self.fields
+        if moment.minute not in fields["minute"] or moment.hour not in fields["hour"] or moment.month not in fields["month"]:
+            return False
+        day_match = moment.day in fields["day"]
+        weekday_match = (moment.weekday() + 1) % 7 in fields["weekday"]
+        if self.any_day or self.any_weekday:
+            return day_match and weekday_match
+        return day_match or weekday_match
+
+    def next_after(self, moment: datetime) -> datetime:
+        """The first scheduled minute after `moment` (searched up to a year ahead)."""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        for _ in range(366 * 24 * 60):
+            if self.matches(candidate):
+                return candidate
+            candidate += timedelta(minutes=1)
+        raise ValueError(f"Cron expression never matches: {self.expression!r}")
+
+
+class IntervalSchedule:
+    """`every 30s` / `every 15m` / `every 2h` / `every 1d`."""
+
+    def __init__(self, seconds: int):
+        self.seconds = seconds
+
+    def next_after(self, moment: datetime) -> datetime:
+        """`moment` plus the interval."""
+        return moment + timedelta(seconds=self.seconds)
+
+
+def parse_schedule(spec: str):
+    """Parse `every <n><s|m|h|d>` or a cron expression."""
+    match = INTERVAL_PATTERN.match(spec.strip().lower())
+    if match:
+        return IntervalSchedule(int(match.group(1)) * INTERVAL_UNITS[match.group(2)])
+    return CronSchedule(spec)
+
+
+class Job:
+    """
+    A scheduled job. `SCHEDULE_<NAME>` overrides the schedule (`off` disables the job).
+    Limited jobs share the scheduler's concurrency limit; `defer_when_busy` jobs wait while ingest is busy.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        schedule: str,
+        jitter: float = 0,
+        timeout: float = 3600,
+        limited: bool = True,
+        defer_when_busy: bool = False,
+        run_at_start: bool = False
+    ):
+        self.name = name
+        self.func = func
+        self.schedule_spec = os.getenv(f"SCHEDULE_{name.upper()}", schedule).strip()
+        self.enabled = self.schedule_spec.lower() not in ("", "off", "false", "disabled")
+        self.schedule = parse_schedule(self.schedule_spec) if self.enabled else None
+        self.jitter = jitter
+        self.timeout = timeout
+        self.limited = limited
+        self.defer_when_busy = defer_when_busy
+        self.run_at_start = run_at_start
+        self.next_run: Optional[float] = None
+        self.deferrals = 0
+        self.task: Optional[asyncio.Task] = None
+
+    def plan_next(self, after: Optional[float] = None):
+        """Set the next run time from the schedule, plus a random jitter so jobs do not fire in lockstep."""
+        moment = datetime.fromtimestamp(after if after is not None else time.time())
+        self.next_run = self.schedule.next_after(moment).timestamp() + random.uniform(0, self.jitter)
+        self.deferrals = 0
+
+    @property
+    def blocking(self) -> bool:
+        """Plain functions run in a thread, which a timeout cannot stop."""
+        return not asyncio.iscoroutinefunction(self.func)
+
+    async def call(self):
+        """Run the job function (blocking functions go to a thread)."""
+        if self.blocking:
+            return await asyncio.to_thread(self.func)
+        return await self.func()
+
+
+class Scheduler:
+    """Runs jobs on their schedules in the worker's event loop."""
+
+    def __init__(
+        self,
+        jobs: List[Job],
+        max_concurrent: int = SCHEDULER_MAX_CONCURRENT_JOBS,
+        is_busy: Optional[Callable[[], Awaitable[bool]]] = None
+    ):
+        self.jobs = [job for job in jobs if job.enabled]
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.is_busy = is_busy
+        for job in jobs:
+            if not job.enabled:
+                logger.info(f"⏸️ Scheduled job {job.name} is disabled.")
+
+    async def execute(self, job: Job):
+        """Run one job under the concurrency limit and timeout, recording its outcome."""
+        if job.limited:
+            await self.semaphore.acquire()
+        try:
+            if job.defer_when_busy and self.is_busy and await self.is_busy():
+                if job.deferrals < SCHEDULER_MAX_DEFERRALS:
+                    job.deferrals += 1
+                    job.next_run = time.time() + SCHEDULER_DEFER_SECONDS
+                    SCHEDULER_JOB_RUNS.labels(job=job.name, outcome="deferred").inc()
+                    logger.info(f"⏳ Ingest is busy; deferring {job.name} by {SCHEDULER_DEFER_SECONDS:.0f}s")
+                else:
+                    SCHEDULER_JOB_RUNS.labels(job=job.name, outcome="skipped_busy").inc()
+                    logger.warning(f"⚠️ Ingest stayed busy; skipping {job.name} until its next slot")
+                    job.plan_next()
+                return
+
+            job.plan_next()
+            start_time = time.perf_counter()
+            outcome = "success"
+            work = asyncio.ensure_future(job.call())
+            try:
+                with maybe_profile_job(job.name):
+                    # Shielded for threads: the timeout only stops the wait, so the thread is awaited below
+                    result = await asyncio.wait_for(asyncio.shield(work) if job.blocking else work, timeout=job.timeout)
+                SCHEDULER_JOB_LAST_SUCCESS.labels(job=job.name).set(time.time())
+                if result is not None:
+                    logger.info(f"🗓️ {job.name}: {result}")
+            except asyncio.TimeoutError:
+                outcome = "timeout"
+                logger.error(f"❌ Scheduled job {job.name} timed out after {job.timeout:.0f}s")
+                if job.blocking:
+                    # Keep the job running (and its concurrency slot held) until the thread returns,
+                    # so the next slot cannot start a second copy alongside it
+                    logger.warning(f"⚠️ {job.name} keeps running in its thread; holding its slot until it returns")
+                    await asyncio.wait([work])
+                    if not work.cancelled() and work.exception():
+                        logger.error(f"❌ Scheduled job {job.name} failed after timing out: {work.exception()}")
+            except Exception as e:
+                outcome = "failure"
+                logger.exception(f"❌ Scheduled job {job.name} failed: {e}")
+            finally:
+                duration = time.perf_counter() - start_time
+                SCHEDULER_JOB_RUNS.labels(job=job.name, outcome=outcome).inc()
+                SCHEDULER_JOB_DURATION.labels(job=job.name).observe(duration)
+        finally:
+            if job.limited:
+                self.semaphore.release()
+            if job.next_run is None:
+                job.plan_next()
+
+    def dispatch(self, now: float):
+        """Start every due job that is not still running from its previous slot."""
+        for job in self.jobs:
+            if job.next_run is None or job.next_run > now:
+                continue
+            if job.task and not job.task.done():
+                SCHEDULER_JOB_RUNS.labels(job=job.name, outcome="skipped_overlap").inc()
+                logger.warning(f"⚠️ {job.name} is still running; skipping this slot")
+                job.plan_next(now)
+                continue
+            job.next_run = None  # Claimed; execute() plans the next slot or a deferral
+            job.task = asyncio.create_task(self.execute(job), name=f"job-{job.name}")
+
+    async def run(self, should_run: Callable[[], bool]):
+        """Dispatch due jobs every tick while `should_run()` holds, then wait for running jobs."""
+        for job in self.jobs:
+            job.plan_next()
+            if job.run_at_start:
+                job.next_run = time.time()
+            logger.info(f"🗓️ Scheduled {job.name} ({job.schedule_spec}), next at {datetime.fromtimestamp(job.next_run):%Y-%m-%d %H:%M:%S}")
+
+        while should_run():
+            self.dispatch(time.time())
+            await asyncio.sleep(SCHEDULER_TICK_SECONDS)
+
+        running = [job.task for job in self.jobs if job.task and not job.task.done()]
+        if running:
+            logger.info(f"⏳ Waiting up to {SCHEDULER_SHUTDOWN_GRACE_SECONDS:.0f}s for {len(running)} running jobs...")
+            _, pending = await asyncio.wait(running, timeout=SCHEDULER_SHUTDOWN_GRACE_SECONDS)
+            for task in pending:
+                task.cancel()
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Each job's schedule, next run and whether it is running."""
+        return [
+            {
+                "job": job.name,
+                "schedule": job.schedule_spec,
+                "next_run": job.next_run,
+                "running": bool(job.task and not job.task.done()),
+            }
+            for job in self.jobs
+        ]
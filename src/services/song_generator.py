@@ -1,9 +1,9 @@
 import os
-import librosa
+import shutil
 import numpy as np
 from pathlib import Path
 from loguru import logger
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 OUTPUT_DIR = Path("/app/data/clonehero_content/generator")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -12,6 +12,8 @@ NOTE_MAPPING = 6  # Number of note types in Clone Hero
 
 def analyze_audio(file_path: str) -> Dict[str, Any]:
     """Analyze audio to detect tempo, beats, and note positions."""
+    import librosa  # Imported on first use so the API imports without librosa installed
+
     try:
         y, sr = librosa.load(file_path, sr=None)
         tempo, beat_frames = librosa.beat.beat_track(y=y, sr=sr)
@@ -25,11 +27,11 @@ def analyze_audio(file_path: str) -> Dict[str, Any]:
         logger.error(f"Error analyzing audio: {str(e)}")
         raise
 
-def generate_notes_chart(song_name, beat_times, output_path):
+def generate_notes_chart(song_name, beat_times, output_path, artist="Unknown"):
     """Generate a notes.chart file based on detected beats."""
     try:
         with output_path.open("w") as f:
-            f.write(f"[Song]\n{{\n  Name = {song_name}\n  Artist = Unknown\n  Charter = AI\n}}\n")
+            f.write(f"[Song]\n{{\n  Name = {song_name}\n  Artist = {artist}\n  Charter = AI\n}}\n")
             f.write("\n[SyncTrack]\n{\n")
             for time in beat_times:
                 f.write(f"  {int(time * 1000)} = TS {int(time * 1000)}\n")
@@ -64,4 +66,78 @@ def process_song_file(file_path: str) -> Dict[str, Any]:
         }
     except Exception as e:
         logger.error(f"Error processing song: {str(e)}")
-        return {"error": str(e)}
\ No newline at end of file
+        return {"error": str(e)}
+
+def ini_value(value: Optional[str]) -> str:
+    """Collapse whitespace so a tag or form value stays on one song.ini line."""
+    return " ".join(str(value or "").split())
+
+def read_audio_tags(file_path: str) -> Dict[str, str]:
+    """Read title, artist and album from an audio file's tags (ID3, Vorbis comments, ...); missing tags are left out."""
+    import mutagen
+
+    try:
+        audio = mutagen.File(file_path, easy=True)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not read tags from {file_path}: {e}")
+        return {}
+    if audio is None or not audio.tags:
+        return {}
+
+    tags = {}
+    for key in ("title", "artist", "album"):
+        try:
+            values = audio.tags.get(key) or []
+        except Exception:  # Tag formats without easy keys (e.g. WAV RIFF INFO)
+            values = []
+        value = ini_value(values[0]) if values else ""
+        if value:
+            tags[key] = value
+    return tags
+
+def generate_song_ini(song_name: str, output_path: Path, artist: str = "Unknown", album: str = "Generated"):
+    """Generate a minimal song.ini so the folder can be ingested like any other song."""
+    try:
+        with output_path.open("w", encoding="utf-8") as f:
+            f.write("[song]\n")
+            f.write(f"name = {song_name}\n")
+            f.write(f"artist = {artist}\n")
+            f.write(f"album = {album}\n")
+            f.write("charter = AI\n")
+    except Exception as e:
+        logger.error(f"Error writing song.ini: {str(e)}")
+        raise
+
+def generate_song_folder(file_path: str, output_dir: str, song_name: str, defaults: Optional[Dict[str, Optional[str]]] = None) -> Dict[str, Any]:
+    """
+    Generate a complete Clone Hero song folder (song.ini, notes.chart and audio)
+    for a single audio file. Runs in a worker process during batch generation.
+    Title, artist and album come from the file's tags, then from `defaults` (the batch form fields).
+    """
+    try:
+        analysis = analyze_audio(file_path)
+        tempo, beat_times = analysis["tempo"], analysis["beat_times"]
+        tags = read_audio_tags(file_path)
+        defaults = defaults or {}
+        title = tags.get("title") or song_name
+        artist = tags.get("artist") or ini_value(defaults.get("artist")) or "Unknown"
+        album = tags.get("album") or ini_value(defaults.get("album")) or "Generated"
+
+        song_output_dir = Path(output_dir) / song_name
+        song_output_dir.mkdir(parents=True, exist_ok=True)
+
+        generate_notes_chart(title, beat_times, song_output_dir / "notes.chart", artist)
+        generate_song_ini(title, song_output_dir / "song.ini", artist, album)
+        shutil.copyfile(file_path, song_output_dir / f"song{Path(file_path).suffix.lower()}")
+
+        return {
+            "song_name": song_name,
+            "title": title,
+            "artist": artist,
+            "album": album,
+            "folder_path": str(song_output_dir),
+            "tempo": float(np.atleast_1d(tempo)[0])
+        }
+    except Exception as e:
+        logger.error(f"Error generating song folder for {file_path}: {str(e)}")
+        return {"song_name": song_name, "error": str(e)}
@@ -0,0 +1,135 @@
+import re
+import time
+import random
+import hashlib
+import unicodedata
+import numpy as np
+from loguru import logger
+from typing import List, Set, Tuple
+
+# Near-duplicate detection: songs are compared on the character trigrams of their normalized artist and title.
+# A MinHash signature estimates the Jaccard similarity of two trigram sets; it is split into bands, and songs that
+# share any band hash land in the same bucket of the song_match_bands index, so candidates are found with a few
+# indexed lookups instead of a scan. With 8 bands of 4 rows, pairs above ~0.6 similarity almost always share a band.
+# Changing the normalization or these constants changes every stored key: ship it with a migration that re-indexes.
+MINHASH_BANDS = 8
+MINHASH_ROWS = 4
+MINHASH_SEED = 48
+# Permutations are (a * x + b) mod a 32-bit prime over 32-bit trigram hashes, so the products fit in uint64
+MINHASH_PRIME = 4_294_967_291
+
+_rng = random.Random(MINHASH_SEED)
+MINHASH_A = np.array([_rng.randrange(1, MINHASH_PRIME) for _ in range(MINHASH_BANDS * MINHASH_ROWS)], dtype=np.uint64)
+MINHASH_B = np.array([_rng.randrange(0, MINHASH_PRIME) for _ in range(MINHASH_BANDS * MINHASH_ROWS)], dtype=np.uint64)
+
+NON_WORD_PATTERN = re.compile(r"[\W_]+")
+
+
+def normalize(text: str) -> str:
+    """Casefold, strip accents and punctuation, and collapse spaces: "Song - Live" and "song (live)" both give "song live"."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(char for char in text if not unicodedata.combining(char)).casefold().replace("&", " and ")
+    words = NON_WORD_PATTERN.sub(" ", text).split()
+    if len(words) > 1 and words[0] == "the":
+        words = words[1:]
+    return " ".join(words)
+
+
+def match_key(title: str, artist: str, album: str) -> str:
+    """Normalized artist, title and album; songs with equal keys are the same song."""
+    return "|".join(normalize(value) for value in (artist, title, album))
+
+
+def shingles(title: str, artist: str) -> Set[str]:
+    """Character trigrams of the normalized artist and title."""
+    text = f" {normalize(artist)} / {normalize(title)} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def similarity(a: Set[str], b: Set[str]) -> float:
+    """Jaccard similarity of two trigram sets."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def stable_hash(data: bytes, size: int = 8) -> int:
+    """A hash of `size` bytes that is the same in every process (unlike hash())."""
+    return int.from_bytes(hashlib.blake2b(data, digest_size=size).digest(), "big")
+
+
+def minhash(grams: Set[str]) -> List[int]:
+    """MinHash signature of a trigram set: every permutation applied to every trigram hash at once."""
+    hashes = np.array([stable_hash(gram.encode("utf-8"), 4) for gram in grams] or [0], dtype=np.uint64)
+    return ((MINHASH_A[:, None] * hashes[None, :] + MINHASH_B[:, None]) % MINHASH_PRIME).min(axis=1).tolist()
+
+
+def band_hashes(title: str, artist: str) -> List[int]:
+    """One signed 64-bit hash per MinHash band (signed so it fits a BIGINT column)."""
+    signature = minhash(shingles(title, artist))
+    bands = []
+    for band in range(MINHASH_BANDS):
+        rows = signature[band * MINHASH_ROWS:(band + 1) * MINHASH_ROWS]
+        value = stable_hash(band.to_bytes(1, "big") + b"".join(row.to_bytes(8, "big") for row in rows))
+        bands.append(value - (1 << 64) if value >= 1 << 63 else value)
+    return bands
+
+
+def match_rows(song_id: int, title: str, artist: str, album: str) -> Tuple[Tuple, List[Tuple]]:
+    """The song_match_keys row and song_match_bands rows indexing one song."""
+    return (song_id, match_key(title, artist, album)), [
+        (song_id, band, value) for band, value in enumerate(band_hashes(title, artist))
+    ]
+
+
+def insert_values(runner, table: str, columns: Tuple[str, ...], rows: List[Tuple]):
+    """Multi-row INSERT through a migration runner, skipping rows that already exist."""
+    p = runner.placeholder
+    row_sql = "(" + ", ".join([p] * len(columns)) + ")"
+    for start in range(0, len(rows), 500):
+        chunk = rows[start:start + 500]
+        runner.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join([row_sql] * len(chunk))} ON CONFLICT DO NOTHING",
+            tuple(value for row in chunk for value in row)
+        )
+
+
+def backfill_match_index(runner, batch_size: int, sleep_ms: int) -> int:
+    """
+    Index every song missing from song_match_keys, in id-ordered batches that each commit, so a
+    large library never holds one long transaction. Used by the match-key migrations; returns the count.
+    """
+    p = runner.placeholder
+    done, last_id = 0, 0
+    while True:
+        songs = runner.execute(
+            f"""
+            SELECT id, title, artist, album FROM songs s
+            WHERE id > {p} AND NOT EXISTS (SELECT 1 FROM song_match_keys k WHERE k.song_id = s.id)
+            ORDER BY id LIMIT {p}
+            """,
+            (last_id, batch_size)
+        )
+        if not songs:
+            break
+
+        keys, bands = [], []
+        for song_id, title, artist, album in songs:
+            key_row, band_rows = match_rows(song_id, title, artist, album or "")
+            keys.append(key_row)
+            bands.extend(band_rows)
+
+        runner.begin()
+        try:
+            insert_values(runner, "song_match_keys", ("song_id", "match_key"), keys)
+            insert_values(runner, "song_match_bands", ("song_id", "band", "hash"), bands)
+            runner.commit()
+        except Exception:
+            runner.rollback()
+            raise
+
+        done += len(songs)
+        last_id = songs[-1][0]
+        logger.info(f"🔁 Indexed {done} songs for duplicate detection")
+        time.sleep(sleep_ms / 1000)
+    return done
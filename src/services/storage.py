@@ -0,0 +1,202 @@
+from abc import ABC, abstractmethod
+from loguru import logger
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from src.database import STORAGE_BACKEND
+
+# Columns that list endpoints may project with `fields=`
+SONG_FIELDS = ("id", "title", "artist", "album", "file_path", "metadata", "tempo_min", "tempo_max", "peak_nps")
+DEFAULT_SONG_FIELDS = ("id", "title", "artist", "album", "file_path", "metadata")
+CHART_STATS_FIELDS = ("instrument", "difficulty", "note_count", "avg_nps", "peak_nps", "length_seconds")
+ASSET_FIELDS = ("file_name", "file_path", "mime_type", "width", "height", "size_bytes", "thumbnail_path")
+
+
+def row_to_song(row, fields: List[str]) -> Dict[str, Any]:
+    """Build a song dict containing only the projected fields."""
+    song = {field: row[field] for field in fields}
+    if "metadata" in song and not song["metadata"]:
+        song["metadata"] = {}
+    return song
+
+
+class Storage(ABC):
+    """
+    Song and asset queries behind one interface, implemented for Postgres and SQLite. Every method is
+    abstract, so a backend missing one fails when it is instantiated rather than mid-request.
+    Methods raise on database errors; the service functions wrapping them decide whether to fall back.
+    `fields` arguments are validated column names (see SONG_FIELDS), never user input.
+    """
+
+    name = "base"
+    # True when the database pushes song changes to listeners (Postgres LISTEN/NOTIFY);
+    # otherwise the change feed polls the storage's change log (song_changes)
+    has_change_notifications = False
+
+    @abstractmethod
+    def init_schema(self):
+        """Create or update the schema."""
+
+    @abstractmethod
+    def ping(self) -> bool:
+        """Run a trivial query to check the database is reachable."""
+
+    @abstractmethod
+    def close(self):
+        """Close this process's connections, so none are shared with forked children."""
+
+    @abstractmethod
+    def library_version(self) -> int:
+        """Return the counter bumped on every change to songs."""
+
+    @abstractmethod
+    def change_log_position(self) -> int:
+        """Sequence number of the newest song_changes row (0 when empty)."""
+
+    @abstractmethod
+    def song_changes(self, after_seq: int, limit: int) -> List[Dict[str, Any]]:
+        """Up to `limit` change log rows (`seq`, `op`, `id`) after `after_seq`, oldest first."""
+
+    @abstractmethod
+    def prune_song_changes(self, max_age_seconds: int) -> int:
+        """Delete change log rows older than `max_age_seconds`; returns how many were removed."""
+
+    @abstractmethod
+    def list_songs(
+        self, fields: List[str], search_query: Optional[str] = None, limit: int = 50, offset: int = 0,
+        instrument: Optional[str] = None, difficulty: Optional[str] = None,
+        min_peak_nps: Optional[float] = None, max_peak_nps: Optional[float] = None, after_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Filtered songs, newest first; `after_id` seeks past the previous page instead of using `offset`."""
+
+    @abstractmethod
+    def library_tree(self, after_artist: Optional[str], artist_limit: int) -> List[Dict[str, Any]]:
+        """Up to `artist_limit` artists after `after_artist`, each with its albums and song counts."""
+
+    @abstractmethod
+    def album_songs(self, artist: str, album: Optional[str], fields: List[str]) -> List[Dict[str, Any]]:
+        """Songs of one album ordered by title; a missing album matches NULL or empty."""
+
+    @abstractmethod
+    def get_song(self, song_id: int) -> Optional[Dict[str, Any]]:
+        """Every song field plus per-track chart statistics."""
+
+    @abstractmethod
+    def songs_by_ids(self, song_ids: List[int], fields: List[str]) -> List[Dict[str, Any]]:
+        """Fetch the given songs (missing IDs are skipped)."""
+
+    @abstractmethod
+    def iter_songs(self, fields: List[str], batch_size: int = 10000) -> Iterator[Dict[str, Any]]:
+        """Stream every song in ID order without loading the table at once."""
+
+    @abstractmethod
+    def count_songs(self) -> int:
+        """Total number of songs."""
+
+    @abstractmethod
+    def find_song(self, match_key: str) -> Optional[int]:
+        """ID of a song with this normalized match key (see song_matching.match_key), if any."""
+
+    @abstractmethod
+    def match_candidates(self, band_hashes: List[int], limit: int) -> List[Dict[str, Any]]:
+        """Songs sharing a MinHash band bucket with `band_hashes`, most shared bands first."""
+
+    @abstractmethod
+    def duplicate_pairs(self, max_bucket_size: int) -> List[Tuple[int, int]]:
+        """(lower ID, higher ID) pairs sharing any band bucket of at most `max_bucket_size` songs."""
+
+    @abstractmethod
+    def insert_song(
+        self, title: str, artist: str, album: str, file_path: str,
+        metadata: Dict[str, Any], chart_stats: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """Insert a song (with its chart statistics and match index rows) in one transaction; returns its ID."""
+
+    @abstractmethod
+    def delete_songs(self, song_ids: List[int]) -> List[int]:
+        """Delete songs; returns the IDs that existed."""
+
+    @abstractmethod
+    def save_waveform(self, song_id: int, peaks: bytes, buckets: int, duration_seconds: float, etag: str):
+        """Store or replace a song's waveform."""
+
+    @abstractmethod
+    def get_waveform(self, song_id: int) -> Optional[Dict[str, Any]]:
+        """A song's stored waveform (peaks, buckets, duration_seconds, etag)."""
+
+    @abstractmethod
+    def songs_missing_waveforms(self, limit: int) -> List[Dict[str, Any]]:
+        """IDs and folders of songs without a stored waveform."""
+
+    @abstractmethod
+    def save_fingerprint(self, song_id: int, fingerprint: int, bands: List[int]):
+        """Store or replace a song's audio fingerprint (signed 64-bit) and its 16-bit band columns."""
+
+    @abstractmethod
+    def get_fingerprint(self, song_id: int) -> Optional[int]:
+        """A song's stored audio fingerprint (signed 64-bit)."""
+
+    @abstractmethod
+    def fingerprint_candidates(self, probes: List[List[int]]) -> List[Dict[str, Any]]:
+        """Songs (with their fingerprint) whose band N matches any value in probes[N]."""
+
+    @abstractmethod
+    def songs_missing_fingerprints(self, limit: int) -> List[Dict[str, Any]]:
+        """IDs and folders of songs without a stored audio fingerprint."""
+
+    @abstractmethod
+    def save_song_files(self, song_id: int, files: List[Dict[str, Any]]):
+        """Replace a song's blob references (dicts with path, hash and size_bytes), adding missing blob rows."""
+
+    @abstractmethod
+    def songs_without_files(self, after_id: int, limit: int) -> List[Dict[str, Any]]:
+        """IDs and folders of songs after `after_id` with no blob references, in ID order."""
+
+    @abstractmethod
+    def unreferenced_blobs(self, after_hash: str, limit: int) -> List[str]:
+        """Hashes after `after_hash` of blobs no song references any more, in hash order."""
+
+    @abstractmethod
+    def delete_blob(self, blob_hash: str) -> bool:
+        """Delete a blob row if it is still unreferenced; returns whether it was deleted."""
+
+    @abstractmethod
+    def blob_report(self) -> Dict[str, int]:
+        """Blob counts and sizes: stored once versus as linked from song folders."""
+
+    @abstractmethod
+    def upsert_asset(self, asset: Dict[str, Any]):
+        """Insert or refresh an asset row keyed on (content_type, file_name)."""
+
+    @abstractmethod
+    def get_asset(self, content_type: str, file_name: str) -> Optional[Dict[str, Any]]:
+        """An asset's stored row."""
+
+    @abstractmethod
+    def delete_asset(self, content_type: str, file_name: str):
+        """Remove an asset row."""
+
+    @abstractmethod
+    def vacuum_analyze(self, tables: List[str]):
+        """Reclaim dead rows and refresh planner statistics for the tables."""
+
+    @abstractmethod
+    def analyze(self, tables: List[str]):
+        """Refresh planner statistics for the tables."""
+
+    @abstractmethod
+    def maintain_indexes(self, reindex: List[str]) -> List[str]:
+        """Compact the search indexes and rebuild the `reindex` ones without blocking writes; returns those rebuilt."""
+
+
+def create_storage(backend: str = STORAGE_BACKEND) -> Storage:
+    """Instantiate the storage selected by STORAGE_BACKEND (postgres or sqlite)."""
+    if backend == "postgres":
+        from src.services.storage_postgres import PostgresStorage
+        return PostgresStorage()
+    if backend == "sqlite":
+        from src.services.storage_sqlite import SQLiteStorage
+        return SQLiteStorage()
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend} (expected postgres or sqlite)")
+
+
+storage = create_storage()
+logger.info(f"🗄️ Using {storage.name} storage.")
@@ -0,0 +1,610 @@
+import psycopg2
+from loguru import logger
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from psycopg2.extras import Json, DictCursor, execute_values
+from src.database import get_connection, init_db, close_db_pool
+from src.services.song_matching import match_rows, MINHASH_BANDS
+from src.services.storage import Storage, SONG_FIELDS, CHART_STATS_FIELDS, ASSET_FIELDS, row_to_song
+
+
+def save_chart_stats(cursor, song_id: int, chart_stats: Dict[str, Any]):
+    """Store song-level tempo/density columns and per-track chart statistics."""
+    cursor.execute(
+        "UPDATE songs SET tempo_min = %s, tempo_max = %s, peak_nps = %s WHERE id = %s",
+        (chart_stats["tempo_min"], chart_stats["tempo_max"], chart_stats["peak_nps"], song_id)
+    )
+    cursor.execute("DELETE FROM song_chart_stats WHERE song_id = %s", (song_id,))
+    if chart_stats["tracks"]:
+        execute_values(
+            cursor,
+            """
+            INSERT INTO song_chart_stats
+                (song_id, instrument, difficulty, note_count, avg_nps, peak_nps, length_seconds)
+            VALUES %s
+            """,
+            [
+                (song_id, track["instrument"], track["difficulty"], track["note_count"],
+                 track["avg_nps"], track["peak_nps"], track["length_seconds"])
+                for track in chart_stats["tracks"]
+            ]
+        )
+
+
+def save_song_match(cursor, song_id: int, title: str, artist: str, album: str):
+    """Store the song's normalized match key and MinHash band hashes."""
+    key_row, band_rows = match_rows(song_id, title, artist, album or "")
+    cursor.execute("INSERT INTO song_match_keys (song_id, match_key) VALUES (%s, %s)", key_row)
+    execute_values(cursor, "INSERT INTO song_match_bands (song_id, band, hash) VALUES %s", band_rows)
+
+
+class PostgresStorage(Storage):
+    """Storage on the shared psycopg2 connection pool (src.database)."""
+
+    name = "postgres"
+    has_change_notifications = True  # Triggers publish on the song_changes channel
+
+    def init_schema(self):
+        """Apply pending migrations."""
+        init_db()
+
+    def ping(self) -> bool:
+        """Run a trivial query to check the database is reachable."""
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        return True
+
+    def close(self):
+        """Close the connection pool."""
+        close_db_pool()
+
+    def library_version(self) -> int:
+        """Return the counter bumped by a statement trigger on every change to songs."""
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT version FROM library_version WHERE id")
+                row = cursor.fetchone()
+        return row[0] if row else 0
+
+    def change_log_position(self) -> int:
+        """Changes are delivered with NOTIFY; there is no change log to read."""
+        return 0
+
+    def song_changes(self, after_seq: int, limit: int) -> List[Dict[str, Any]]:
+        """Changes are delivered with NOTIFY; there is no change log to read."""
+        return []
+
+    def prune_song_changes(self, max_age_seconds: int) -> int:
+        """Changes are delivered with NOTIFY; there is no change log to prune."""
+        return 0
+
+    def list_songs(
+        self, fields: List[str], search_query: Optional[str] = None, limit: int = 50, offset: int = 0,
+        instrument: Optional[str] = None, difficulty: Optional[str] = None,
+        min_peak_nps: Optional[float] = None, max_peak_nps: Optional[float] = None, after_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Filtered songs, newest first; `after_id` seeks past the previous page instead of using `offset`."""
+        with get_connection() as conn:
+            with conn.cursor(cursor_factory=DictCursor) as cursor:
+                query = f"SELECT {', '.join(fields)} FROM songs"
+                conditions = []
+                params = []
+
+                if search_query and search_query.strip():  # Avoid matching everything if empty
+                    conditions.append("(title ILIKE %s OR artist ILIKE %s OR album ILIKE %s)")
+                    params.extend([f"%{search_query.strip()}%"] * 3)
+
+                if instrument or difficulty:
+                    # Filter on a specific chart track using the indexed per-track statistics
+                    track_conditions = ["cs.song_id = songs.id"]
+                    for column, value in (("instrument", instrument), ("difficulty", difficulty)):
+                        if value:
+                            track_conditions.append(f"cs.{column} = %s")
+                            params.append(value)
+                    for operator, value in ((">=", min_peak_nps), ("<=", max_peak_nps)):
+                        if value is not None:
+                            track_conditions.append(f"cs.peak_nps {operator} %s")
+                            params.append(value)
+                    conditions.append(
+                        f"EXISTS (SELECT 1 FROM song_chart_stats cs WHERE {' AND '.join(track_conditions)})"
+                    )
+                else:
+                    for operator, value in ((">=", min_peak_nps), ("<=", max_peak_nps)):
+                        if value is not None:
+                            conditions.append(f"peak_nps {operator} %s")
+                            params.append(value)
+
+                if after_id is not None:
+                    # Seek past the previous page on the primary key instead of skipping rows
+                    conditions.append("id < %s")
+                    params.append(after_id)
+                    offset = 0
+
+                if conditions:
+                    query += " WHERE " + " AND ".join(conditions)
+
+                query += " ORDER BY id DESC LIMIT %s OFFSET %s"
+                params.extend([limit, offset])
+                cursor.execute(query, params)
+                songs = cursor.fetchall()
+
+        return [row_to_song(row, fields) for row in songs]
+
+    def library_tree(self, after_artist: Optional[str], artist_limit: int) -> List[Dict[str, Any]]:
+        """Up to `artist_limit` artists after `after_artist`, each with its albums and song counts."""
+        with get_connection() as conn:
+            with conn.cursor(cursor_factory=DictCursor) as cursor:
+                artist_filter = "WHERE artist > %s" if after_artist is not None else ""
+                params = [after_artist] if after_artist is not None else []
+                params.append(artist_limit)
+
+                cursor.execute(
+                    f"""
+                    WITH artist_page AS (
+                        SELECT DISTINCT artist FROM songs
+                        {artist_filter}
+                        ORDER BY artist
+                        LIMIT %s
+                    ),
+                    albums AS (
+                        SELECT s.artist, s.album, COUNT(*) AS song_count
+                        FROM songs s
+                        JOIN artist_page p ON p.artist = s.artist
+                        GROUP BY s.artist, s.album
+                    )
+                    SELECT
+                        artist,
+                        SUM(song_count)::INTEGER AS song_count,
+                        json_agg(
+                            json_build_object('album', album, 'song_count', song_count)
+                            ORDER BY album
+                        ) AS albums
+                    FROM albums
+                    GROUP BY artist
+                    ORDER BY artist
+                    """,
+                    params
+                )
+                rows = cursor.fetchall()
+
+        return [{"artist": row["artist"], "song_count": row["song_count"], "albums": row["albums"]} for row in rows]
+
+    def album_songs(self, artist: str, album: Optional[str], fields: List[str]) -> List[Dict[str, Any]]:
+        """Songs of one album ordered by title; a missing album matches NULL or empty."""
+        with get_connection() as conn:
+            with conn.cursor(cursor_factory=DictCursor) as cursor:
+                album_condition = "album = %s" if album else "(album IS NULL OR album = '')"
+                params = [artist, album] if album else [artist]
+                cursor.execute(
+                    f"""
+                    SELECT {', '.join(fields)} FROM songs
+                    WHERE artist = %s AND {album_condition}
+                    ORDER BY title, id
+                    """,
+                    params
+                )
+                songs = cursor.fetchall()
+
+        return [row_to_song(row, fields) for row in songs]
+
+    def get_song(self, song_id: int) -> Optional[Dict[str, Any]]:
+        """Every song field plus per-track chart statistics."""
+        with get_connection() as conn:
+            with conn.cursor(cursor_factory=DictCursor) as cursor:
+                cursor.execute(f"SELECT {', '.join(SONG_FIELDS)} FROM songs WHERE id = %s", (song_id,))
+                row = cursor.fetchone()
+                if not row:
+                    return None
+
+                cursor.execute(
+                    f"""
+                    SELECT {', '.join(CHART_STATS_FIELDS)}
+                    FROM song_chart_stats WHERE song_id = %s
+                    ORDER BY instrument, difficulty
+                    """,
+                    (song_id,)
+                )
+                chart_stats = [dict(stats) for stats in cursor.fetchall()]
+
+        return {**row_to_song(row, list(SONG_FIELDS)), "chart_stats": chart_stats}
+
+    def songs_by_ids(self, song_ids: List[int], fields: List[str]) -> List[Dict[str, Any]]:
+        """Fetch the given songs (missing IDs are skipped)."""
+        with get_connection() as conn:
+            with conn.cursor(cursor_factory=DictCursor) as cursor:
+                cursor.execute(f"SELECT {', '.join(fields)} FROM songs WHERE id = ANY(%s)", (list(song_ids),))
+                rows = cursor.fetchall()
+            conn.rollback()
+        return [row_to_song(row, fields) for row in rows]
+
+    def iter_songs(self, fields: List[str], batch_size: int = 10000) -> Iterator[Dict[str, Any]]:
+        """Stream every song in ID order through a server-side cursor."""
+        with get_connection() as conn:
+            # A named cursor streams rows from the server instead of loading the table at once
+            with conn.cursor(name="iter_songs", cursor_factory=DictCursor) as cursor:
+                cursor.itersize = batch_size
+                cursor.execute(f"SELECT {', '.join(fields)} FROM songs ORDER BY id")
+                for row in cursor:
+                    yield row_to_song(row, fields)
+            conn.rollback()
+
+    def count_songs(self) -> int:
+        """Total number of songs."""
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT COUNT(*) FROM songs")
+                return cursor.fetchone()[0]
+
+    def find_song(self, match_key: str) -> Optional[int]:
+        """ID of a song with this normalized match key, if any."""
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT song_id FROM song_match_keys WHERE match_key = %s LIMIT 1", (match_key,))
+                row = cursor.fetchone()
+            conn.rollback()
+        return row[0] if row else None
+
+    def match_candidates(self, band_hashes: List[int], limit: int) -> List[Dict[str, Any]]:
+        """Songs sharing a MinHash band bucket with `band_hashes`, most shared bands first."""
+        with get_connection() as conn:
+            with conn.cursor(cursor_factory=DictCursor) as cursor:
+                # One (band, hash) probe per band, each answered by idx_song_match_bands_bucket
+                cursor.execute(
+                    """
+                    SELECT s.id, s.title, s.artist, s.album, b.shared_bands
+                    FROM (
+                        SELECT song_id, COUNT(*) AS shared_bands
+                        FROM song_match_bands
+                        JOIN unnest(%s::smallint[], %s::bigint[]) AS q(band, hash) USING (band, hash)
+                        GROUP BY song_id
+                        ORDER BY shared_bands DESC, song_id
+                        LIMIT %s
+                    ) b
+                    JOIN songs s ON s.id = b.song_id
+                    ORDER BY b.shared_bands DESC, s.id
+                    """,
+                    (list(range(MINHASH_BANDS)), list(band_hashes), limit)
+                )
+                rows = cursor.fetchall()
+            conn.rollback()
+        return [dict(row) for row in rows]
+
+    def duplicate_pairs(self, max_bucket_size: int) -> List[Tuple[int, int]]:
+        """(lower ID, higher ID) pairs sharing any band bucket of at most `max_bucket_size` songs."""
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    WITH buckets AS (
+                        SELECT band, hash, array_agg(song_id ORDER BY song_id) AS song_ids
+                        FROM song_match_bands
+                        GROUP BY band, hash
+                        HAVING COUNT(*) BETWEEN 2 AND %s
+                    )
+                    SELECT DISTINCT a.song_id, b.song_id
+                    FROM buckets,
+                         unnest(song_ids) AS a(song_id),
+                         unnest(song_ids) AS b(song_id)
+                    WHERE a.song_id < b.song_id
+                    """,
+                    (max_bucket_size,)
+                )
+                pairs = cursor.fetchall()
+            conn.rollback()
+        return [tuple(pair) for pair in pairs]
+
+    def insert_song(
+        self, title: str, artist: str, album: str, file_path: str,
+        metadata: Dict[str, Any], chart_stats: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """Insert a song (with its chart statistics and match index rows) in one transaction; returns its ID."""
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO songs (title, artist, album, file_path, metadata)
+                    VALUES (%s, %s, %s, %s, %s) RETURNING id
+                    """,
+                    (title, artist, album, file_path, Json(metadata))
+                )
+                song_id = cursor.fetchone()[0]
+                save_song_match(cursor, song_id, title, artist, album)
+                if chart_stats:
+                    save_chart_stats(cursor, song_id, chart_stats)
+            conn.commit()
+        return song_id
+
+    def delete_songs(self, song_ids: List[int]) -> List[int]:
+        """Delete songs; returns the IDs that existed."""
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM songs WHERE id = ANY(%s) RETURNING id", (list(song_ids),))
+                deleted = [row[0] for row in cursor.fetchall()]
+            conn.commit()
+        return deleted
+
+    def save_waveform(self, song_id: int, peaks: bytes, buckets: int, duration_seconds: float, etag: str):
+        """Store or replace a song's waveform."""
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO song_waveforms (song_id, peaks, buckets, duration_seconds, etag)
+                    VALUES (%s, %s, %s, %s, %s)
+                    ON CONFLICT (song_id) DO UPDATE SET
+                        peaks = EXCLUDED.peaks,
+                        buckets = EXCLUDED.buckets,
+                        duration_seconds = EXCLUDED.duration_seconds,
+                        etag = EXCLUDED.etag,
+                        created_at = CURRENT_TIMESTAMP
+                    """,
+                    (song_id, psycopg2.Binary(peaks), buckets, duration_seconds, etag)
+                )
+            conn.commit()
+
+    def get_waveform(self, song_id: int) -> Optional[Dict[str, Any]]:
+        """A song's stored waveform (peaks, buckets, duration_seconds, etag)."""
+        with get_connection() as conn:
+            with conn.cursor(cursor_factory=DictCursor) as cursor:
+                cursor.execute(
+                    "SELECT peaks, buckets, duration_seconds, etag FROM song_waveforms WHERE song_id = %s",
+                    (song_id,)
+                )
+                row = cursor.fetchone()
+
+        if not row:
+            return None
+        return {
+            "peaks": bytes(row["peaks"]),
+            "buckets": row["buckets"],
+            "duration_seconds": row["duration_seconds"],
+            "etag": row["etag"],
+        }
+
+    def songs_missing_waveforms(self, limit: int) -> List[Dict[str, Any]]:
+        """IDs and folders of songs without a stored waveform."""
+        with get_connection() as conn:
+            with conn.cursor(cursor_factory=DictCursor) as cursor:
+                cursor.execute(
+                    """
+                    SELECT s.id, s.file_path FROM songs s
+                    LEFT JOIN song_waveforms w ON w.song_id = s.id
+                    WHERE w.song_id IS NULL
+                    ORDER BY s.id
+                    LIMIT %s
+                    """,
+                    (limit,)
+                )
+                return [{"id": row["id"], "folder_path": row["file_path"]} for row in cursor.fetchall()]
+
+    def save_fingerprint(self, song_id: int, fingerprint: int, bands: List[int]):
+        """Store or replace a song's audio fingerprint and its band columns."""
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO song_fingerprints (song_id, fingerprint, band0, band1, band2, band3)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (song_id) DO UPDATE SET
+                        fingerprint = EXCLUDED.fingerprint,
+                        band0 = EXCLUDED.band0,
+                        band1 = EXCLUDED.band1,
+                        band2 = EXCLUDED.band2,
+                        band3 = EXCLUDED.band3,
+                        created_at = CURRENT_TIMESTAMP
+                    """,
+                    (song_id, fingerprint, *bands)
+                )
+            conn.commit()
+
+    def get_fingerprint(self, song_id: int) -> Optional[int]:
+        """A song's stored audio fingerprint."""
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT fingerprint FROM song_fingerprints WHERE song_id = %s", (song_id,))
+                row = cursor.fetchone()
+            conn.rollback()
+        return row[0] if row else None
+
+    def fingerprint_candidates(self, probes: List[List[int]]) -> List[Dict[str, Any]]:
+        """Songs (with their fingerprint) whose band N matches any value in probes[N]."""
+        with get_connection() as conn:
+            with conn.cursor(cursor_factory=DictCursor) as cursor:
+                # Each `bandN = ANY(...)` is an index scan; the planner ORs the four bitmaps
+                cursor.execute(
+                    """
+                    SELECT s.id, s.title, s.artist, s.album, f.fingerprint
+                    FROM song_fingerprints f
+                    JOIN songs s ON s.id = f.song_id
+                    WHERE f.band0 = ANY(%s) OR f.band1 = ANY(%s) OR f.band2 = ANY(%s) OR f.band3 = ANY(%s)
+                    """,
+                    tuple(probes)
+                )
+                rows = cursor.fetchall()
+            conn.rollback()
+        return [dict(row) for row in rows]
+
+    def songs_missing_fingerprints(self, limit: int) -> List[Dict[str, Any]]:
+        """IDs and folders of songs without a stored audio fingerprint."""
+        with get_connection() as conn:
+            with conn.cursor(cursor_factory=DictCursor) as cursor:
+                cursor.execute(
+                    """
+                    SELECT s.id, s.file_path FROM songs s
+                    LEFT JOIN song_fingerprints f ON f.song_id = s.id
+                    WHERE f.song_id IS NULL
+                    ORDER BY s.id
+                    LIMIT %s
+                    """,
+                    (limit,)
+                )
+                rows = cursor.fetchall()
+        return [{"id": row["id"], "folder_path": row["file_path"]} for row in rows]
+
+    def save_song_files(self, song_id: int, files: List[Dict[str, Any]]):
+        """Replace a song's blob references, adding missing blob rows; triggers keep refcounts in step."""
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM song_files WHERE song_id = %s", (song_id,))
+                if files:
+                    execute_values(
+                        cursor,
+                        "INSERT INTO blobs (hash, size_bytes) VALUES %s ON CONFLICT (hash) DO NOTHING",
+                        sorted({(file["hash"], file["size_bytes"]) for file in files})  # Sorted: consistent lock order
+                    )
+                    execute_values(
+                        cursor,
+                        "INSERT INTO song_files (song_id, path, hash) VALUES %s",
+                        [(song_id, file["path"], file["hash"]) for file in files]
+                    )
+            conn.commit()
+
+    def songs_without_files(self, after_id: int, limit: int) -> List[Dict[str, Any]]:
+        """IDs and folders of songs after `after_id` with no blob references, in ID order."""
+        with get_connection() as conn:
+            with conn.cursor(cursor_factory=DictCursor) as cursor:
+                cursor.execute(
+                    """
+                    SELECT s.id, s.file_path FROM songs s
+                    WHERE s.id > %s AND NOT EXISTS (SELECT 1 FROM song_files f WHERE f.song_id = s.id)
+                    ORDER BY s.id
+                    LIMIT %s
+                    """,
+                    (after_id, limit)
+                )
+                rows = cursor.fetchall()
+            conn.rollback()
+        return [{"id": row["id"], "folder_path": row["file_path"]} for row in rows]
+
+    def unreferenced_blobs(self, after_hash: str, limit: int) -> List[str]:
+        """Hashes after `after_hash` of blobs no song references any more, in hash order."""
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT hash FROM blobs WHERE refcount = 0 AND hash > %s ORDER BY hash LIMIT %s", (after_hash, limit)
+                )
+                rows = cursor.fetchall()
+            conn.rollback()
+        return [row[0] for row in rows]
+
+    def delete_blob(self, blob_hash: str) -> bool:
+        """Delete a blob row if it is still unreferenced; returns whether it was deleted."""
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM blobs WHERE hash = %s AND refcount = 0", (blob_hash,))
+                deleted = cursor.rowcount > 0
+            conn.commit()
+        return deleted
+
+    def blob_report(self) -> Dict[str, int]:
+        """Blob counts and sizes: stored once versus as linked from song folders."""
+        with get_connection() as conn:
+            with conn.cursor(cursor_factory=DictCursor) as cursor:
+                cursor.execute(
+                    """
+                    SELECT
+                        COUNT(*) AS blobs,
+                        COUNT(*) FILTER (WHERE refcount = 0) AS unreferenced_blobs,
+                        COALESCE(SUM(size_bytes), 0) AS stored_bytes,
+                        COALESCE(SUM(size_bytes * refcount), 0) AS linked_bytes,
+                        COALESCE(SUM(size_bytes * (refcount - 1)) FILTER (WHERE refcount > 1), 0) AS bytes_saved
+                    FROM blobs
+                    """
+                )
+                row = cursor.fetchone()
+            conn.rollback()
+        return {key: int(value) for key, value in dict(row).items()}
+
+    def upsert_asset(self, asset: Dict[str, Any]):
+        """Insert or refresh an asset row keyed on (content_type, file_name)."""
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO assets (content_type, file_name, file_path, mime_type, width, height, size_bytes, thumbnail_path)
+                    VALUES (%(content_type)s, %(file_name)s, %(file_path)s, %(mime_type)s,
+                            %(width)s, %(height)s, %(size_bytes)s, %(thumbnail_path)s)
+                    ON CONFLICT (content_type, file_name) DO UPDATE SET
+                        file_path = EXCLUDED.file_path,
+                        mime_type = EXCLUDED.mime_type,
+                        width = EXCLUDED.width,
+                        height = EXCLUDED.height,
+                        size_bytes = EXCLUDED.size_bytes,
+                        thumbnail_path = EXCLUDED.thumbnail_path,
+                        updated_at = CURRENT_TIMESTAMP
+                    """,
+                    asset
+                )
+            conn.commit()
+
+    def get_asset(self, content_type: str, file_name: str) -> Optional[Dict[str, Any]]:
+        """An asset's stored row."""
+        with get_connection() as conn:
+            with conn.cursor(cursor_factory=DictCursor) as cursor:
+                cursor.execute(
+                    f"SELECT {', '.join(ASSET_FIELDS)} FROM assets WHERE content_type = %s AND file_name = %s",
+                    (content_type, file_name)
+                )
+                row = cursor.fetchone()
+        return dict(row) if row else None
+
+    def delete_asset(self, content_type: str, file_name: str):
+        """Remove an asset row."""
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM assets WHERE content_type = %s AND file_name = %s", (content_type, file_name))
+            conn.commit()
+
+    def vacuum_analyze(self, tables: List[str]):
+        """VACUUM (ANALYZE) each table; VACUUM cannot run inside a transaction."""
+        with get_connection() as conn:
+            conn.autocommit = True
+            try:
+                with conn.cursor() as cursor:
+                    for table in tables:
+                        cursor.execute(f"VACUUM (ANALYZE) {table}")
+            finally:
+                conn.autocommit = False
+
+    def analyze(self, tables: List[str]):
+        """ANALYZE each table."""
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                for table in tables:
+                    cursor.execute(f"ANALYZE {table}")
+            conn.commit()
+
+    def maintain_indexes(self, reindex: List[str]) -> List[str]:
+        """
+        Flush the GIN pending lists into the trigram indexes, then rebuild only the named indexes
+        concurrently (a rebuild rewrites the whole index, so it is reserved for measured bloat).
+        """
+        rebuilt = []
+        with get_connection() as conn:
+            conn.autocommit = True
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        """
+                        SELECT gin_clean_pending_list(i.indexrelid)
+                        FROM pg_index i
+                        JOIN pg_class c ON c.oid = i.indexrelid
+                        JOIN pg_am am ON am.oid = c.relam
+                        WHERE i.indrelid = 'songs'::regclass AND am.amname = 'gin'
+                        """
+                    )
+                    for name in reindex:
+                        # Resolved through the catalog, so only existing indexes are rebuilt, quoted by Postgres
+                        cursor.execute(
+                            "SELECT oid::regclass::text FROM pg_class WHERE relname = %s AND relkind = 'i' AND pg_table_is_visible(oid)",
+                            (name,)
+                        )
+                        row = cursor.fetchone()
+                        if not row:
+                            logger.warning(f"⚠️ Not reindexing {name}: no such index")
+                            continue
+                        cursor.execute(f"REINDEX INDEX CONCURRENTLY {row[0]}")
+                        rebuilt.append(name)
+            finally:
+                conn.autocommit = False
+        return rebuilt
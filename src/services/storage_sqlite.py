@@ -0,0 +1,576 @@
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from loguru import logger
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from src.database import SQLITE_PATH
+from src.services.migrations import SQLiteMigrationRunner, run_migrations
+from src.services.song_matching import match_rows
+from src.services.storage import Storage, SONG_FIELDS, CHART_STATS_FIELDS, ASSET_FIELDS, row_to_song
+
+SQLITE_BUSY_TIMEOUT_MS = 5000
+# The trigram index needs at least three characters; shorter searches fall back to LIKE
+FTS_MIN_QUERY_LENGTH = 3
+
+
+def decode_song(row: sqlite3.Row, fields: List[str]) -> Dict[str, Any]:
+    """Build a song dict, decoding the JSON metadata column."""
+    song = row_to_song(row, fields)
+    if isinstance(song.get("metadata"), str):
+        song["metadata"] = json.loads(song["metadata"]) or {}
+    return song
+
+
+def fts_phrase(query: str) -> str:
+    """Quote a search string as a single FTS5 phrase."""
+    return '"' + query.replace('"', '""') + '"'
+
+
+class SQLiteStorage(Storage):
+    """
+    Embedded storage for single-node installs: one SQLite file in WAL mode (readers never block
+    the writer), with an FTS5 trigram index for search. Each thread keeps its own connection.
+    """
+
+    name = "sqlite"
+    has_change_notifications = False
+
+    def __init__(self, path: str = SQLITE_PATH):
+        self.path = path
+        self.local = threading.local()
+
+    def connect(self) -> sqlite3.Connection:
+        """Open a connection with WAL, foreign keys and a busy timeout."""
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")  # Durable at checkpoints; safe with WAL
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Yield this thread's connection, rolling back anything left open by an error."""
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = self.local.conn = self.connect()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+
+    def close(self):
+        """Close this thread's connection."""
+        conn = getattr(self.local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
+
+    def init_schema(self):
+        """Apply pending migrations (src/sql/migrations/sqlite)."""
+        logger.info(f"🚀 Initializing SQLite database at {self.path}...")
+        run_migrations(SQLiteMigrationRunner(self.connect(), self.path))
+        logger.success("🎉 SQLite database initialization completed successfully.")
+
+    def ping(self) -> bool:
+        """Run a trivial query to check the database is readable."""
+        with self.connection() as conn:
+            conn.execute("SELECT 1").fetchone()
+        return True
+
+    def library_version(self) -> int:
+        """Return the counter bumped by triggers on every change to songs."""
+        with self.connection() as conn:
+            row = conn.execute("SELECT version FROM library_version WHERE id = 1").fetchone()
+        return row[0] if row else 0
+
+    def change_log_position(self) -> int:
+        """Sequence number of the newest song_changes row (0 when empty)."""
+        with self.connection() as conn:
+            # sqlite_sequence remembers the last seq even after pruning has removed its row
+            row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'song_changes'").fetchone()
+        return row[0] if row else 0
+
+    def song_changes(self, after_seq: int, limit: int) -> List[Dict[str, Any]]:
+        """Up to `limit` change log rows (`seq`, `op`, `id`) after `after_seq`, oldest first."""
+        with self.connection() as conn:
+            rows = conn.execute(
+                "SELECT seq, op, song_id FROM song_changes WHERE seq > ? ORDER BY seq LIMIT ?",
+                (after_seq, limit)
+            ).fetchall()
+        return [{"seq": row[0], "op": row[1], "id": row[2]} for row in rows]
+
+    def prune_song_changes(self, max_age_seconds: int) -> int:
+        """Delete change log rows older than `max_age_seconds`; returns how many were removed."""
+        with self.connection() as conn:
+            with conn:
+                cursor = conn.execute(
+                    "DELETE FROM song_changes WHERE changed_at < datetime('now', ?)", (f"-{int(max_age_seconds)} seconds",)
+                )
+        return cursor.rowcount
+
+    def list_songs(
+        self, fields: List[str], search_query: Optional[str] = None, limit: int = 50, offset: int = 0,
+        instrument: Optional[str] = None, difficulty: Optional[str] = None,
+        min_peak_nps: Optional[float] = None, max_peak_nps: Optional[float] = None, after_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Filtered songs, newest first; `after_id` seeks past the previous page instead of using `offset`."""
+        query = f"SELECT {', '.join(fields)} FROM songs"
+        conditions = []
+        params: List[Any] = []
+
+        search_query = search_query.strip() if search_query else None
+        if search_query:
+            if len(search_query) >= FTS_MIN_QUERY_LENGTH:
+                conditions.append("id IN (SELECT rowid FROM songs_fts WHERE songs_fts MATCH ?)")
+                params.append(fts_phrase(search_query))
+            else:
+                conditions.append("(title LIKE ? OR artist LIKE ? OR album LIKE ?)")
+                params.extend([f"%{search_query}%"] * 3)
+
+        if instrument or difficulty:
+            track_conditions = ["cs.song_id = songs.id"]
+            for column, value in (("instrument", instrument), ("difficulty", difficulty)):
+                if value:
+                    track_conditions.append(f"cs.{column} = ?")
+                    params.append(value)
+            for operator, value in ((">=", min_peak_nps), ("<=", max_peak_nps)):
+                if value is not None:
+                    track_conditions.append(f"cs.peak_nps {operator} ?")
+                    params.append(value)
+            conditions.append(f"EXISTS (SELECT 1 FROM song_chart_stats cs WHERE {' AND '.join(track_conditions)})")
+        else:
+            for operator, value in ((">=", min_peak_nps), ("<=", max_peak_nps)):
+                if value is not None:
+                    conditions.append(f"peak_nps {operator} ?")
+                    params.append(value)
+
+        if after_id is not None:
+            conditions.append("id < ?")
+            params.append(after_id)
+            offset = 0
+
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY id DESC LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+
+        with self.connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [decode_song(row, fields) for row in rows]
+
+    def library_tree(self, after_artist: Optional[str], artist_limit: int) -> List[Dict[str, Any]]:
+        """Up to `artist_limit` artists after `after_artist`, each with its albums and song counts."""
+        artist_filter = "WHERE artist > ?" if after_artist is not None else ""
+        params = [after_artist] if after_artist is not None else []
+        params.append(artist_limit)
+
+        with self.connection() as conn:
+            rows = conn.execute(
+                f"""
+                WITH artist_page AS (
+                    SELECT DISTINCT artist FROM songs
+                    {artist_filter}
+                    ORDER BY artist
+                    LIMIT ?
+                ),
+                albums AS (
+                    SELECT s.artist, s.album, COUNT(*) AS song_count
+                    FROM songs s
+                    JOIN artist_page p ON p.artist = s.artist
+                    GROUP BY s.artist, s.album
+                    ORDER BY s.artist, s.album
+                )
+                SELECT
+                    artist,
+                    SUM(song_count) AS song_count,
+                    json_group_array(json_object('album', album, 'song_count', song_count)) AS albums
+                FROM albums
+                GROUP BY artist
+                ORDER BY artist
+                """,
+                params
+            ).fetchall()
+
+        return [
+            {"artist": row["artist"], "song_count": row["song_count"], "albums": json.loads(row["albums"])}
+            for row in rows
+        ]
+
+    def album_songs(self, artist: str, album: Optional[str], fields: List[str]) -> List[Dict[str, Any]]:
+        """Songs of one album ordered by title; a missing album matches NULL or empty."""
+        album_condition = "album = ?" if album else "(album IS NULL OR album = '')"
+        params = [artist, album] if album else [artist]
+        with self.connection() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(fields)} FROM songs WHERE artist = ? AND {album_condition} ORDER BY title, id",
+                params
+            ).fetchall()
+        return [decode_song(row, fields) for row in rows]
+
+    def get_song(self, song_id: int) -> Optional[Dict[str, Any]]:
+        """Every song field plus per-track chart statistics."""
+        with self.connection() as conn:
+            row = conn.execute(f"SELECT {', '.join(SONG_FIELDS)} FROM songs WHERE id = ?", (song_id,)).fetchone()
+            if not row:
+                return None
+            chart_stats = conn.execute(
+                f"""
+                SELECT {', '.join(CHART_STATS_FIELDS)}
+                FROM song_chart_stats WHERE song_id = ?
+                ORDER BY instrument, difficulty
+                """,
+                (song_id,)
+            ).fetchall()
+
+        return {**decode_song(row, list(SONG_FIELDS)), "chart_stats": [dict(stats) for stats in chart_stats]}
+
+    def songs_by_ids(self, song_ids: List[int], fields: List[str]) -> List[Dict[str, Any]]:
+        """Fetch the given songs (missing IDs are skipped)."""
+        with self.connection() as conn:
+            # json_each binds the whole ID list as one parameter (no SQLITE_MAX_VARIABLE_NUMBER limit)
+            rows = conn.execute(
+                f"SELECT {', '.join(fields)} FROM songs WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps(list(song_ids)),)
+            ).fetchall()
+        return [decode_song(row, fields) for row in rows]
+
+    def iter_songs(self, fields: List[str], batch_size: int = 10000) -> Iterator[Dict[str, Any]]:
+        """Stream every song in ID order in batches."""
+        # A dedicated connection, so a slow consumer never holds this thread's shared one mid-read
+        conn = self.connect()
+        try:
+            cursor = conn.execute(f"SELECT {', '.join(fields)} FROM songs ORDER BY id")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield decode_song(row, fields)
+        finally:
+            conn.close()
+
+    def count_songs(self) -> int:
+        """Total number of songs."""
+        with self.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM songs").fetchone()[0]
+
+    def find_song(self, match_key: str) -> Optional[int]:
+        """ID of a song with this normalized match key, if any."""
+        with self.connection() as conn:
+            row = conn.execute("SELECT song_id FROM song_match_keys WHERE match_key = ? LIMIT 1", (match_key,)).fetchone()
+        return row[0] if row else None
+
+    def match_candidates(self, band_hashes: List[int], limit: int) -> List[Dict[str, Any]]:
+        """Songs sharing a MinHash band bucket with `band_hashes`, most shared bands first."""
+        # One (band, hash) probe per band, each answered by idx_song_match_bands_bucket
+        probes = " OR ".join("(band = ? AND hash = ?)" for _ in band_hashes)
+        params = [value for band, hash_value in enumerate(band_hashes) for value in (band, hash_value)]
+        with self.connection() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT s.id, s.title, s.artist, s.album, b.shared_bands
+                FROM (
+                    SELECT song_id, COUNT(*) AS shared_bands FROM song_match_bands
+                    WHERE {probes}
+                    GROUP BY song_id
+                    ORDER BY shared_bands DESC, song_id
+                    LIMIT ?
+                ) b
+                JOIN songs s ON s.id = b.song_id
+                ORDER BY b.shared_bands DESC, s.id
+                """,
+                (*params, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def duplicate_pairs(self, max_bucket_size: int) -> List[Tuple[int, int]]:
+        """(lower ID, higher ID) pairs sharing any band bucket of at most `max_bucket_size` songs."""
+        with self.connection() as conn:
+            rows = conn.execute(
+                """
+                WITH buckets AS (
+                    SELECT band, hash FROM song_match_bands
+                    GROUP BY band, hash
+                    HAVING COUNT(*) BETWEEN 2 AND ?
+                )
+                SELECT DISTINCT a.song_id, b.song_id
+                FROM buckets k
+                JOIN song_match_bands a ON a.band = k.band AND a.hash = k.hash
+                JOIN song_match_bands b ON b.band = k.band AND b.hash = k.hash AND b.song_id > a.song_id
+                """,
+                (max_bucket_size,)
+            ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def insert_song(
+        self, title: str, artist: str, album: str, file_path: str,
+        metadata: Dict[str, Any], chart_stats: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """Insert a song (with its chart statistics and match index rows) in one transaction; returns its ID."""
+        with self.connection() as conn:
+            with conn:  # Commits on success, rolls back on error
+                song_id = conn.execute(
+                    "INSERT INTO songs (title, artist, album, file_path, metadata) VALUES (?, ?, ?, ?, ?)",
+                    (title, artist, album, file_path, json.dumps(metadata))
+                ).lastrowid
+                key_row, band_rows = match_rows(song_id, title, artist, album or "")
+                conn.execute("INSERT INTO song_match_keys (song_id, match_key) VALUES (?, ?)", key_row)
+                conn.executemany("INSERT INTO song_match_bands (song_id, band, hash) VALUES (?, ?, ?)", band_rows)
+                if chart_stats:
+                    conn.execute(
+                        "UPDATE songs SET tempo_min = ?, tempo_max = ?, peak_nps = ? WHERE id = ?",
+                        (chart_stats["tempo_min"], chart_stats["tempo_max"], chart_stats["peak_nps"], song_id)
+                    )
+                    conn.executemany(
+                        """
+                        INSERT OR REPLACE INTO song_chart_stats
+                            (song_id, instrument, difficulty, note_count, avg_nps, peak_nps, length_seconds)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        [
+                            (song_id, track["instrument"], track["difficulty"], track["note_count"],
+                             track["avg_nps"], track["peak_nps"], track["length_seconds"])
+                            for track in chart_stats["tracks"]
+                        ]
+                    )
+        return song_id
+
+    def delete_songs(self, song_ids: List[int]) -> List[int]:
+        """Delete songs; returns the IDs that existed."""
+        with self.connection() as conn:
+            with conn:
+                deleted = [
+                    row[0] for row in conn.execute(
+                        "DELETE FROM songs WHERE id IN (SELECT value FROM json_each(?)) RETURNING id",
+                        (json.dumps(list(song_ids)),)
+                    ).fetchall()
+                ]
+        return deleted
+
+    def save_waveform(self, song_id: int, peaks: bytes, buckets: int, duration_seconds: float, etag: str):
+        """Store or replace a song's waveform."""
+        with self.connection() as conn:
+            with conn:
+                conn.execute(
+                    """
+                    INSERT INTO song_waveforms (song_id, peaks, buckets, duration_seconds, etag)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (song_id) DO UPDATE SET
+                        peaks = excluded.peaks,
+                        buckets = excluded.buckets,
+                        duration_seconds = excluded.duration_seconds,
+                        etag = excluded.etag,
+                        created_at = CURRENT_TIMESTAMP
+                    """,
+                    (song_id, peaks, buckets, duration_seconds, etag)
+                )
+
+    def get_waveform(self, song_id: int) -> Optional[Dict[str, Any]]:
+        """A song's stored waveform (peaks, buckets, duration_seconds, etag)."""
+        with self.connection() as conn:
+            row = conn.execute(
+                "SELECT peaks, buckets, duration_seconds, etag FROM song_waveforms WHERE song_id = ?", (song_id,)
+            ).fetchone()
+        if not row:
+            return None
+        return {
+            "peaks": bytes(row["peaks"]),
+            "buckets": row["buckets"],
+            "duration_seconds": row["duration_seconds"],
+            "etag": row["etag"],
+        }
+
+    def songs_missing_waveforms(self, limit: int) -> List[Dict[str, Any]]:
+        """IDs and folders of songs without a stored waveform."""
+        with self.connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT s.id, s.file_path FROM songs s
+                LEFT JOIN song_waveforms w ON w.song_id = s.id
+                WHERE w.song_id IS NULL
+                ORDER BY s.id
+                LIMIT ?
+                """,
+                (limit,)
+            ).fetchall()
+        return [{"id": row["id"], "folder_path": row["file_path"]} for row in rows]
+
+    def save_fingerprint(self, song_id: int, fingerprint: int, bands: List[int]):
+        """Store or replace a song's audio fingerprint and its band columns."""
+        with self.connection() as conn:
+            with conn:
+                conn.execute(
+                    """
+                    INSERT INTO song_fingerprints (song_id, fingerprint, band0, band1, band2, band3)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (song_id) DO UPDATE SET
+                        fingerprint = excluded.fingerprint,
+                        band0 = excluded.band0,
+                        band1 = excluded.band1,
+                        band2 = excluded.band2,
+                        band3 = excluded.band3,
+                        created_at = CURRENT_TIMESTAMP
+                    """,
+                    (song_id, fingerprint, *bands)
+                )
+
+    def get_fingerprint(self, song_id: int) -> Optional[int]:
+        """A song's stored audio fingerprint."""
+        with self.connection() as conn:
+            row = conn.execute("SELECT fingerprint FROM song_fingerprints WHERE song_id = ?", (song_id,)).fetchone()
+        return row[0] if row else None
+
+    def fingerprint_candidates(self, probes: List[List[int]]) -> List[Dict[str, Any]]:
+        """Songs (with their fingerprint) whose band N matches any value in probes[N]."""
+        # Each `bandN IN (...)` is an index lookup; SQLite unions the four with its OR optimization
+        conditions = " OR ".join(
+            f"f.band{band} IN ({', '.join('?' * len(values))})" for band, values in enumerate(probes)
+        )
+        with self.connection() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT s.id, s.title, s.artist, s.album, f.fingerprint
+                FROM song_fingerprints f
+                JOIN songs s ON s.id = f.song_id
+                WHERE {conditions}
+                """,
+                [value for values in probes for value in values]
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def songs_missing_fingerprints(self, limit: int) -> List[Dict[str, Any]]:
+        """IDs and folders of songs without a stored audio fingerprint."""
+        with self.connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT s.id, s.file_path FROM songs s
+                LEFT JOIN song_fingerprints f ON f.song_id = s.id
+                WHERE f.song_id IS NULL
+                ORDER BY s.id
+                LIMIT ?
+                """,
+                (limit,)
+            ).fetchall()
+        return [{"id": row["id"], "folder_path": row["file_path"]} for row in rows]
+
+    def save_song_files(self, song_id: int, files: List[Dict[str, Any]]):
+        """Replace a song's blob references, adding missing blob rows; triggers keep refcounts in step."""
+        with self.connection() as conn:
+            with conn:
+                conn.execute("DELETE FROM song_files WHERE song_id = ?", (song_id,))
+                conn.executemany(
+                    "INSERT INTO blobs (hash, size_bytes) VALUES (?, ?) ON CONFLICT (hash) DO NOTHING",
+                    sorted({(file["hash"], file["size_bytes"]) for file in files})
+                )
+                conn.executemany(
+                    "INSERT INTO song_files (song_id, path, hash) VALUES (?, ?, ?)",
+                    [(song_id, file["path"], file["hash"]) for file in files]
+                )
+
+    def songs_without_files(self, after_id: int, limit: int) -> List[Dict[str, Any]]:
+        """IDs and folders of songs after `after_id` with no blob references, in ID order."""
+        with self.connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT s.id, s.file_path FROM songs s
+                WHERE s.id > ? AND NOT EXISTS (SELECT 1 FROM song_files f WHERE f.song_id = s.id)
+                ORDER BY s.id
+                LIMIT ?
+                """,
+                (after_id, limit)
+            ).fetchall()
+        return [{"id": row["id"], "folder_path": row["file_path"]} for row in rows]
+
+    def unreferenced_blobs(self, after_hash: str, limit: int) -> List[str]:
+        """Hashes after `after_hash` of blobs no song references any more, in hash order."""
+        with self.connection() as conn:
+            rows = conn.execute(
+                "SELECT hash FROM blobs WHERE refcount = 0 AND hash > ? ORDER BY hash LIMIT ?", (after_hash, limit)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def delete_blob(self, blob_hash: str) -> bool:
+        """Delete a blob row if it is still unreferenced; returns whether it was deleted."""
+        with self.connection() as conn:
+            with conn:
+                return conn.execute("DELETE FROM blobs WHERE hash = ? AND refcount = 0", (blob_hash,)).rowcount > 0
+
+    def blob_report(self) -> Dict[str, int]:
+        """Blob counts and sizes: stored once versus as linked from song folders."""
+        with self.connection() as conn:
+            row = conn.execute(
+                """
+                SELECT
+                    COUNT(*) AS blobs,
+                    COALESCE(SUM(refcount = 0), 0) AS unreferenced_blobs,
+                    COALESCE(SUM(size_bytes), 0) AS stored_bytes,
+                    COALESCE(SUM(size_bytes * refcount), 0) AS linked_bytes,
+                    COALESCE(SUM(CASE WHEN refcount > 1 THEN size_bytes * (refcount - 1) END), 0) AS bytes_saved
+                FROM blobs
+                """
+            ).fetchone()
+        return dict(row)
+
+    def upsert_asset(self, asset: Dict[str, Any]):
+        """Insert or refresh an asset row keyed on (content_type, file_name)."""
+        with self.connection() as conn:
+            with conn:
+                conn.execute(
+                    """
+                    INSERT INTO assets (content_type, file_name, file_path, mime_type, width, height, size_bytes, thumbnail_path)
+                    VALUES (:content_type, :file_name, :file_path, :mime_type, :width, :height, :size_bytes, :thumbnail_path)
+                    ON CONFLICT (content_type, file_name) DO UPDATE SET
+                        file_path = excluded.file_path,
+                        mime_type = excluded.mime_type,
+                        width = excluded.width,
+                        height = excluded.height,
+                        size_bytes = excluded.size_bytes,
+                        thumbnail_path = excluded.thumbnail_path,
+                        updated_at = CURRENT_TIMESTAMP
+                    """,
+                    asset
+                )
+
+    def get_asset(self, content_type: str, file_name: str) -> Optional[Dict[str, Any]]:
+        """An asset's stored row."""
+        with self.connection() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(ASSET_FIELDS)} FROM assets WHERE content_type = ? AND file_name = ?",
+                (content_type, file_name)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def delete_asset(self, content_type: str, file_name: str):
+        """Remove an asset row."""
+        with self.connection() as conn:
+            with conn:
+                conn.execute("DELETE FROM assets WHERE content_type = ? AND file_name = ?", (content_type, file_name))
+
+    def vacuum_analyze(self, tables: List[str]):
+        """
+        ANALYZE each table and truncate the WAL. A full VACUUM rewrites the whole database file
+        under an exclusive lock, so it is left to manual maintenance.
+        """
+        with self.connection() as conn:
+            for table in tables:
+                conn.execute(f"ANALYZE {table}")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def analyze(self, tables: List[str]):
+        """Let SQLite re-analyze whichever tables need it."""
+        with self.connection() as conn:
+            conn.execute("PRAGMA optimize")
+
+    def maintain_indexes(self, reindex: List[str]) -> List[str]:
+        """Merge the full-text index segments (named rebuilds are Postgres-only)."""
+        with self.connection() as conn:
+            with conn:
+                conn.execute("INSERT INTO songs_fts (songs_fts) VALUES ('optimize')")
+        return []
@@ -0,0 +1,245 @@
+import re
+import time
+import bisect
+import threading
+import unicodedata
+from array import array
+from loguru import logger
+from typing import Dict, Any, List, Optional, Tuple
+from src.services.storage import storage
+
+SUGGEST_FIELDS = ("title", "artist", "album")
+BUILD_FETCH_SIZE = 10000  # Rows fetched per batch while building
+# Matches inspected per query; bounds latency for one-letter prefixes on huge libraries
+MAX_CANDIDATES = 256
+
+NON_ALNUM_PATTERN = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text: Optional[str]) -> str:
+    """Lowercase, strip accents and punctuation, and collapse whitespace ("Motörhead!" -> "motorhead")."""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return NON_ALNUM_PATTERN.sub(" ", text.casefold()).strip()
+
+
+def word_keys(normalized: str) -> List[str]:
+    """Return the value from each word onwards, so "back in black" also matches "black"."""
+    words = normalized.split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+class SuggestIndex:
+    """
+    Sorted-array prefix index over the distinct titles, artists and albums in the library.
+    Each distinct value is stored once with a song count; its word keys live in one sorted list
+    with a parallel array of value IDs, so a lookup is a bisect plus a short scan.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ready = False
+        self.building = False
+        self.rebuild_queued = False  # A rebuild was requested while one was running
+        self.pending: List[Dict[str, Any]] = []  # Change events received while a build is running
+        self.reset()
+
+    def reset(self):
+        """Empty the index."""
+        self.keys: List[str] = []
+        self.value_ids = array("I")
+        self.values: List[Optional[List[Any]]] = []  # value ID -> [field, display, count, normalized]
+        self.value_lookup: Dict[Tuple[str, str], int] = {}  # (field, normalized) -> value ID
+        self.free_ids: List[int] = []
+        self.songs: Dict[int, Tuple[int, ...]] = {}  # song ID -> value IDs
+
+    def intern_value(self, field: str, display: str, insert_keys: bool) -> Optional[int]:
+        """Return the value ID for a field value, creating it (and its keys) on first sight."""
+        normalized = normalize(display)
+        if not normalized:
+            return None
+
+        value_id = self.value_lookup.get((field, normalized))
+        if value_id is not None:
+            self.values[value_id][2] += 1
+            return value_id
+
+        if self.free_ids:
+            value_id = self.free_ids.pop()
+            self.values[value_id] = [field, display, 1, normalized]
+        else:
+            value_id = len(self.values)
+            self.values.append([field, display, 1, normalized])
+        self.value_lookup[(field, normalized)] = value_id
+
+        for key in word_keys(normalized):
+            if insert_keys:
+                position = bisect.bisect_right(self.keys, key)
+                self.keys.insert(position, key)
+                self.value_ids.insert(position, value_id)
+            else:
+                self.keys.append(key)
+                self.value_ids.append(value_id)
+        return value_id
+
+    def release_value(self, value_id: int):
+        """Drop one song's reference to a value, removing the value when no song uses it."""
+        value = self.values[value_id]
+        value[2] -= 1
+        if value[2] > 0:
+            return
+
+        normalized = value[3]
+        for key in word_keys(normalized):
+            position = bisect.bisect_left(self.keys, key)
+            while position < len(self.keys) and self.keys[position] == key:
+                if self.value_ids[position] == value_id:
+                    del self.keys[position]
+                    del self.value_ids[position]
+                    break
+                position += 1
+        del self.value_lookup[(value[0], normalized)]
+        self.values[value_id] = None
+        self.free_ids.append(value_id)
+
+    def add_song(self, song_id: int, row: Dict[str, Any], insert_keys: bool = True):
+        """Index a song's title, artist and album (replacing what was indexed for it before)."""
+        self.remove_song(song_id)
+        value_ids = (self.intern_value(field, row.get(field), insert_keys) for field in SUGGEST_FIELDS)
+        self.songs[song_id] = tuple(value_id for value_id in value_ids if value_id is not None)
+
+    def remove_song(self, song_id: int):
+        """Remove a song from the index."""
+        for value_id in self.songs.pop(song_id, ()):
+            self.release_value(value_id)
+
+    def load(self) -> Optional["SuggestIndex"]:
+        """Read the songs table into a new, unshared index; None if the query fails."""
+        fresh = SuggestIndex.__new__(SuggestIndex)
+        fresh.reset()
+        try:
+            # Rows are streamed in batches instead of loading the table at once
+            for song in storage.iter_songs(["id", "title", "artist", "album"], batch_size=BUILD_FETCH_SIZE):
+                fresh.add_song(song["id"], song, insert_keys=False)
+
+            # Keys were appended unsorted during the build; sort once at the end
+            order = sorted(range(len(fresh.keys)), key=fresh.keys.__getitem__)
+            fresh.keys = [fresh.keys[i] for i in order]
+            fresh.value_ids = array("I", (fresh.value_ids[i] for i in order))
+            return fresh
+        except Exception as e:
+            logger.exception(f"❌ Failed to build suggest index: {e}")
+            return None
+
+    def build(self):
+        """
+        Rebuild the whole index from one streaming query over the songs table.
+        Only one build runs at a time: a request made meanwhile is queued and runs once after it.
+        """
+        with self.lock:
+            if self.building:
+                self.rebuild_queued = True
+                return
+            self.building = True
+
+        while True:
+            with self.lock:
+                self.rebuild_queued = False
+                self.pending = []
+
+            start = time.perf_counter()
+            fresh = self.load()
+
+            with self.lock:
+                if fresh is not None:
+                    self.keys, self.value_ids, self.values = fresh.keys, fresh.value_ids, fresh.values
+                    self.value_lookup, self.free_ids, self.songs = fresh.value_lookup, fresh.free_ids, fresh.songs
+                    self.ready = True
+                if not self.rebuild_queued:
+                    self.building = False
+                    pending, self.pending = self.pending, []
+                    break
+
+        if fresh is not None:
+            logger.success(
+                f"🔤 Suggest index built: {len(self.songs)} songs, {len(self.keys)} keys "
+                f"in {time.perf_counter() - start:.2f}s"
+            )
+        if pending:
+            self.apply_changes(pending)  # Replay changes the build's snapshot may have missed
+
+    def apply_changes(self, events: List[Dict[str, Any]]):
+        """Apply a batch of change feed events, re-reading inserted and updated rows in one query."""
+        with self.lock:
+            if self.building:
+                if any(event.get("op") == "RESYNC" for event in events):
+                    self.rebuild_queued = True  # Picked up by the running build
+                else:
+                    self.pending.extend(events)
+                return
+
+        if any(event.get("op") == "RESYNC" for event in events):
+            threading.Thread(target=self.build, name="suggest-index-build", daemon=True).start()
+            return
+
+        changed_ids = list({event["id"] for event in events if "id" in event})
+        if not changed_ids:
+            return
+
+        rows = {song["id"]: song for song in storage.songs_by_ids(changed_ids, ["id", "title", "artist", "album"])}
+
+        with self.lock:
+            for song_id in changed_ids:
+                if song_id in rows:
+                    self.add_song(song_id, rows[song_id])
+                else:
+                    self.remove_song(song_id)
+
+    def suggest(self, query: str, limit: int = 10, field: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Return up to `limit` distinct values starting with the query (at any word),
+        ranking whole-value prefix matches first and then by number of songs.
+        """
+        prefix = normalize(query)
+        if not prefix:
+            return []
+
+        with self.lock:
+            position = bisect.bisect_left(self.keys, prefix)
+            end = min(position + MAX_CANDIDATES, len(self.keys))
+            candidates = {}
+            for i in range(position, end):
+                if not self.keys[i].startswith(prefix):
+                    break
+                value_id = self.value_ids[i]
+                value = self.values[value_id]
+                if field and value[0] != field:
+                    continue
+                # Matching from the first word beats matching a later word of the same value
+                whole_match = self.keys[i] == value[3]
+                candidates[value_id] = candidates.get(value_id, False) or whole_match
+
+            ranked = sorted(
+                candidates.items(),
+                key=lambda item: (not item[1], -self.values[item[0]][2], len(self.values[item[0]][1]))
+            )
+            return [
+                {"field": self.values[value_id][0], "value": self.values[value_id][1], "songs": self.values[value_id][2]}
+                for value_id, _ in ranked[:limit]
+            ]
+
+    def stats(self) -> Dict[str, Any]:
+        """Describe the index size."""
+        with self.lock:
+            return {
+                "ready": self.ready,
+                "songs": len(self.songs),
+                "values": len(self.value_lookup),
+                "keys": len(self.keys),
+            }
+
+
+# One index per worker process, kept current by the change feed
+suggest_index = SuggestIndex()
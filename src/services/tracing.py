@@ -0,0 +1,199 @@
+import os
+import json
+import time
+import uuid
+import queue
+import threading
+import contextvars
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+import httpx
+from loguru import logger
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() in ("1", "true", "yes")
+# Finished traces are appended to this JSONL file (one span per line); empty disables the file
+TRACE_FILE = os.getenv("TRACE_FILE", str(Path(os.getenv("LOG_DIR", "logs")) / "traces.jsonl"))
+# Optional collector accepting Zipkin v2 JSON (Zipkin, Jaeger, or an OpenTelemetry collector's zipkin receiver),
+# e.g. http://zipkin:9411/api/v2/spans
+TRACE_COLLECTOR_URL = os.getenv("TRACE_COLLECTOR_URL")
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "clonehero-api")
+SUMMARY_SLOWEST_SPANS = 5
+
+current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed operation in a trace, with attributes and child spans."""
+
+    def __init__(self, name: str, trace_id: str, parent: Optional["Span"] = None, **attributes):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent = parent
+        self.attributes: Dict[str, Any] = attributes
+        self.children: List["Span"] = []
+        self.start = time.time()
+        self.start_perf = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def set(self, **attributes):
+        """Add attributes (e.g. byte counts known only after the work is done)."""
+        self.attributes.update(attributes)
+
+    def finish(self):
+        """Record the span's duration."""
+        self.duration = time.perf_counter() - self.start_perf
+
+    def walk(self):
+        """Yield this span and all of its descendants."""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def to_record(self) -> Dict[str, Any]:
+        """Flat JSON record for the trace file."""
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent else None,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "duration_ms": round((self.duration or 0) * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+    def to_zipkin(self) -> Dict[str, Any]:
+        """Zipkin v2 span."""
+        tags = {key: str(value) for key, value in self.attributes.items()}
+        if self.error:
+            tags["error"] = self.error
+        span = {
+            "traceId": self.trace_id,
+            "id": self.span_id,
+            "name": self.name,
+            "timestamp": int(self.start * 1_000_000),
+            "duration": max(1, int((self.duration or 0) * 1_000_000)),
+            "localEndpoint": {"serviceName": TRACE_SERVICE_NAME},
+            "tags": tags,
+        }
+        if self.parent:
+            span["parentId"] = self.parent.span_id
+        return span
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Time a block as a child of the current span. Outside a trace (or with tracing disabled)
+    this is a no-op that yields None, so instrumented code never has to check.
+    """
+    parent = current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    child = Span(name, parent.trace_id, parent, **attributes)
+    parent.children.append(child)
+    token = current_span.set(child)
+    try:
+        yield child
+    except Exception as e:
+        child.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        child.finish()
+        current_span.reset(token)
+
+
+@contextmanager
+def start_trace(name: str, **attributes):
+    """Start a new trace with a root span and export it when the block exits."""
+    if not TRACING_ENABLED:
+        yield None
+        return
+
+    root = Span(name, uuid.uuid4().hex, **attributes)
+    token = current_span.set(root)
+    try:
+        yield root
+    except Exception as e:
+        root.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        root.finish()
+        current_span.reset(token)
+        export_queue.put(root)
+
+
+def summarize_trace(root: Optional[Span]) -> Optional[Dict[str, Any]]:
+    """
+    Summarize a trace for API responses: time and bytes per stage (spans grouped by name)
+    and the slowest individual spans below the root.
+    """
+    if root is None:
+        return None
+
+    elapsed = root.duration if root.duration is not None else time.perf_counter() - root.start_perf
+    stages: Dict[str, Dict[str, Any]] = {}
+    for item in root.walk():
+        if item is root or item.duration is None:
+            continue
+        stage = stages.setdefault(item.name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        duration_ms = item.duration * 1000
+        stage["count"] += 1
+        stage["total_ms"] = round(stage["total_ms"] + duration_ms, 3)
+        stage["max_ms"] = round(max(stage["max_ms"], duration_ms), 3)
+        if "bytes" in item.attributes:
+            stage["bytes"] = stage.get("bytes", 0) + item.attributes["bytes"]
+
+    slowest = sorted(
+        (item for item in root.walk() if item is not root and item.duration is not None),
+        key=lambda item: item.duration, reverse=True
+    )[:SUMMARY_SLOWEST_SPANS]
+
+    return {
+        "trace_id": root.trace_id,
+        "duration_ms": round(elapsed * 1000, 3),
+        "stages": stages,
+        "slowest": [
+            {"name": item.name, "duration_ms": round(item.duration * 1000, 3), **item.attributes}
+            for item in slowest
+        ],
+    }
+
+
+def export_trace(root: Span):
+    """Write a finished trace to the trace file and/or the collector."""
+    spans = list(root.walk())
+
+    if TRACE_FILE:
+        path = Path(TRACE_FILE)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as f:
+            for item in spans:
+                f.write(json.dumps(item.to_record(), default=str) + "\n")
+
+    if TRACE_COLLECTOR_URL:
+        response = httpx.post(TRACE_COLLECTOR_URL, json=[item.to_zipkin() for item in spans], timeout=10)
+        response.raise_for_status()
+
+
+def export_worker():
+    """Export traces off the request path so a slow collector never delays a response."""
+    while True:
+        root = export_queue.get()
+        try:
+            export_trace(root)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to export trace {root.trace_id}: {e}")
+
+
+export_queue: "queue.Queue[Span]" = queue.Queue()
+threading.Thread(target=export_worker, name="trace-exporter", daemon=True).start()
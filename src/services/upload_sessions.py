@@ -0,0 +1,142 @@
+import os
+import re
+import json
+import time
+import uuid
+import fcntl
+import asyncio
+from pathlib import Path
+from loguru import logger
+from dotenv import load_dotenv
+from typing import Dict, Any, Optional, AsyncIterator
+
+# Load environment variables
+load_dotenv()
+
+# Upload state lives on disk (not in worker memory) so any gunicorn worker can take the next chunk
+UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "/app/data/uploads"))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 8 * 1024 * 1024))  # Suggested client chunk size
+UPLOAD_SESSION_MAX_AGE = int(os.getenv("UPLOAD_SESSION_MAX_AGE", 24 * 3600))  # Abandoned uploads are removed after this
+
+UPLOAD_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+def session_paths(upload_id: str):
+    """Return the data and metadata file paths of an upload session."""
+    return UPLOAD_DIR / f"{upload_id}.part", UPLOAD_DIR / f"{upload_id}.json"
+
+
+def cleanup_stale_uploads() -> int:
+    """Delete upload sessions that have not received data for longer than the max age."""
+    if not UPLOAD_DIR.exists():
+        return 0
+
+    removed = 0
+    cutoff = time.time() - UPLOAD_SESSION_MAX_AGE
+    with os.scandir(UPLOAD_DIR) as it:
+        for entry in it:
+            if entry.name.endswith(".part") and entry.stat().st_mtime < cutoff:
+                for path in session_paths(entry.name[:-len(".part")]):
+                    path.unlink(missing_ok=True)
+                removed += 1
+
+    if removed:
+        logger.info(f"🧹 Removed {removed} stale upload sessions")
+    return removed
+
+
+def create_upload_session(file_name: str, content_type: str, size: int) -> Dict[str, Any]:
+    """Start a resumable upload and return its ID and the suggested chunk size."""
+    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    cleanup_stale_uploads()
+
+    upload_id = uuid.uuid4().hex
+    part_path, meta_path = session_paths(upload_id)
+    session = {
+        "upload_id": upload_id,
+        "file_name": Path(file_name).name,
+        "content_type": content_type,
+        "size": size,
+        "created_at": time.time(),
+    }
+    meta_path.write_text(json.dumps(session))
+    part_path.touch()
+
+    logger.info(f"📥 Started upload {upload_id} for {session['file_name']} ({size} bytes)")
+    return {**session, "offset": 0, "chunk_size": UPLOAD_CHUNK_SIZE}
+
+
+def get_upload_session(upload_id: str) -> Optional[Dict[str, Any]]:
+    """Return an upload session with its current offset (the number of bytes received so far)."""
+    if not UPLOAD_ID_PATTERN.match(upload_id):
+        return None
+
+    part_path, meta_path = session_paths(upload_id)
+    try:
+        session = json.loads(meta_path.read_text())
+        return {**session, "offset": part_path.stat().st_size, "chunk_size": UPLOAD_CHUNK_SIZE}
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+async def append_upload_chunk(upload_id: str, offset: int, chunks: AsyncIterator[bytes]) -> Dict[str, Any]:
+    """
+    Stream a chunk of the upload to disk, starting at `offset`.
+    The chunk is rejected if it does not start where the previous one ended, so a client that
+    lost a response can ask for the current offset and resume without corrupting the file.
+    """
+    session = get_upload_session(upload_id)
+    if not session:
+        return {"error": "Upload not found", "status_code": 404}
+
+    part_path, _ = session_paths(upload_id)
+    with open(part_path, "r+b") as f:
+        try:
+            # Serializes writers across workers; a concurrent retry of the same chunk is refused
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return {"error": "Another chunk is being written", "status_code": 409, "offset": session["offset"]}
+
+        current = os.fstat(f.fileno()).st_size
+        if offset != current:
+            return {"error": f"Expected offset {current}", "status_code": 409, "offset": current}
+
+        f.seek(current)
+        written = current
+        try:
+            async for chunk in chunks:
+                written += len(chunk)
+                if written > session["size"]:
+                    f.truncate(current)
+                    return {"error": "Chunk exceeds the declared upload size", "status_code": 413, "offset": current}
+                await asyncio.to_thread(f.write, chunk)
+        finally:
+            f.flush()
+
+    return {"upload_id": upload_id, "offset": written, "size": session["size"], "complete": written == session["size"]}
+
+
+def claim_upload_file(upload_id: str) -> Optional[Path]:
+    """
+    Hand a finished upload over for processing: the data file is renamed to a UUID-prefixed
+    file with the original name (as extract_content expects) and the session is removed.
+    """
+    session = get_upload_session(upload_id)
+    if not session or session["offset"] != session["size"]:
+        return None
+
+    part_path, meta_path = session_paths(upload_id)
+    file_path = UPLOAD_DIR / f"{upload_id}_{session['file_name']}"
+    part_path.rename(file_path)
+    meta_path.unlink(missing_ok=True)
+    return file_path
+
+
+def delete_upload_session(upload_id: str) -> bool:
+    """Abort an upload and remove its files."""
+    if not get_upload_session(upload_id):
+        return False
+    for path in session_paths(upload_id):
+        path.unlink(missing_ok=True)
+    logger.info(f"🗑️ Aborted upload {upload_id}")
+    return True
@@ -0,0 +1,121 @@
+import os
+import asyncio
+import numpy as np
+from pathlib import Path
+from loguru import logger
+from typing import Dict, Any, List, Optional
+from src.services.storage import storage
+from src.services.http_cache import make_etag
+from src.services.process_pool import run_in_process_pool
+
+# Number of min/max pairs stored per song (2 bytes each)
+WAVEFORM_BUCKETS = int(os.getenv("WAVEFORM_BUCKETS", 1000))
+# Peaks only need a coarse envelope, so decode at a low sample rate to keep it cheap
+WAVEFORM_SAMPLE_RATE = 8000
+
+AUDIO_EXTENSIONS = (".ogg", ".opus", ".mp3", ".wav", ".flac")
+PREFERRED_AUDIO_STEMS = ("song", "guitar", "rhythm", "bass", "drums", "vocals")
+
+# Keep references to running background stages so they are not garbage-collected
+background_tasks = set()
+
+
+def find_song_audio(folder: Path) -> Optional[Path]:
+    """Pick the audio file that best represents the song (song.* first, then the largest stem)."""
+    audio_files = [path for path in folder.iterdir() if path.suffix.lower() in AUDIO_EXTENSIONS]
+    if not audio_files:
+        return None
+
+    by_stem = {path.stem.lower(): path for path in audio_files}
+    for stem in PREFERRED_AUDIO_STEMS:
+        if stem in by_stem:
+            return by_stem[stem]
+    return max(audio_files, key=lambda path: path.stat().st_size)
+
+
+def compute_waveform_peaks(folder: str, buckets: int = WAVEFORM_BUCKETS) -> Optional[Dict[str, Any]]:
+    """
+    Decode a song's audio once and reduce it to `buckets` interleaved (min, max) int8 pairs.
+    Runs in a worker process, so it must stay picklable and never raise.
+    """
+    # Imported on first use so the API imports without librosa installed. librosa loads its heavy submodules
+    # (scipy, numba) lazily either way; only the process-pool children that decode audio pay for them
+    import librosa
+
+    try:
+        audio_path = find_song_audio(Path(folder))
+        if not audio_path:
+            logger.warning(f"⚠️ No audio found for waveform in {folder}")
+            return None
+
+        y, sr = librosa.load(str(audio_path), sr=WAVEFORM_SAMPLE_RATE, mono=True)
+        duration = len(y) / sr
+
+        # Pad so the signal splits evenly into buckets
+        bucket_size = max(1, -(-len(y) // buckets))
+        y = np.pad(y, (0, bucket_size * buckets - len(y)))
+        frames = y.reshape(buckets, bucket_size)
+
+        peaks = np.empty(buckets * 2, dtype=np.int8)
+        peaks[0::2] = np.clip(np.round(frames.min(axis=1) * 127), -127, 127)
+        peaks[1::2] = np.clip(np.round(frames.max(axis=1) * 127), -127, 127)
+
+        return {"peaks": peaks.tobytes(), "buckets": buckets, "duration_seconds": round(duration, 3)}
+    except Exception as e:
+        logger.error(f"❌ Failed to compute waveform for {folder}: {e}")
+        return None
+
+
+def save_waveform(song_id: int, waveform: Dict[str, Any]) -> bool:
+    """Store (or replace) the waveform peaks for a song."""
+    try:
+        storage.save_waveform(
+            song_id, waveform["peaks"], waveform["buckets"], waveform["duration_seconds"], make_etag(waveform["peaks"])
+        )
+        return True
+    except Exception as e:
+        logger.exception(f"❌ Error saving waveform for song ID {song_id}: {e}")
+        return False
+
+
+def get_waveform(song_id: int) -> Optional[Dict[str, Any]]:
+    """Fetch the stored waveform peaks for a song."""
+    try:
+        return storage.get_waveform(song_id)
+    except Exception as e:
+        logger.exception(f"❌ Error fetching waveform for song ID {song_id}: {e}")
+        return None
+
+
+def get_songs_missing_waveforms(limit: int = 100) -> List[Dict[str, Any]]:
+    """Return songs that do not have a stored waveform yet."""
+    try:
+        return storage.songs_missing_waveforms(limit)
+    except Exception as e:
+        logger.exception(f"❌ Error listing songs missing waveforms: {e}")
+        return []
+
+
+async def generate_waveforms(songs: List[Dict[str, Any]]) -> int:
+    """
+    Compute and store waveforms for the given songs (dicts with `id` and `folder_path`).
+    Songs are decoded one at a time so a large ingest keeps the other cores for chart parsing.
+    """
+    generated = 0
+    for song in songs:
+        waveform = await run_in_process_pool(compute_waveform_peaks, song["folder_path"])
+        if waveform and await asyncio.to_thread(save_waveform, song["id"], waveform):
+            generated += 1
+
+    logger.info(f"🌊 Generated {generated}/{len(songs)} waveforms.")
+    return generated
+
+
+def schedule_waveform_generation(songs: List[Dict[str, Any]]):
+    """Run waveform generation as a background stage so ingest does not wait on audio decoding."""
+    if not songs:
+        return
+
+    task = asyncio.create_task(generate_waveforms(songs))
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
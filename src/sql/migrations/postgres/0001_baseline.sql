@@ -0,0 +1,105 @@
+CREATE TABLE IF NOT EXISTS songs (
+    id SERIAL PRIMARY KEY,
+    title TEXT NOT NULL,
+    artist TEXT NOT NULL,
+    album TEXT,
+    file_path TEXT UNIQUE NOT NULL,
+    metadata JSONB DEFAULT '{}'::JSONB NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Chart statistics computed at ingest from notes.chart / notes.mid
+ALTER TABLE songs ADD COLUMN IF NOT EXISTS tempo_min REAL;
+ALTER TABLE songs ADD COLUMN IF NOT EXISTS tempo_max REAL;
+ALTER TABLE songs ADD COLUMN IF NOT EXISTS peak_nps REAL;
+
+CREATE INDEX IF NOT EXISTS idx_songs_peak_nps ON songs (peak_nps);
+CREATE INDEX IF NOT EXISTS idx_songs_tempo_max ON songs (tempo_max);
+
+CREATE TABLE IF NOT EXISTS song_chart_stats (
+    song_id INTEGER NOT NULL REFERENCES songs(id) ON DELETE CASCADE,
+    instrument TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    note_count INTEGER NOT NULL,
+    avg_nps REAL NOT NULL,
+    peak_nps REAL NOT NULL,
+    length_seconds REAL NOT NULL,
+    PRIMARY KEY (song_id, instrument, difficulty)
+);
+
+CREATE INDEX IF NOT EXISTS idx_song_chart_stats_peak_nps ON song_chart_stats (instrument, difficulty, peak_nps);
+CREATE INDEX IF NOT EXISTS idx_song_chart_stats_note_count ON song_chart_stats (instrument, difficulty, note_count);
+
+-- Precomputed min/max waveform peaks (interleaved int8 pairs) for library previews
+CREATE TABLE IF NOT EXISTS song_waveforms (
+    song_id INTEGER PRIMARY KEY REFERENCES songs(id) ON DELETE CASCADE,
+    peaks BYTEA NOT NULL,
+    buckets INTEGER NOT NULL,
+    duration_seconds REAL NOT NULL,
+    etag TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Background/highway assets with their dimensions and cached thumbnail
+CREATE TABLE IF NOT EXISTS assets (
+    id SERIAL PRIMARY KEY,
+    content_type TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    mime_type TEXT,
+    width INTEGER,
+    height INTEGER,
+    size_bytes BIGINT NOT NULL,
+    thumbnail_path TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (content_type, file_name)
+);
+
+-- Artist → album → title ordering for the grouped library tree
+CREATE INDEX IF NOT EXISTS idx_songs_artist_album_title ON songs (artist, album, title);
+
+-- Library version counter, bumped on every change to songs; list endpoints derive ETags from it
+CREATE TABLE IF NOT EXISTS library_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO library_version (id, version) VALUES (TRUE, 0) ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_library_version() RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE library_version SET version = version + 1 WHERE id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS songs_library_version ON songs;
+CREATE TRIGGER songs_library_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON songs
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_library_version();
+
+-- Change feed: every row change on songs is published on the song_changes channel
+CREATE OR REPLACE FUNCTION notify_song_change() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        PERFORM pg_notify('song_changes', json_build_object('op', TG_OP)::text);
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('song_changes', json_build_object('op', TG_OP, 'id', OLD.id)::text);
+    ELSE
+        PERFORM pg_notify('song_changes', json_build_object('op', TG_OP, 'id', NEW.id)::text);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS songs_change_feed ON songs;
+CREATE TRIGGER songs_change_feed
+    AFTER INSERT OR UPDATE OR DELETE ON songs
+    FOR EACH ROW EXECUTE FUNCTION notify_song_change();
+
+DROP TRIGGER IF EXISTS songs_change_feed_truncate ON songs;
+CREATE TRIGGER songs_change_feed_truncate
+    AFTER TRUNCATE ON songs
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_song_change();
@@ -0,0 +1,14 @@
+-- migrate: no-transaction
+-- Trigram indexes so the ILIKE '%query%' library search stops scanning every song.
+-- Built CONCURRENTLY so ingest and browsing continue during the build; a failed concurrent build
+-- leaves an invalid index behind, so each is dropped first and the migration can simply be re-run.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_songs_title_trgm;
+CREATE INDEX CONCURRENTLY idx_songs_title_trgm ON songs USING gin (title gin_trgm_ops);
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_songs_artist_trgm;
+CREATE INDEX CONCURRENTLY idx_songs_artist_trgm ON songs USING gin (artist gin_trgm_ops);
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_songs_album_trgm;
+CREATE INDEX CONCURRENTLY idx_songs_album_trgm ON songs USING gin (album gin_trgm_ops);
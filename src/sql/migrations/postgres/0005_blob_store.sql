@@ -0,0 +1,34 @@
+-- Content-addressed blob store (STORAGE_MODE=blobs, src/services/blob_store.py): each distinct file is kept once
+-- under its SHA-256 and song folders hardlink to it. refcount counts song_files rows and is kept in step by
+-- triggers, including rows removed when a song is deleted; blobs at zero are garbage-collected.
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    size_bytes BIGINT NOT NULL,
+    refcount INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_blobs_unreferenced ON blobs (hash) WHERE refcount = 0;
+
+CREATE TABLE IF NOT EXISTS song_files (
+    song_id INTEGER NOT NULL REFERENCES songs(id) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    hash TEXT NOT NULL REFERENCES blobs(hash),
+    PRIMARY KEY (song_id, path)
+);
+CREATE INDEX IF NOT EXISTS idx_song_files_hash ON song_files (hash);
+
+CREATE OR REPLACE FUNCTION song_files_refcount() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE blobs SET refcount = refcount + 1 WHERE hash = NEW.hash;
+    ELSE
+        UPDATE blobs SET refcount = refcount - 1 WHERE hash = OLD.hash;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS song_files_refcount ON song_files;
+CREATE TRIGGER song_files_refcount
+    AFTER INSERT OR DELETE ON song_files
+    FOR EACH ROW EXECUTE FUNCTION song_files_refcount();
@@ -0,0 +1,102 @@
+-- SQLite baseline (STORAGE_BACKEND=sqlite); mirrors postgres/0001_baseline.sql
+CREATE TABLE IF NOT EXISTS songs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    artist TEXT NOT NULL,
+    album TEXT,
+    file_path TEXT UNIQUE NOT NULL,
+    metadata TEXT NOT NULL DEFAULT '{}',  -- JSON
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    tempo_min REAL,
+    tempo_max REAL,
+    peak_nps REAL
+);
+
+CREATE INDEX IF NOT EXISTS idx_songs_peak_nps ON songs (peak_nps);
+CREATE INDEX IF NOT EXISTS idx_songs_tempo_max ON songs (tempo_max);
+CREATE INDEX IF NOT EXISTS idx_songs_artist_album_title ON songs (artist, album, title);
+
+CREATE TABLE IF NOT EXISTS song_chart_stats (
+    song_id INTEGER NOT NULL REFERENCES songs(id) ON DELETE CASCADE,
+    instrument TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    note_count INTEGER NOT NULL,
+    avg_nps REAL NOT NULL,
+    peak_nps REAL NOT NULL,
+    length_seconds REAL NOT NULL,
+    PRIMARY KEY (song_id, instrument, difficulty)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_song_chart_stats_peak_nps ON song_chart_stats (instrument, difficulty, peak_nps);
+CREATE INDEX IF NOT EXISTS idx_song_chart_stats_note_count ON song_chart_stats (instrument, difficulty, note_count);
+
+CREATE TABLE IF NOT EXISTS song_waveforms (
+    song_id INTEGER PRIMARY KEY REFERENCES songs(id) ON DELETE CASCADE,
+    peaks BLOB NOT NULL,
+    buckets INTEGER NOT NULL,
+    duration_seconds REAL NOT NULL,
+    etag TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS assets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    content_type TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    mime_type TEXT,
+    width INTEGER,
+    height INTEGER,
+    size_bytes INTEGER NOT NULL,
+    thumbnail_path TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (content_type, file_name)
+);
+
+-- Library version counter; SQLite has no statement triggers, so it is bumped per row
+CREATE TABLE IF NOT EXISTS library_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO library_version (id, version) VALUES (1, 0);
+
+CREATE TRIGGER IF NOT EXISTS songs_library_version_insert AFTER INSERT ON songs
+BEGIN
+    UPDATE library_version SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS songs_library_version_update AFTER UPDATE ON songs
+BEGIN
+    UPDATE library_version SET version = version + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS songs_library_version_delete AFTER DELETE ON songs
+BEGIN
+    UPDATE library_version SET version = version + 1 WHERE id = 1;
+END;
+
+-- Full-text search over title/artist/album. The trigram tokenizer matches any substring of
+-- three or more characters, the same results as the ILIKE '%query%' search on Postgres.
+CREATE VIRTUAL TABLE IF NOT EXISTS songs_fts USING fts5(
+    title, artist, album,
+    content = 'songs', content_rowid = 'id', tokenize = 'trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS songs_fts_insert AFTER INSERT ON songs
+BEGIN
+    INSERT INTO songs_fts (rowid, title, artist, album) VALUES (NEW.id, NEW.title, NEW.artist, NEW.album);
+END;
+
+CREATE TRIGGER IF NOT EXISTS songs_fts_delete AFTER DELETE ON songs
+BEGIN
+    INSERT INTO songs_fts (songs_fts, rowid, title, artist, album) VALUES ('delete', OLD.id, OLD.title, OLD.artist, OLD.album);
+END;
+
+CREATE TRIGGER IF NOT EXISTS songs_fts_update AFTER UPDATE OF title, artist, album ON songs
+BEGIN
+    INSERT INTO songs_fts (songs_fts, rowid, title, artist, album) VALUES ('delete', OLD.id, OLD.title, OLD.artist, OLD.album);
+    INSERT INTO songs_fts (rowid, title, artist, album) VALUES (NEW.id, NEW.title, NEW.artist, NEW.album);
+END;
@@ -0,0 +1,32 @@
+"""
+Normalized match keys and MinHash band hashes for near-duplicate detection (src/services/song_matching.py).
+Both live in their own tables, so the songs table is neither locked nor rewritten (and no change
+notifications fire); existing songs are indexed in committed batches.
+"""
+from src.services.migrations import MIGRATION_BATCH_SIZE, MIGRATION_BATCH_SLEEP_MS
+from src.services.song_matching import backfill_match_index
+
+TRANSACTIONAL = False
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS song_match_keys (
+    song_id INTEGER PRIMARY KEY REFERENCES songs(id) ON DELETE CASCADE,
+    match_key TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_song_match_keys_key ON song_match_keys (match_key);
+
+CREATE TABLE IF NOT EXISTS song_match_bands (
+    song_id INTEGER NOT NULL REFERENCES songs(id) ON DELETE CASCADE,
+    band INTEGER NOT NULL,
+    hash INTEGER NOT NULL,
+    PRIMARY KEY (song_id, band)
+);
+-- The blocking index: songs sharing a (band, hash) bucket are duplicate candidates
+CREATE INDEX IF NOT EXISTS idx_song_match_bands_bucket ON song_match_bands (band, hash);
+"""
+
+
+def migrate(runner):
+    """Create the match tables and index the existing songs."""
+    runner.execute_script(SCHEMA)
+    backfill_match_index(runner, MIGRATION_BATCH_SIZE, MIGRATION_BATCH_SLEEP_MS)
@@ -0,0 +1,17 @@
+-- 64-bit audio fingerprints (src/services/fingerprint.py), split into four 16-bit bands with one index each.
+-- Same-recording lookups probe each band's value and its one-bit neighbours, then compare the full
+-- fingerprints, so they touch a handful of index entries instead of every song.
+CREATE TABLE IF NOT EXISTS song_fingerprints (
+    song_id INTEGER PRIMARY KEY REFERENCES songs(id) ON DELETE CASCADE,
+    fingerprint BIGINT NOT NULL,
+    band0 INTEGER NOT NULL,
+    band1 INTEGER NOT NULL,
+    band2 INTEGER NOT NULL,
+    band3 INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_song_fingerprints_band0 ON song_fingerprints (band0);
+CREATE INDEX IF NOT EXISTS idx_song_fingerprints_band1 ON song_fingerprints (band1);
+CREATE INDEX IF NOT EXISTS idx_song_fingerprints_band2 ON song_fingerprints (band2);
+CREATE INDEX IF NOT EXISTS idx_song_fingerprints_band3 ON song_fingerprints (band3);
@@ -0,0 +1,25 @@
+-- Change log for the change feed. SQLite has no LISTEN/NOTIFY, so triggers append every row change on songs
+-- here and each API worker polls for rows past the last one it saw (see change_feed.poll_forever).
+-- AUTOINCREMENT keeps seq from being reused once old rows are pruned.
+CREATE TABLE IF NOT EXISTS song_changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    op TEXT NOT NULL,
+    song_id INTEGER NOT NULL,
+    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_song_changes_changed_at ON song_changes (changed_at);
+
+CREATE TRIGGER IF NOT EXISTS songs_change_log_insert AFTER INSERT ON songs
+BEGIN
+    INSERT INTO song_changes (op, song_id) VALUES ('INSERT', NEW.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS songs_change_log_update AFTER UPDATE ON songs
+BEGIN
+    INSERT INTO song_changes (op, song_id) VALUES ('UPDATE', NEW.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS songs_change_log_delete AFTER DELETE ON songs
+BEGIN
+    INSERT INTO song_changes (op, song_id) VALUES ('DELETE', OLD.id);
+END;
@@ -1,34 +1,115 @@
 import os
-import sys
+import time
+import threading
 import streamlit as st
+from collections import OrderedDict
 from loguru import logger
 import requests
+import numpy as np
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
+from src.logging_config import setup_logging
 
 # Load environment variables
 load_dotenv()
 
-# Configure Loguru logging
-LOG_DIR = os.getenv("LOG_DIR", "/app/logs")
-LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG")
-LOG_FILE_SIZE = os.getenv("LOG_FILE_SIZE", "10MB")
-LOG_RETENTION = os.getenv("LOG_RETENTION", "5")
-LOG_COMPRESSION = os.getenv("LOG_COMPRESSION", "zip")
+# Configure Loguru logging (queued sinks; see src/logging_config.py)
+setup_logging("streamlit_app.log", retention="5")
 
-os.makedirs(LOG_DIR, exist_ok=True)
-
-LOG_FILE = os.path.join(LOG_DIR, "streamlit_app.log")
-logger.add(LOG_FILE, rotation=LOG_FILE_SIZE, retention=LOG_RETENTION, compression=LOG_COMPRESSION, level=LOG_LEVEL)
-
-# Enable console logging only in debug mode
 DEBUG_MODE = os.getenv("DEBUG_MODE", "false").lower() == "true"
 if DEBUG_MODE:
-    logger.add(sys.stdout, level="DEBUG")
     logger.debug("🚀 Running in DEBUG mode")
 
 # API Base URL
 API_URL = os.getenv("API_URL", "http://clonehero_api:8000")
 logger.info(f"🌐 API Base URL: {API_URL}")
+# Song generation can run as its own service (src.api.generator); defaults to the main API
+GENERATOR_API_URL = os.getenv("GENERATOR_API_URL", API_URL)
+
+# HTTP client settings
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", 20))  # Keep-alive connections kept per host
+API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", 3))
+ETAG_CACHE_SIZE = int(os.getenv("ETAG_CACHE_SIZE", 500))  # Cached GET responses kept for revalidation
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 8 * 1024 * 1024))  # Bytes held in memory per upload request
+UPLOAD_RETRY_BACKOFF = float(os.getenv("UPLOAD_RETRY_BACKOFF", 0.5))  # Seconds before the first chunk retry; doubles each time
+
+@st.cache_resource
+def get_api_session() -> requests.Session:
+    """
+    Return the shared HTTP session used for every API call.
+    It keeps connections alive across reruns and retries idempotent requests on transient errors.
+    """
+    retry = Retry(
+        total=API_MAX_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD", "DELETE"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=API_POOL_SIZE, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Accept": "application/json"})
+    logger.info(f"🔌 API session created (pool size {API_POOL_SIZE}, retries {API_MAX_RETRIES})")
+    return session
+
+class ETagCache:
+    """Bounded LRU of (ETag, parsed JSON) per GET request, shared by all Streamlit sessions."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def put(self, key, etag: str, data):
+        with self.lock:
+            self.entries[key] = (etag, data)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+@st.cache_resource
+def get_etag_cache() -> ETagCache:
+    """Return the process-wide ETag cache."""
+    return ETagCache(ETAG_CACHE_SIZE)
+
+def api_get_json(endpoint: str, params=None, timeout=30, session=None, cache=None):
+    """
+    GET a JSON endpoint through the pooled session. Responses that carry an ETag are
+    cached and revalidated with If-None-Match, so unchanged data costs a 304 and no parsing.
+    Background threads (which have no Streamlit script context) pass `session` and `cache` explicitly.
+
+    Raises:
+        requests.RequestException: If the request fails.
+    """
+    url = f"{API_URL}/{endpoint.lstrip('/')}"
+    params = {k: v for k, v in (params or {}).items() if v is not None}
+    cache_key = (url, tuple(sorted((k, str(v)) for k, v in params.items())))
+
+    cache = cache or get_etag_cache()
+    session = session or get_api_session()
+    cached = cache.get(cache_key)
+    headers = {"If-None-Match": cached[0]} if cached else {}
+
+    response = session.get(url, params=params, headers=headers, timeout=timeout)
+    if response.status_code == 304 and cached:
+        return cached[1]
+
+    response.raise_for_status()
+    data = response.json()
+    if response.headers.get("ETag"):
+        cache.put(cache_key, response.headers["ETag"], data)
+    return data
 
 def make_api_request(endpoint: str, method="GET", data=None, files=None, params=None):
     """
@@ -46,12 +127,12 @@ def make_api_request(endpoint: str, method="GET", data=None, files=None, params=
     """
     url = f"{API_URL}/{endpoint}"
     try:
-        headers = {"Accept": "application/json"}
-        
-        response = requests.request(
+        if method.upper() == "GET" and not data and not files:
+            return api_get_json(endpoint, params=params, timeout=30)
+
+        response = get_api_session().request(
             method=method.upper(),
             url=url,
-            headers=headers,
             json=data,
             files=files,
             params=params,
@@ -69,6 +150,194 @@ def make_api_request(endpoint: str, method="GET", data=None, files=None, params=
         logger.error(f"API request failed: {method} {url} - {e}")
         return {"error": f"API request failed: {str(e)}"}
 
+def api_error_message(response: requests.Response) -> str:
+    """Extract a readable error from an API error response."""
+    try:
+        detail = response.json().get("detail", response.text)
+    except ValueError:
+        return response.text
+    return detail.get("message", str(detail)) if isinstance(detail, dict) else str(detail)
+
+def upload_file_chunked(uploaded_file, content_type: str, label: str = "Uploading"):
+    """
+    Upload a file through the API's resumable upload endpoints with a live progress bar.
+    Only one chunk is held in memory at a time; after a network error the upload resumes
+    from the offset the API reports instead of starting over.
+
+    Returns:
+        dict: The API's processing result, or {"error": ...}.
+    """
+    session = get_api_session()
+    size = uploaded_file.size
+    progress = st.progress(0.0, text=f"{label} {uploaded_file.name}...")
+
+    try:
+        response = session.post(
+            f"{API_URL}/uploads/",
+            json={"file_name": uploaded_file.name, "content_type": content_type, "size": size},
+            timeout=30
+        )
+        if not response.ok:
+            return {"error": api_error_message(response)}
+        upload = response.json()
+        upload_url = f"{API_URL}/uploads/{upload['upload_id']}"
+        chunk_size = min(upload.get("chunk_size", UPLOAD_CHUNK_SIZE), UPLOAD_CHUNK_SIZE)
+
+        offset, failures = 0, 0
+        while offset < size:
+            uploaded_file.seek(offset)
+            chunk = uploaded_file.read(chunk_size)
+            try:
+                response = session.put(upload_url, params={"offset": offset}, data=chunk, timeout=120)
+                if response.status_code == 409:
+                    # A previous attempt landed after all; continue from where the API is
+                    server_offset = response.json()["detail"]["offset"]
+                    if server_offset > offset:
+                        offset, failures = server_offset, 0
+                        continue
+                    # No progress: retried (with backoff, a limited number of times) like any other failure
+                    raise requests.HTTPError(f"Upload offset conflict at {offset}", response=response)
+                response.raise_for_status()
+                offset, failures = response.json()["offset"], 0
+            except requests.RequestException as e:
+                failures += 1
+                if failures > API_MAX_RETRIES:
+                    raise
+                delay = UPLOAD_RETRY_BACKOFF * 2 ** (failures - 1)
+                logger.warning(f"⚠️ Chunk at offset {offset} failed ({e}); resuming from the API's offset in {delay:.1f}s")
+                time.sleep(delay)
+                offset = session.get(upload_url, timeout=30).json()["offset"]
+
+            progress.progress(offset / size, text=f"{label} {uploaded_file.name}... {offset / (1024 * 1024):.0f} / {size / (1024 * 1024):.0f} MB")
+
+        progress.progress(1.0, text=f"⚙️ Processing {uploaded_file.name}...")
+        response = session.post(f"{upload_url}/complete", timeout=600)
+        if not response.ok:
+            return {"error": api_error_message(response)}
+        return response.json()
+
+    except requests.RequestException as e:
+        logger.error(f"Chunked upload of {uploaded_file.name} failed: {e}")
+        return {"error": f"Upload failed: {e}"}
+    finally:
+        progress.empty()
+
+# Fields shown in song lists; metadata is fetched per song only when requested
+SONG_LIST_FIELDS = "id,title,artist,album,file_path"
+
+def fetch_song_details(song_id: int):
+    """Fetch a single song with its full metadata and chart statistics."""
+    try:
+        return api_get_json(f"songs/{song_id}", timeout=10)
+    except requests.RequestException as e:
+        logger.error(f"Failed to fetch details for song {song_id}: {e}")
+        return None
+
+def display_song_metadata(song_id: int):
+    """Offer a toggle that loads and shows a song's metadata on demand."""
+    if not st.toggle("🔍 Show Metadata", key=f"metadata_{song_id}"):
+        return
+
+    song = fetch_song_details(song_id)
+    if not song:
+        st.warning("⚠️ Metadata unavailable.")
+        return
+
+    metadata = {k: v for k, v in song.get("metadata", {}).items() if v}  # Hide empty fields
+    if metadata:
+        st.json(metadata, expanded=False)
+    if song.get("chart_stats"):
+        st.dataframe(song["chart_stats"], hide_index=True, use_container_width=True)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_waveform(song_id: int):
+    """
+    Fetch a song's precomputed waveform peaks from the API.
+    Raises on a miss (e.g. 404 while the waveform is still being generated) so only real peaks are cached.
+
+    Returns:
+        dict: `{"min": [...], "max": [...]}` scaled to -1..1.
+    """
+    response = get_api_session().get(f"{API_URL}/songs/{song_id}/waveform", timeout=10)
+    response.raise_for_status()
+
+    peaks = np.frombuffer(response.content, dtype=np.int8).astype(np.float32) / 127.0
+    return {"min": peaks[0::2].tolist(), "max": peaks[1::2].tolist()}
+
+def display_waveform(song_id: int):
+    """Offer a toggle that loads and renders a song's waveform thumbnail on demand."""
+    if not st.toggle("🌊 Show Waveform", key=f"waveform_{song_id}"):
+        return
+
+    try:
+        waveform = fetch_waveform(song_id)
+    except requests.RequestException as e:
+        if e.response is None or e.response.status_code != 404:
+            logger.warning(f"Failed to fetch waveform for song {song_id}: {e}")
+        st.caption("🌊 Waveform not available yet.")
+        return
+    st.area_chart(waveform, height=80, use_container_width=True)
+
+def fetch_content_files(content_type: str, search: str = None, skip: int = 0, limit: int = 50):
+    """
+    Fetch one page of files in a content folder from the API's directory index.
+
+    Returns:
+        dict: `{"total": int, "items": [...]}`; empty on failure.
+    """
+    try:
+        params = {"content_type": content_type, "search": search or None, "skip": skip, "limit": limit}
+        data = api_get_json("list_content/", params=params)
+        return {"total": data.get("total", 0), "items": data.get("items", [])}
+    except requests.RequestException as e:
+        logger.error(f"Failed to fetch {content_type} files: {e}")
+        return {"total": 0, "items": []}
+
+@st.cache_data(ttl=86400, show_spinner=False)
+def fetch_thumbnail(thumbnail_url: str):
+    """Fetch a (versioned, immutable) asset thumbnail from the API."""
+    try:
+        response = get_api_session().get(f"{API_URL}{thumbnail_url}", timeout=10)
+        response.raise_for_status()
+        return response.content
+    except requests.RequestException as e:
+        logger.warning(f"Failed to fetch thumbnail {thumbnail_url}: {e}")
+        return None
+
+def delete_content_file(content_type: str, file_name: str) -> bool:
+    """Delete a file from a content folder via the API."""
+    try:
+        response = get_api_session().delete(
+            f"{API_URL}/delete_content/", params={"content_type": content_type, "file": file_name}, timeout=30
+        )
+        response.raise_for_status()
+        return True
+    except requests.RequestException as e:
+        logger.error(f"Failed to delete {file_name}: {e}")
+        return False
+
+def content_offset(key: str, page_size: int) -> int:
+    """Return the current listing offset for a paginated content view."""
+    return st.session_state.get(f"{key}_page", 0) * page_size
+
+def content_pagination(key: str, total: int, page_size: int):
+    """Render Previous/Next controls for a paginated content view."""
+    page_key = f"{key}_page"
+    total_pages = max((total + page_size - 1) // page_size, 1)
+    page = min(st.session_state.get(page_key, 0), total_pages - 1)
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("⬅️ Previous", key=f"{key}_prev", disabled=page == 0):
+            st.session_state[page_key] = page - 1
+            st.rerun()
+    with col2:
+        st.caption(f"Page {page + 1}/{total_pages} · {total} files")
+    with col3:
+        if st.button("Next ➡️", key=f"{key}_next", disabled=page + 1 >= total_pages):
+            st.session_state[page_key] = page + 1
+            st.rerun()
+
 def display_exception(e, user_msg: str):
     """
     Log and display an error from an exception in Streamlit.
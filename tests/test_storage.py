@@ -0,0 +1,136 @@
+"""The same storage cases, run against every backend (see conftest.storage)."""
+import pytest
+
+from src.services.song_matching import match_key, band_hashes
+from src.services.storage import Storage
+
+
+def add_song(storage, title, artist="The Band", album="Greatest", **metadata):
+    return storage.insert_song(title, artist, album, f"/content/{artist}/{title}", metadata)
+
+
+def blob(hash_value, size_bytes=100, path="song.ogg"):
+    return {"hash": hash_value, "path": path, "size_bytes": size_bytes}
+
+
+def test_insert_and_get(storage):
+    song_id = add_song(storage, "First Song", charter="someone")
+
+    song = storage.get_song(song_id)
+    assert song["title"] == "First Song"
+    assert song["artist"] == "The Band"
+    assert song["album"] == "Greatest"
+    assert song["file_path"] == "/content/The Band/First Song"
+    assert song["metadata"]["charter"] == "someone"
+    assert song["chart_stats"] == []
+    assert storage.count_songs() == 1
+    assert storage.get_song(song_id + 1) is None
+
+
+def test_search(storage):
+    live = add_song(storage, "Song (Live)")
+    other = add_song(storage, "Another One", artist="Someone Else")
+
+    assert [s["id"] for s in storage.list_songs(["id"], search_query="live")] == [live]
+    assert [s["id"] for s in storage.list_songs(["id"], search_query="someone")] == [other]
+    assert [s["id"] for s in storage.list_songs(["id"], search_query="greatest")] == [other, live]
+    assert storage.list_songs(["id"], search_query="missing") == []
+
+
+def test_keyset_paging(storage):
+    song_ids = [add_song(storage, f"Song {n}") for n in range(5)]
+
+    pages, after_id = [], None
+    while True:
+        page = storage.list_songs(["id"], limit=2, after_id=after_id)
+        if not page:
+            break
+        pages.append([s["id"] for s in page])
+        after_id = page[-1]["id"]
+
+    assert pages == [song_ids[4:2:-1], song_ids[2:0:-1], song_ids[:1]]
+
+
+def test_delete(storage):
+    keep = add_song(storage, "Keep Me")
+    drop = add_song(storage, "Drop Me")
+
+    assert storage.delete_songs([drop, drop + 100]) == [drop]
+    assert storage.get_song(drop) is None
+    assert storage.find_song(match_key("Drop Me", "The Band", "Greatest")) is None
+    assert [s["id"] for s in storage.list_songs(["id"])] == [keep]
+    assert storage.delete_songs([drop]) == []
+
+
+def test_duplicates(storage):
+    original = add_song(storage, "Through the Fire and Flames", artist="DragonForce")
+    copy = add_song(storage, "Through The Fire & Flames", artist="Dragonforce")
+    other = add_song(storage, "Completely Different", artist="Nobody")
+
+    assert storage.find_song(match_key("Through the Fire and Flames", "DragonForce", "Greatest")) == original
+    assert storage.find_song(match_key("Unknown", "Nobody", "Greatest")) is None
+
+    candidates = storage.match_candidates(band_hashes("Through the Fire and Flames", "DragonForce"), limit=10)
+    assert candidates[0]["id"] == original
+    assert {c["id"] for c in candidates} >= {original, copy}
+    assert other not in {c["id"] for c in candidates}
+
+    pairs = {tuple(pair) for pair in storage.duplicate_pairs(max_bucket_size=10)}
+    assert (original, copy) in pairs
+    assert not any(other in pair for pair in pairs)
+
+
+def test_blobs(storage):
+    first = add_song(storage, "First")
+    second = add_song(storage, "Second")
+    bare = add_song(storage, "Bare")
+
+    storage.save_song_files(first, [blob("aaa", 100, "song.ogg"), blob("bbb", 10, "notes.chart")])
+    storage.save_song_files(second, [blob("aaa", 100, "song.ogg")])
+
+    assert storage.songs_without_files(0, 10) == [{"id": bare, "folder_path": "/content/The Band/Bare"}]
+    assert storage.songs_without_files(bare, 10) == []
+    assert storage.blob_report() == {
+        "blobs": 2, "unreferenced_blobs": 0, "stored_bytes": 110, "linked_bytes": 210, "bytes_saved": 100
+    }
+
+    # Replacing a song's files and deleting a song both release their references
+    storage.save_song_files(first, [blob("aaa", 100, "song.ogg")])
+    assert storage.unreferenced_blobs("", 10) == ["bbb"]
+    assert not storage.delete_blob("aaa")
+    assert storage.delete_blob("bbb")
+
+    storage.delete_songs([first, second])
+    assert storage.unreferenced_blobs("", 10) == ["aaa"]
+    assert storage.delete_blob("aaa")
+    assert storage.blob_report()["blobs"] == 0
+
+
+def test_unreferenced_blob_paging(storage):
+    song_id = add_song(storage, "Paged")
+    storage.save_song_files(song_id, [blob(h, path=f"{h}.ogg") for h in ("a1", "b2", "c3", "d4", "e5")])
+    storage.save_song_files(song_id, [blob("c3")])
+
+    assert storage.unreferenced_blobs("", 2) == ["a1", "b2"]
+    assert storage.unreferenced_blobs("b2", 2) == ["d4", "e5"]
+    assert storage.unreferenced_blobs("e5", 2) == []
+
+
+def test_maintenance(storage):
+    add_song(storage, "Maintained")
+
+    storage.vacuum_analyze(["songs", "song_chart_stats"])
+    storage.analyze(["song_chart_stats", "song_waveforms", "assets"])
+    rebuilt = storage.maintain_indexes(["idx_songs_artist_album_title", "no_such_index"])
+    assert rebuilt == (["idx_songs_artist_album_title"] if storage.name == "postgres" else [])
+    assert storage.prune_song_changes(0) >= 0
+    assert [s["title"] for s in storage.list_songs(["title"], search_query="maintained")] == ["Maintained"]
+
+
+def test_incomplete_backend_fails_on_creation():
+    class PartialStorage(Storage):
+        def ping(self) -> bool:
+            return True
+
+    with pytest.raises(TypeError, match="abstract"):
+        PartialStorage()